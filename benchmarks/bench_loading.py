@@ -0,0 +1,367 @@
+import os
+import sys
+import re
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import shutil
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+# ==================================================
+# Benchmark jalur load data (bukan unit test)
+# - server: fake_postgrest.py di proses terpisah (SQLite lokal, latency bisa diatur)
+# - per skala dibuat satu user sintetis berisi N kosakata (1-4 translation),
+#   N catatan, N/100 folder, N/10 reminder
+# - diukur: waktu (wall), jumlah request + bytes (metrics.registry),
+#   dan puncak memori Python sisi klien (tracemalloc, run terpisah supaya waktu tidak ikut lambat)
+# - hasil disimpan ke benchmarks/results/<waktu>_<commit>.json dan
+#   dibandingkan dengan hasil sebelumnya (--compare)
+#
+# Pakai (dari root repo):
+#   python benchmarks/bench_loading.py                        # 100, 1k, 10k
+#   python benchmarks/bench_loading.py --scales 100000 --repeat 1
+#   python benchmarks/bench_loading.py --latency 20 --compare benchmarks/results/xxx.json
+# ==================================================
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from fake_postgrest import FakeDatabase
+
+LANGS = ("Indonesia", "Inggris", "Mandarin", "Jepang")
+DEFAULT_SCALES = (100, 1_000, 10_000)
+
+# perubahan di atas batas ini ditandai sebagai regresi saat --compare
+REGRESSION_RATIO = 1.10
+
+# ==================================================
+# Data sintetis
+# ==================================================
+def seed_user(db, n: int, rng: random.Random) -> int:
+    """Isi satu user dengan data sebanyak skala n, return user_id."""
+    today = date.today()
+    user_id = db.seed("users", [{"username": f"bench_{n}_{rng.randrange(10**9)}", "password": None}])[0]
+
+    folder_ids = db.seed("folders", [{"user_id": user_id, "nama_folder": f"Folder {i + 1}"} for i in range(max(1, n // 100))])
+
+    def folder():
+        return None if rng.random() < 0.1 else rng.choice(folder_ids)
+
+    def due():
+        return (today + timedelta(days=rng.randint(-30, 30))).isoformat()
+
+    db.seed("notes", [
+        {
+            "user_id": user_id, "folder_id": folder(),
+            "judul": f"Catatan {i + 1}", "isi": " ".join(f"kalimat{j}" for j in range(rng.randint(10, 60))),
+            "hafal": rng.random() < 0.3, "srs_due": due(),
+        }
+        for i in range(n)
+    ])
+
+    vocab_ids = db.seed("vocabulary", [
+        {"user_id": user_id, "folder_id": folder(), "catatan": f"kata {i + 1}", "sudah_hafal": rng.random() < 0.3, "srs_due": due()}
+        for i in range(n)
+    ])
+
+    translations = []
+    for vid in vocab_ids:
+        for bahasa in rng.sample(LANGS, rng.randint(1, 4)):
+            translations.append({
+                "vocabulary_id": vid, "bahasa": bahasa,
+                "kosakata": f"{bahasa[:3].lower()}_{vid}", "pengucapan": "", "arti": f"arti {vid}",
+            })
+    db.seed("vocabulary_translation", translations)
+
+    db.seed("reminders", [
+        {
+            "user_id": user_id, "judul": f"Reminder {i + 1}",
+            "tanggal": (today + timedelta(days=rng.randint(-30, 60))).isoformat() + "T09:00:00",
+            "selesai": rng.random() < 0.5,
+        }
+        for i in range(max(10, n // 10))
+    ])
+    return user_id
+
+# ==================================================
+# Pengukuran
+# ==================================================
+def start_server(db_path: str, latency_ms: float):
+    """
+    fake_postgrest di proses terpisah (file SQLite yang sama dengan seed) supaya
+    waktu CPU & memori server tidak ikut terukur di sisi klien.
+    """
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "fake_postgrest.py"), "--db", db_path, "--port", "0",
+         "--latency", str(latency_ms)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    line = proc.stdout.readline()
+    found = re.search(r"http://\S+", line)
+    if found is None:
+        proc.kill()
+        raise RuntimeError(f"fake_postgrest gagal jalan: {line!r}")
+    return proc, found.group(0)
+
+def wait_idle(app, *runners, timeout: float = 600):
+    """Putar event loop sampai semua TaskRunner selesai (termasuk callback & prefetch)."""
+    deadline = time.perf_counter() + timeout
+    while True:
+        app.processEvents()
+        if not any(r.busy() for r in runners):
+            app.processEvents()
+            if not any(r.busy() for r in runners):
+                return
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark tidak selesai dalam batas waktu")
+        time.sleep(0.0005)
+
+def measure(case, repeat: int):
+    """
+    case: dict berisi setup() (tidak diukur) dan run() (diukur, blocking sampai selesai).
+    Return ringkasan waktu (ms), request, bytes, dan puncak memori (KiB).
+    """
+    import metrics
+
+    times, requests_, nbytes = [], [], []
+    for _ in range(repeat):
+        case["setup"]()
+        metrics.registry.reset()
+        t0 = time.perf_counter()
+        case["run"]()
+        times.append((time.perf_counter() - t0) * 1000)
+        summary = metrics.registry.summary()
+        requests_.append(sum(s["count"] for s in summary))
+        nbytes.append(sum(s["bytes"] for s in summary))
+
+    case["setup"]()
+    tracemalloc.start()
+    case["run"]()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "repeat": repeat,
+        "min_ms": round(min(times), 2),
+        "median_ms": round(statistics.median(times), 2),
+        "max_ms": round(max(times), 2),
+        "requests": requests_[-1],
+        "bytes": nbytes[-1],
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+def build_cases(app, user_id: int):
+    """Benchmark per jalur load. Halaman dibuat sekali, load awal di konstruktor tidak diukur."""
+    import reminder_service
+    from supabase_client import get_quiz_vocab_questions, get_folders, get_pending_reminders
+    from vocabulary_page import VocabularyPage
+    from folder_page import FolderPage
+    from statistic_page import StatisticPage
+    from reminder_service import ReminderService
+
+    # popup reminder akan memblokir benchmark
+    reminder_service.QMessageBox.information = staticmethod(lambda *args, **kwargs: None)
+
+    vocab_page = VocabularyPage(user_id)
+    folder_page = FolderPage(user_id)
+    stat_page = StatisticPage(user_id)
+    service = ReminderService(user_id)
+    wait_idle(app, vocab_page.tasks, folder_page.tasks, stat_page.tasks)
+
+    # folder terbesar (id terkecil) supaya isi folder tidak kosong
+    folder_page.selected_folder_id = min(int(f["id"]) for f in get_folders(user_id))
+
+    def reset_service():
+        # heap berisi reminder jatuh tempo yang belum dinotifikasi (seperti setelah refresh,
+        # sebelum timer berbunyi) => check_due benar-benar bertanya ke server
+        service.shown_ids = set()
+        service.heap = sorted(((r.get("tanggal") or "")[:10], r["id"], r.get("judul"))
+                              for r in get_pending_reminders(user_id))
+
+    def blocking(fn, *runners):
+        def run():
+            fn()
+            wait_idle(app, *runners)
+        return run
+
+    def cold_folder():
+        # isi folder belum pernah dibuka: tunggu prefetch run sebelumnya, lalu kosongkan cache
+        wait_idle(app, folder_page.prefetcher)
+        folder_page.cache.clear()
+
+    cases = {
+        "VocabularyPage.load_data": {
+            "setup": lambda: None,
+            "run": blocking(vocab_page.load_data, vocab_page.tasks),
+        },
+        "FolderPage.load_folders": {
+            "setup": lambda: None,
+            "run": blocking(folder_page.load_folders, folder_page.tasks),
+        },
+        "FolderPage.load_contents": {
+            "setup": cold_folder,
+            "run": blocking(folder_page.load_contents, folder_page.tasks),
+        },
+        "FolderPage.load_contents (cache)": {
+            "setup": lambda: None,
+            "run": blocking(folder_page.load_contents, folder_page.tasks),
+        },
+        "StatisticPage.refresh": {
+            "setup": lambda: None,
+            "run": blocking(stat_page.refresh, stat_page.tasks),
+        },
+        "get_quiz_vocab_questions": {
+            "setup": lambda: None,
+            "run": lambda: get_quiz_vocab_questions(user_id, limit=30),
+        },
+        "ReminderService.check_due": {
+            "setup": reset_service,
+            "run": blocking(service.check_due, service.tasks),
+        },
+    }
+
+    def close():
+        service.stop()
+        folder_page.prefetcher.cancel_all()
+        for page in (vocab_page, folder_page, stat_page):
+            page.tasks.cancel_all()
+            page.deleteLater()
+        wait_idle(app, vocab_page.tasks, folder_page.tasks, folder_page.prefetcher, stat_page.tasks, service.tasks)
+
+    return cases, close
+
+# ==================================================
+# Hasil
+# ==================================================
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10)
+        commit = out.stdout.strip() or "unknown"
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, timeout=30).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+def save_results(result: dict, path=None) -> str:
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{stamp}_{result['commit']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    return path
+
+def latest_result(exclude=None):
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    files = sorted(os.path.join(RESULTS_DIR, x) for x in os.listdir(RESULTS_DIR) if x.endswith(".json"))
+    files = [x for x in files if x != exclude]
+    return files[-1] if files else None
+
+def compare(old: dict, new: dict):
+    """Cetak perbandingan median_ms / requests / peak_kib, tandai regresi."""
+    print(f"\nPerbandingan {old['commit']} -> {new['commit']}")
+    print(f"{'skala':>7}  {'benchmark':<34} {'median ms':>20} {'requests':>14} {'peak KiB':>22}")
+    regressions = 0
+    for scale, cases in new["scales"].items():
+        for name, cur in cases.items():
+            prev = old["scales"].get(scale, {}).get(name)
+            if prev is None:
+                continue
+            flags = []
+            for key in ("median_ms", "requests", "peak_kib"):
+                if prev[key] and cur[key] > prev[key] * REGRESSION_RATIO:
+                    flags.append(key)
+            regressions += bool(flags)
+            print(f"{scale:>7}  {name:<34} {prev['median_ms']:>9} -> {cur['median_ms']:<8} "
+                  f"{prev['requests']:>5} -> {cur['requests']:<5} {prev['peak_kib']:>9} -> {cur['peak_kib']:<9}"
+                  + ("  REGRESI: " + ", ".join(flags) if flags else ""))
+    return regressions
+
+def print_table(scale: int, cases: dict):
+    print(f"\n== skala {scale} ==")
+    print(f"{'benchmark':<34} {'min ms':>9} {'median ms':>10} {'requests':>9} {'KiB respon':>11} {'peak KiB':>10}")
+    for name, r in cases.items():
+        print(f"{name:<34} {r['min_ms']:>9} {r['median_ms']:>10} {r['requests']:>9} {r['bytes'] / 1024:>11.1f} {r['peak_kib']:>10}")
+
+# ==================================================
+# main
+# ==================================================
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark jalur load data VocaFlow terhadap fake_postgrest")
+    ap.add_argument("--scales", default=",".join(str(x) for x in DEFAULT_SCALES),
+                    help="daftar skala dipisah koma (mis. 100,1000,10000,100000)")
+    ap.add_argument("--repeat", type=int, default=3, help="jumlah pengulangan per benchmark (diambil median)")
+    ap.add_argument("--latency", type=float, default=10, help="latency buatan per request di server (ms)")
+    ap.add_argument("--only", default="", help="jalankan benchmark yang namanya mengandung teks ini saja")
+    ap.add_argument("--seed", type=int, default=1, help="seed data sintetis")
+    ap.add_argument("--out", default=None, help="file hasil (default: benchmarks/results/<waktu>_<commit>.json)")
+    ap.add_argument("--compare", nargs="?", const="latest", default=None,
+                    help="bandingkan dengan file hasil (tanpa nilai: hasil terakhir di benchmarks/results)")
+    args = ap.parse_args()
+
+    scales = [int(x) for x in args.scales.split(",") if x.strip()]
+    workdir = tempfile.mkdtemp(prefix="vocaflow_bench_")
+    db_path = os.path.join(workdir, "server.sqlite3")
+    db = FakeDatabase(db_path)
+    server, url = start_server(db_path, args.latency)
+    # harus diset sebelum supabase_client di-import (config membaca env saat import)
+    os.environ["VOCAFLOW_SUPABASE_URL"] = url
+
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    result = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency_ms": args.latency,
+        "scales": {},
+    }
+
+    try:
+        for scale in scales:
+            t0 = time.perf_counter()
+            user_id = seed_user(db, scale, random.Random(args.seed))
+            print(f"\nseed skala {scale}: {time.perf_counter() - t0:.1f} s (user_id {user_id})")
+
+            cases, close = build_cases(app, user_id)
+            measured = {}
+            for name, case in cases.items():
+                if args.only and args.only not in name:
+                    continue
+                measured[name] = measure(case, args.repeat)
+            close()
+
+            result["scales"][str(scale)] = measured
+            print_table(scale, measured)
+    finally:
+        server.terminate()
+        server.wait()
+        db.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    path = save_results(result, args.out)
+    print(f"\nHasil disimpan di {path}")
+
+    if args.compare:
+        old_path = latest_result(exclude=path) if args.compare == "latest" else args.compare
+        if old_path is None:
+            print("Belum ada hasil sebelumnya untuk dibandingkan.")
+        else:
+            with open(old_path, encoding="utf-8") as f:
+                old = json.load(f)
+            if compare(old, result):
+                sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import os
+import sys
+import gc
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from datetime import date, timedelta
+
+# ==================================================
+# Benchmark decode response list (bukan unit test)
+# - body JSON sintetis berbentuk response PostgREST untuk daftar notes (kolom list +
+#   isi_preview), vocabulary (+ embed translation), folders, dan reminders
+# - dibandingkan: r.json() bawaan requests (dict per baris) vs records.decode
+#   (msgspec Struct; tanpa msgspec: dict dari orjson/json)
+# - diukur: waktu decode (min), memori yang tertahan oleh hasil, dan puncak memori
+#   saat decode (tracemalloc)
+#
+# Pakai (dari root repo):
+#   python benchmarks/bench_records.py                 # 100k baris
+#   python benchmarks/bench_records.py --rows 10000 --repeat 10
+# ==================================================
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import records
+
+LANGS = ("Indonesia", "Inggris", "Mandarin", "Jepang")
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(f"kata{rng.randrange(5000)}" for _ in range(words))
+
+def build_bodies(n: int, rng: random.Random):
+    """{nama: (bytes body, class record)} dengan n baris per tabel."""
+    today = date.today()
+    created = [f"{today - timedelta(days=rng.randrange(365))}T10:{rng.randrange(60):02d}:00+00:00" for _ in range(n)]
+    notes = [{
+        "id": n - i, "folder_id": rng.randrange(1, 1 + n // 100), "judul": _text(rng, 3),
+        "hafal": rng.random() < 0.3, "created_at": created[i], "isi_preview": _text(rng, 12),
+    } for i in range(n)]
+    vocab = [{
+        "id": n - i, "folder_id": rng.randrange(1, 1 + n // 100), "catatan": _text(rng, 2), "sudah_hafal": rng.random() < 0.3,
+        "vocabulary_translation": [{
+            "id": (n - i) * 4 + k, "bahasa": lang, "kosakata": _text(rng, 1), "pengucapan": _text(rng, 1), "arti": _text(rng, 3),
+        } for k, lang in enumerate(rng.sample(LANGS, rng.randint(1, 4)))],
+    } for i in range(n)]
+    folders = [{"id": n - i, "nama_folder": f"Folder {n - i}"} for i in range(n)]
+    reminders = [{
+        "id": n - i, "judul": _text(rng, 4), "tanggal": str(today + timedelta(days=rng.randint(-30, 30))),
+        "selesai": rng.random() < 0.5,
+    } for i in range(n)]
+
+    def body(rows):
+        return json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    return {
+        "notes (list + isi_preview)": (body(notes), records.Note),
+        "vocabulary (+ translation)": (body(vocab), records.Vocabulary),
+        "folders": (body(folders), records.Folder),
+        "reminders": (body(reminders), records.Reminder),
+    }
+
+def decode_dicts(content: bytes, cls):
+    # sama dengan requests.Response.json() untuk response utf-8
+    return json.loads(content.decode("utf-8"))
+
+def measure(fn, content: bytes, cls, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        rows = fn(content, cls)
+        times.append((time.perf_counter() - t0) * 1000)
+        del rows
+
+    gc.collect()
+    tracemalloc.start()
+    rows = fn(content, cls)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return {"ms": round(min(times), 1), "retained_mib": round(retained / 2**20, 1), "peak_mib": round(peak / 2**20, 1)}
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark decode response list: dict vs records")
+    ap.add_argument("--rows", type=int, default=100_000, help="jumlah baris per tabel")
+    ap.add_argument("--repeat", type=int, default=5, help="jumlah pengulangan (diambil minimum)")
+    ap.add_argument("--seed", type=int, default=1, help="seed data sintetis")
+    args = ap.parse_args()
+
+    backend = "msgspec" if records.msgspec is not None else f"dict + {records.loads.__module__}"
+    print(f"records backend: {backend}, {args.rows} baris per tabel")
+    print(f"{'response':28s} {'KiB':>8s} | {'dict ms':>8s} {'MiB':>6s} {'peak':>6s} | {'record ms':>9s} {'MiB':>6s} {'peak':>6s}")
+
+    for name, (content, cls) in build_bodies(args.rows, random.Random(args.seed)).items():
+        base = measure(decode_dicts, content, cls, args.repeat)
+        rec = measure(records.decode, content, cls, args.repeat)
+        print(f"{name:28s} {len(content) / 1024:8.0f} | "
+              f"{base['ms']:8.1f} {base['retained_mib']:6.1f} {base['peak_mib']:6.1f} | "
+              f"{rec['ms']:9.1f} {rec['retained_mib']:6.1f} {rec['peak_mib']:6.1f}")
+
+if __name__ == "__main__":
+    main()
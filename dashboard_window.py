@@ -1,7 +1,14 @@
 from PySide6.QtWidgets import QWidget, QPushButton, QVBoxLayout, QLabel, QGridLayout
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QKeySequence, QShortcut
 
+from config import OUTBOX_RETRY_INTERVAL
 from reminder_service import ReminderService
+from supabase_client import (
+    open_local_cache, close_local_cache, open_outbox, close_outbox, outbox_pending, flush_outbox,
+    connection_state
+)
+from workers import TaskRunner
 
 class DashboardWindow(QWidget):
     def __init__(self, user_id: int, welcome=None):
@@ -14,6 +21,19 @@ class DashboardWindow(QWidget):
         self.resize(560, 640)
         self.setMinimumSize(520, 600)
 
+        open_local_cache(self.user_id)
+        open_outbox(self.user_id)
+
+        # write yang tertunda (offline) dikirim ulang berkala selama masih ada
+        self.tasks = TaskRunner(self)
+        self.outbox_timer = QTimer(self)
+        self.outbox_timer.setInterval(OUTBOX_RETRY_INTERVAL * 1000)
+        self.outbox_timer.timeout.connect(self.flush_outbox)
+        self.outbox_timer.timeout.connect(self.update_status)
+        self.outbox_timer.start()
+        self.flush_outbox()
+        self.update_status()
+
         self.reminder_service = ReminderService(self.user_id, parent_widget=self)
         self.reminder_service.start()
 
@@ -69,8 +89,16 @@ class DashboardWindow(QWidget):
         root.addLayout(grid)
         root.addStretch(1)
 
+        self.lbl_status = QLabel("")
+        self.lbl_status.setAlignment(Qt.AlignCenter)
+        self.lbl_status.setStyleSheet("opacity: 0.8;")
+        root.addWidget(self.lbl_status)
+
         self.setLayout(root)
 
+        # panel debug metrik request (tersembunyi)
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self.open_debug)
+
     def open_kategori(self):
         from folder_page import FolderPage
         self.hide()
@@ -113,11 +141,32 @@ class DashboardWindow(QWidget):
         self.page = StatisticPage(self.user_id, dashboard=self)
         self.page.show()
 
+    def open_debug(self):
+        from debug_panel import DebugPanel
+        self.debug_panel = DebugPanel(self)
+        self.debug_panel.show()
+
+    def flush_outbox(self):
+        if outbox_pending() and not self.tasks.is_running("outbox"):
+            self.tasks.run("outbox", flush_outbox, on_done=lambda _: self.update_status(), on_error=lambda tb: None)
+
+    def update_status(self):
+        state = connection_state()["state"]
+        text = "Offline — menampilkan data tersimpan" if state == "open" else ""
+        pending = outbox_pending()
+        if pending:
+            text = (text + " • " if text else "") + f"{pending} perubahan menunggu dikirim"
+        self.lbl_status.setText(text)
+
     def logout(self):
         try:
             self.reminder_service.stop()
         except Exception:
             pass
+        self.outbox_timer.stop()
+        self.tasks.cancel_all()
+        close_outbox()
+        close_local_cache()
 
         if self.welcome is not None:
             self.welcome.show()
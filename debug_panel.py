@@ -0,0 +1,112 @@
+from PySide6.QtWidgets import (
+    QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QTableView,
+    QHeaderView, QAbstractItemView, QFileDialog, QApplication
+)
+from PySide6.QtCore import Qt, QTimer
+
+import metrics
+from supabase_client import connection_state, outbox_pending
+from table_models import RecordTableModel
+
+def _num(v):
+    return "-" if v is None else str(v)
+
+class DebugPanel(QWidget):
+    """
+    Panel debug metrik request (dibuka dari dashboard: Ctrl+Shift+D):
+    jumlah request, error, bytes, dan p50/p95/p99 per halaman/tabel/method.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowFlag(Qt.Window)
+        self.setWindowTitle("Debug: Request Supabase")
+        self.setup_ui()
+        self.refresh()
+
+        # selama panel terbuka, angka diperbarui tiap 2 detik
+        self.timer = QTimer(self)
+        self.timer.setInterval(2000)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+
+        self.resize(1000, 520)
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(18, 18, 18, 18)
+        layout.setSpacing(12)
+
+        title = QLabel("Request Supabase")
+        title.setObjectName("PageTitle")
+        layout.addWidget(title)
+
+        self.lbl_info = QLabel("-")
+        layout.addWidget(self.lbl_info)
+
+        self.model = RecordTableModel([
+            ("Halaman", "page"),
+            ("Tabel", "table"),
+            ("Method", "method"),
+            ("Jumlah", "count"),
+            ("Error", "errors"),
+            ("Bytes", "bytes"),
+            ("p50 (ms)", "p50_ms", "text", _num),
+            ("p95 (ms)", "p95_ms", "text", _num),
+            ("p99 (ms)", "p99_ms", "text", _num),
+        ], self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.setAlternatingRowColors(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        btn_refresh = QPushButton("Refresh")
+        btn_reset = QPushButton("Reset")
+        btn_json = QPushButton("Salin JSON")
+        btn_prom = QPushButton("Export Prometheus")
+        for b in (btn_refresh, btn_reset, btn_json, btn_prom):
+            b.setProperty("class", "secondary")
+        btn_refresh.clicked.connect(self.refresh)
+        btn_reset.clicked.connect(self.reset)
+        btn_json.clicked.connect(self.copy_json)
+        btn_prom.clicked.connect(self.export_prometheus)
+
+        btns = QHBoxLayout()
+        btns.addWidget(btn_refresh)
+        btns.addWidget(btn_reset)
+        btns.addStretch()
+        btns.addWidget(btn_json)
+        btns.addWidget(btn_prom)
+        layout.addLayout(btns)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        rows = metrics.registry.summary()
+        for i, r in enumerate(rows):
+            r["id"] = i
+        self.model.set_rows(rows)
+
+        total = sum(r["count"] for r in rows)
+        errors = sum(r["errors"] for r in rows)
+        state = connection_state()["state"]
+        self.lbl_info.setText(f"Total request: {total} • error: {errors} • koneksi: {state} • outbox: {outbox_pending()}")
+
+    def reset(self):
+        metrics.registry.reset()
+        self.refresh()
+
+    def copy_json(self):
+        QApplication.clipboard().setText(metrics.registry.to_json())
+        self.lbl_info.setText("JSON metrik disalin ke clipboard.")
+
+    def export_prometheus(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Prometheus", "vocaflow_metrics.prom", "Prometheus (*.prom *.txt)")
+        if not path:
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(metrics.registry.to_prometheus())
+        self.lbl_info.setText(f"Metrik disimpan ke {path}")
@@ -0,0 +1,656 @@
+import json
+import time
+import random
+import sqlite3
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl, unquote
+
+# ==================================================
+# Server PostgREST tiruan (lokal, SQLite) untuk benchmark & uji tanpa jaringan
+# mendukung sintaks yang dipakai supabase_client:
+# - filter   : eq, neq, lt, lte, gt, gte, like, ilike, is (null/true/false), in.(...), not.<op>
+# - or=(a.op.v,b.op.v)
+# - select   : kolom, *, embed vocabulary_translation(...), vocabulary!inner(...)
+#              + filter/order di embed (vocabulary.user_id=..., vocabulary_translation.order=...)
+#              + alias & agregat embed (notes_hafal:notes(count) + notes_hafal.hafal=eq.true)
+#              + computed column notes.isi_preview
+# - order    : col.asc/desc[.nullsfirst/.nullslast], beberapa kolom
+# - limit / offset, HEAD + Prefer: count=exact (Content-Range)
+# - POST (objek / list), on_conflict + Prefer: resolution=merge-duplicates / ignore-duplicates
+# - PATCH / DELETE dengan filter, Prefer: return=representation
+# - updated_at otomatis + tombstone di deleted_rows (seperti supabase_schema.sql)
+# - latency buatan (latency_ms + jitter_ms) per request
+#
+# Pakai:
+#   python fake_postgrest.py --port 54321 --latency 30
+#   VOCAFLOW_SUPABASE_URL=http://127.0.0.1:54321 python main.py
+# atau di dalam proses:
+#   with FakePostgrest(latency_ms=20) as srv: ... srv.url ...
+# ==================================================
+NOW = "(strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    password TEXT,
+    created_at TEXT NOT NULL DEFAULT {NOW}
+);
+CREATE TABLE IF NOT EXISTS folders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    nama_folder TEXT,
+    client_key TEXT UNIQUE,
+    created_at TEXT NOT NULL DEFAULT {NOW},
+    updated_at TEXT NOT NULL DEFAULT {NOW}
+);
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    folder_id INTEGER,
+    judul TEXT,
+    isi TEXT,
+    hafal INTEGER NOT NULL DEFAULT 0,
+    srs_ease REAL NOT NULL DEFAULT 2.5,
+    srs_interval INTEGER NOT NULL DEFAULT 0,
+    srs_reps INTEGER NOT NULL DEFAULT 0,
+    srs_due TEXT NOT NULL DEFAULT (date('now')),
+    client_key TEXT UNIQUE,
+    created_at TEXT NOT NULL DEFAULT {NOW},
+    updated_at TEXT NOT NULL DEFAULT {NOW}
+);
+CREATE TABLE IF NOT EXISTS vocabulary (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    folder_id INTEGER,
+    catatan TEXT,
+    sudah_hafal INTEGER NOT NULL DEFAULT 0,
+    srs_ease REAL NOT NULL DEFAULT 2.5,
+    srs_interval INTEGER NOT NULL DEFAULT 0,
+    srs_reps INTEGER NOT NULL DEFAULT 0,
+    srs_due TEXT NOT NULL DEFAULT (date('now')),
+    client_key TEXT UNIQUE,
+    created_at TEXT NOT NULL DEFAULT {NOW},
+    updated_at TEXT NOT NULL DEFAULT {NOW}
+);
+CREATE TABLE IF NOT EXISTS vocabulary_translation (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vocabulary_id INTEGER NOT NULL,
+    bahasa TEXT,
+    kosakata TEXT,
+    pengucapan TEXT,
+    arti TEXT,
+    created_at TEXT NOT NULL DEFAULT {NOW},
+    updated_at TEXT NOT NULL DEFAULT {NOW},
+    UNIQUE (vocabulary_id, bahasa)
+);
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    judul TEXT,
+    tanggal TEXT,
+    selesai INTEGER NOT NULL DEFAULT 0,
+    client_key TEXT UNIQUE,
+    created_at TEXT NOT NULL DEFAULT {NOW},
+    updated_at TEXT NOT NULL DEFAULT {NOW}
+);
+CREATE TABLE IF NOT EXISTS deleted_rows (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    tbl TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    deleted_at TEXT NOT NULL DEFAULT {NOW}
+);
+CREATE INDEX IF NOT EXISTS idx_folders_user ON folders (user_id, id);
+CREATE INDEX IF NOT EXISTS idx_notes_user ON notes (user_id, id);
+CREATE INDEX IF NOT EXISTS idx_notes_srs_due ON notes (user_id, srs_due, id);
+CREATE INDEX IF NOT EXISTS idx_vocabulary_user ON vocabulary (user_id, id);
+CREATE INDEX IF NOT EXISTS idx_vocabulary_srs_due ON vocabulary (user_id, srs_due, id);
+CREATE INDEX IF NOT EXISTS idx_translation_vocab ON vocabulary_translation (vocabulary_id, id);
+CREATE INDEX IF NOT EXISTS idx_reminders_user ON reminders (user_id, tanggal, id);
+CREATE INDEX IF NOT EXISTS idx_deleted_rows_user_tbl ON deleted_rows (user_id, tbl, deleted_at);
+"""
+
+BOOL_COLUMNS = {"hafal", "sudah_hafal", "selesai"}
+
+# (tabel, relasi) -> ("many", fk di tabel relasi) atau ("one", fk di tabel ini)
+RELATIONS = {
+    ("vocabulary", "vocabulary_translation"): ("many", "vocabulary_id"),
+    ("vocabulary_translation", "vocabulary"): ("one", "vocabulary_id"),
+    ("folders", "notes"): ("many", "folder_id"),
+    ("folders", "vocabulary"): ("many", "folder_id"),
+    ("notes", "folders"): ("one", "folder_id"),
+    ("vocabulary", "folders"): ("one", "folder_id"),
+}
+
+OPERATORS = {"eq": "=", "neq": "<>", "lt": "<", "lte": "<=", "gt": ">", "gte": ">=", "like": "LIKE", "ilike": "LIKE"}
+RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+def _isi_preview(row) -> str:
+    # sama dengan fungsi isi_preview(notes) di supabase_schema.sql
+    isi = row.get("isi") or ""
+    return isi[:120].rstrip() + "…" if len(isi) > 120 else isi
+
+# computed column (fungsi SQL dengan argumen tipe baris) yang bisa diminta lewat select
+COMPUTED = {
+    ("notes", "isi_preview"): _isi_preview,
+}
+
+class ApiError(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+def _split_top(s: str):
+    """Pisah dengan koma di level teratas (koma di dalam kurung diabaikan)."""
+    parts, depth, cur = [], 0, ""
+    for ch in s:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(cur)
+            cur = ""
+        else:
+            cur += ch
+    if cur:
+        parts.append(cur)
+    return [p.strip() for p in parts if p.strip()]
+
+def _parse_select(s: str):
+    """
+    'id,a,alias:rel!inner(x,y)' => (["id", "a"], [(alias, rel, inner, sub_select)])
+    alias = nama key di hasil (default nama relasi); rel(count) => [{"count": n}]
+    """
+    columns, embeds = [], []
+    for item in _split_top(s or "*"):
+        if "(" in item:
+            name, inner = item.split("(", 1)
+            alias, _, name = name.rpartition(":")
+            rel, _, hint = name.partition("!")
+            embeds.append((alias or rel, rel, hint == "inner", _parse_select(inner[:-1])))
+        else:
+            columns.append(item)
+    return columns, embeds
+
+class FakeDatabase:
+    """Lapisan data: menerjemahkan query PostgREST ke SQLite."""
+    def __init__(self, path: str = ":memory:"):
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.columns = {}
+        for (tbl,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"):
+            self.columns[tbl] = [r[1] for r in self.conn.execute(f'PRAGMA table_info("{tbl}")')]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # -------------------------
+    # util
+    # -------------------------
+    def _check_table(self, tbl: str):
+        if tbl not in self.columns:
+            raise ApiError(404, "42P01", f'relation "public.{tbl}" does not exist')
+
+    def _check_column(self, tbl: str, col: str):
+        if col not in self.columns[tbl]:
+            raise ApiError(400, "42703", f"column {tbl}.{col} does not exist")
+
+    def _value(self, col: str, val: str):
+        if col in BOOL_COLUMNS and val in ("true", "false"):
+            return 1 if val == "true" else 0
+        return val
+
+    def _row(self, tbl: str, r) -> dict:
+        d = dict(r)
+        for c in BOOL_COLUMNS:
+            if c in d and d[c] is not None:
+                d[c] = bool(d[c])
+        return d
+
+    def _relation(self, tbl: str, rel: str):
+        found = RELATIONS.get((tbl, rel))
+        if found is None:
+            raise ApiError(400, "PGRST200", f"Could not find a relationship between '{tbl}' and '{rel}'")
+        return found
+
+    # -------------------------
+    # filter -> SQL
+    # -------------------------
+    def _cond(self, tbl: str, col: str, expr: str):
+        negate = expr.startswith("not.")
+        if negate:
+            expr = expr[4:]
+        op, _, val = expr.partition(".")
+        self._check_column(tbl, col)
+        qcol = f'"{tbl}"."{col}"'
+
+        if op == "is":
+            sql = {"null": f"{qcol} IS NULL", "true": f"{qcol} = 1", "false": f"{qcol} = 0"}.get(val)
+            if sql is None:
+                raise ApiError(400, "PGRST100", f"failed to parse filter (is.{val})")
+            args = []
+        elif op == "in":
+            items = [x.strip().strip('"') for x in _split_top(val.strip()[1:-1])] if val.startswith("(") else []
+            sql = f"{qcol} IN ({','.join('?' * len(items))})" if items else "0"
+            args = [self._value(col, x) for x in items]
+        elif op in OPERATORS:
+            if op in ("like", "ilike"):
+                val = val.replace("*", "%")
+            sql = f"{qcol} {OPERATORS[op]} ?"
+            if op == "ilike":
+                sql = f"LOWER({qcol}) LIKE LOWER(?)"
+            args = [self._value(col, val)]
+        else:
+            raise ApiError(400, "PGRST100", f"failed to parse filter ({op})")
+        return (f"NOT ({sql})" if negate else sql), args
+
+    def _logic(self, tbl: str, expr: str, joiner: str):
+        """or=(a.op.v,b.op.v) / and=(...)"""
+        parts, args = [], []
+        for item in _split_top(expr.strip()[1:-1]):
+            if item.startswith(("or(", "and(")):
+                name, inner = item.split("(", 1)
+                sql, a = self._logic(tbl, "(" + inner, " OR " if name == "or" else " AND ")
+            else:
+                col, _, rest = item.partition(".")
+                sql, a = self._cond(tbl, col, rest)
+            parts.append(sql)
+            args += a
+        return "(" + joiner.join(parts) + ")", args
+
+    def _where(self, tbl: str, params, embeds):
+        """WHERE untuk tabel utama; filter embed (rel.col) dikembalikan terpisah."""
+        where, args = [], []
+        embed_filters = {}
+        inner = {key: rel for key, rel, is_inner, _ in embeds if is_inner}
+
+        for key, val in params:
+            if key in RESERVED or key.endswith((".order", ".limit", ".offset")):
+                continue
+            if key in ("or", "and"):
+                sql, a = self._logic(tbl, val, " OR " if key == "or" else " AND ")
+            elif "." in key:
+                name, col = key.split(".", 1)
+                embed_filters.setdefault(name, []).append((col, val))
+                continue
+            else:
+                sql, a = self._cond(tbl, key, val)
+            where.append(sql)
+            args += a
+
+        # embed !inner => baris utama hanya yang punya pasangan (yang lolos filter embed)
+        for name, rel in inner.items():
+            kind, fk = self._relation(tbl, rel)
+            sub, sub_args = ["1"], []
+            for col, val in embed_filters.get(name, []):
+                sql, a = self._cond(rel, col, val)
+                sub.append(sql)
+                sub_args += a
+            if kind == "one":
+                where.append(f'"{tbl}"."{fk}" IN (SELECT "{rel}".id FROM "{rel}" WHERE {" AND ".join(sub)})')
+            else:
+                where.append(f'"{tbl}".id IN (SELECT "{rel}"."{fk}" FROM "{rel}" WHERE {" AND ".join(sub)})')
+            args += sub_args
+
+        sql = (" WHERE " + " AND ".join(where)) if where else ""
+        return sql, args, embed_filters
+
+    def _order(self, tbl: str, spec: str) -> str:
+        if not spec:
+            return ""
+        parts = []
+        for item in spec.split(","):
+            bits = item.strip().split(".")
+            col = bits[0]
+            self._check_column(tbl, col)
+            sql = f'"{tbl}"."{col}"' + (" DESC" if "desc" in bits[1:] else " ASC")
+            if "nullsfirst" in bits[1:]:
+                sql += " NULLS FIRST"
+            elif "nullslast" in bits[1:]:
+                sql += " NULLS LAST"
+            parts.append(sql)
+        return " ORDER BY " + ", ".join(parts)
+
+    def _project(self, tbl: str, row: dict, columns):
+        if not columns or columns == ["*"]:
+            return row
+        result = dict(row) if "*" in columns else {}
+        for col in columns:
+            if col == "*":
+                continue
+            computed = COMPUTED.get((tbl, col))
+            if computed is not None:
+                result[col] = computed(row)
+                continue
+            self._check_column(tbl, col)
+            result[col] = row.get(col)
+        return result
+
+    def _embed(self, tbl: str, rows, embeds, embed_filters, params):
+        """Isi key relasi di setiap baris (1 query per relasi, bukan per baris)."""
+        opts = dict(params)
+        for name, rel, _, (sub_columns, sub_embeds) in embeds:
+            kind, fk = self._relation(tbl, rel)
+            where, args = [], []
+            for col, val in embed_filters.get(name, []):
+                sql, a = self._cond(rel, col, val)
+                where.append(sql)
+                args += a
+
+            if kind == "many":
+                keys = [r["id"] for r in rows]
+                link = fk
+            else:
+                keys = [r[fk] for r in rows if r.get(fk) is not None]
+                link = "id"
+
+            if sub_columns in (["count"], ["count()"]) and not sub_embeds:
+                # agregat: satu GROUP BY untuk semua baris
+                counts = {}
+                for i in range(0, len(keys), 500):
+                    chunk = keys[i:i + 500]
+                    sql = (f'SELECT "{rel}"."{link}", COUNT(*) FROM "{rel}" '
+                           f'WHERE "{rel}"."{link}" IN ({",".join("?" * len(chunk))})')
+                    if where:
+                        sql += " AND " + " AND ".join(where)
+                    counts.update(self.conn.execute(sql + f' GROUP BY "{rel}"."{link}"', chunk + args).fetchall())
+                for row in rows:
+                    row[name] = [{"count": counts.get(row["id"] if kind == "many" else row.get(fk), 0)}]
+                continue
+
+            found = []
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                sql = f'SELECT * FROM "{rel}" WHERE "{rel}"."{link}" IN ({",".join("?" * len(chunk))})'
+                if where:
+                    sql += " AND " + " AND ".join(where)
+                sql += self._order(rel, opts.get(f"{name}.order", "id.asc"))
+                found += [self._row(rel, r) for r in self.conn.execute(sql, chunk + args)]
+
+            if sub_embeds:
+                self._embed(rel, found, sub_embeds, {}, [])
+
+            grouped = {}
+            for r in found:
+                grouped.setdefault(r[link], []).append(r)
+            for row in rows:
+                if kind == "many":
+                    row[name] = [self._project(rel, r, sub_columns) for r in grouped.get(row["id"], [])]
+                else:
+                    match = grouped.get(row.get(fk)) or [None]
+                    row[name] = self._project(rel, match[0], sub_columns) if match[0] else None
+
+    # -------------------------
+    # operasi
+    # -------------------------
+    def select(self, tbl: str, params, count: bool = False, head: bool = False):
+        """Return (rows, total|None, offset). head=True => hanya hitung, baris tidak diambil."""
+        self._check_table(tbl)
+        opts = dict(params)
+        columns, embeds = _parse_select(opts.get("select", "*"))
+        with self.lock:
+            where, args, embed_filters = self._where(tbl, params, embeds)
+            total = None
+            if count:
+                total = self.conn.execute(f'SELECT COUNT(*) FROM "{tbl}"{where}', args).fetchone()[0]
+
+            offset = int(opts.get("offset") or 0)
+            if head:
+                return [], total, offset
+
+            sql = f'SELECT * FROM "{tbl}"{where}' + self._order(tbl, opts.get("order"))
+            if "limit" in opts or offset:
+                sql += " LIMIT ? OFFSET ?"
+                args = args + [int(opts.get("limit", -1)), offset]
+            rows = [self._row(tbl, r) for r in self.conn.execute(sql, args)]
+            self._embed(tbl, rows, embeds, embed_filters, params)
+
+        embed_names = [e[0] for e in embeds]
+        result = [{**self._project(tbl, r, columns), **{k: r[k] for k in embed_names}} for r in rows]
+        return result, total, offset
+
+    def insert(self, tbl: str, body, params, resolution=None):
+        self._check_table(tbl)
+        rows = body if isinstance(body, list) else [body]
+        conflict = [c.strip() for c in dict(params).get("on_conflict", "").split(",") if c.strip()]
+        out = []
+        with self.lock:
+            try:
+                for row in rows:
+                    cols = list(row.keys())
+                    for c in cols + conflict:
+                        self._check_column(tbl, c)
+                    values = [int(v) if isinstance(v, bool) else v for v in row.values()]
+                    names = ",".join(f'"{c}"' for c in cols)
+                    sql = f'INSERT INTO "{tbl}" ({names}) VALUES ({",".join("?" * len(cols))})'
+                    if resolution:
+                        target = ",".join(f'"{c}"' for c in (conflict or ["id"]))
+                        if resolution == "ignore-duplicates":
+                            sql += f" ON CONFLICT ({target}) DO NOTHING"
+                        else:
+                            sets = [f'"{c}" = excluded."{c}"' for c in cols if c not in conflict]
+                            if "updated_at" in self.columns[tbl]:
+                                sets.append(f'"updated_at" = {NOW}')
+                            sql += f" ON CONFLICT ({target}) DO UPDATE SET {', '.join(sets) or 'id = id'}"
+                    sql += " RETURNING *"
+                    out += [self._row(tbl, r) for r in self.conn.execute(sql, values).fetchall()]
+                self.conn.commit()
+            except sqlite3.IntegrityError as ex:
+                self.conn.rollback()
+                raise ApiError(409, "23505", f"duplicate key value violates unique constraint ({ex})")
+        return out
+
+    def update(self, tbl: str, body: dict, params):
+        self._check_table(tbl)
+        for c in body:
+            self._check_column(tbl, c)
+        sets = [f'"{c}" = ?' for c in body]
+        values = [int(v) if isinstance(v, bool) else v for v in body.values()]
+        if "updated_at" in self.columns[tbl] and "updated_at" not in body:
+            sets.append(f'"updated_at" = {NOW}')
+        with self.lock:
+            where, args, _ = self._where(tbl, params, [])
+            try:
+                rows = self.conn.execute(f'UPDATE "{tbl}" SET {", ".join(sets)}{where} RETURNING *', values + args).fetchall()
+                self.conn.commit()
+            except sqlite3.IntegrityError as ex:
+                self.conn.rollback()
+                raise ApiError(409, "23505", f"duplicate key value violates unique constraint ({ex})")
+        return [self._row(tbl, r) for r in rows]
+
+    def delete(self, tbl: str, params):
+        self._check_table(tbl)
+        with self.lock:
+            where, args, _ = self._where(tbl, params, [])
+            rows = [self._row(tbl, r) for r in self.conn.execute(f'DELETE FROM "{tbl}"{where} RETURNING *', args).fetchall()]
+            self._after_delete(tbl, rows)
+            self.conn.commit()
+        return rows
+
+    def _after_delete(self, tbl: str, rows):
+        """Tombstone + efek relasi (translation ikut terhapus, folder_id di-NULL-kan)."""
+        if tbl == "deleted_rows" or not rows:
+            return
+        ids = [r["id"] for r in rows]
+        marks = ",".join("?" * len(ids))
+        if tbl == "vocabulary_translation":
+            owners = {r["id"]: r["user_id"] for r in self.conn.execute(
+                f"SELECT id, user_id FROM vocabulary WHERE id IN ({','.join('?' * len(rows))})", [r["vocabulary_id"] for r in rows])}
+            log = [(owners.get(r["vocabulary_id"]), tbl, r["id"]) for r in rows]
+        else:
+            log = [(r.get("user_id"), tbl, r["id"]) for r in rows]
+        self.conn.executemany("INSERT INTO deleted_rows (user_id, tbl, row_id) VALUES (?, ?, ?)", log)
+
+        if tbl == "vocabulary":
+            children = [self._row("vocabulary_translation", r) for r in self.conn.execute(
+                f"DELETE FROM vocabulary_translation WHERE vocabulary_id IN ({marks}) RETURNING *", ids).fetchall()]
+            self._after_delete("vocabulary_translation", children)
+        elif tbl == "folders":
+            for child in ("notes", "vocabulary"):
+                self.conn.execute(f"UPDATE {child} SET folder_id = NULL, updated_at = {NOW} WHERE folder_id IN ({marks})", ids)
+
+    def seed(self, tbl: str, rows):
+        """Isi cepat untuk benchmark (tanpa lewat HTTP). Return id baris baru."""
+        return [r["id"] for r in self.insert(tbl, list(rows), [])] if rows else []
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakePostgREST/1.0"
+    # header + body dikirim sekali (tanpa ini Nagle + delayed ACK menambah ~40 ms per response)
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _parse(self):
+        parts = urlsplit(self.path)
+        prefix = "/rest/v1/"
+        if not parts.path.startswith(prefix):
+            raise ApiError(404, "PGRST125", "invalid path")
+        return unquote(parts.path[len(prefix):]), parse_qsl(parts.query, keep_blank_values=True)
+
+    def _prefer(self):
+        return {p.strip() for p in (self.headers.get("Prefer") or "").split(",") if p.strip()}
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        return json.loads(raw) if raw else None
+
+    def _send(self, status: int, payload=None, headers=None, head: bool = False):
+        data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(0 if head else len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if data and not head:
+            self.wfile.write(data)
+
+    def _handle(self, method: str):
+        self.server.delay()
+        try:
+            tbl, params = self._parse()
+            prefer = self._prefer()
+            db = self.server.db
+            representation = "return=representation" in prefer
+
+            if method in ("GET", "HEAD"):
+                rows, total, offset = db.select(tbl, params, count="count=exact" in prefer, head=(method == "HEAD"))
+                end = offset + len(rows) - 1
+                span = f"{offset}-{end}" if rows else "*"
+                headers = {"Content-Range": f"{span}/{'*' if total is None else total}"}
+                self._send(200, rows, headers, head=(method == "HEAD"))
+            elif method == "POST":
+                resolution = next((p.split("=", 1)[1] for p in prefer if p.startswith("resolution=")), None)
+                rows = db.insert(tbl, self._body() or {}, params, resolution)
+                self._send(201, rows if representation else None)
+            elif method == "PATCH":
+                rows = db.update(tbl, self._body() or {}, params)
+                self._send(200 if representation else 204, rows if representation else None)
+            elif method == "DELETE":
+                rows = db.delete(tbl, params)
+                self._send(200 if representation else 204, rows if representation else None)
+        except ApiError as ex:
+            self._send(ex.status, {"code": ex.code, "message": ex.message, "details": None, "hint": None})
+        except (ValueError, json.JSONDecodeError) as ex:
+            self._send(400, {"code": "PGRST102", "message": str(ex), "details": None, "hint": None})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_HEAD(self):
+        self._handle("HEAD")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+class FakePostgrest:
+    """
+    Server lokal di thread background:
+        srv = FakePostgrest(latency_ms=20).start()
+        config / supabase_client memakai srv.url sebagai SUPABASE_URL
+        srv.stop()
+    latency_ms / jitter_ms bisa diubah saat server berjalan.
+    """
+    def __init__(self, db_path: str = ":memory:", host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 0, jitter_ms: float = 0, verbose: bool = False):
+        self.db = FakeDatabase(db_path)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.db = self.db
+        self.httpd.verbose = verbose
+        self.httpd.delay = self._delay
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _delay(self):
+        ms = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.db.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    ap = argparse.ArgumentParser(description="Server PostgREST tiruan (SQLite) untuk VocaFlow")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=54321)
+    ap.add_argument("--db", default=":memory:", help="file SQLite (default: di memori)")
+    ap.add_argument("--latency", type=float, default=0, help="latency buatan per request (ms)")
+    ap.add_argument("--jitter", type=float, default=0, help="tambahan latency acak 0..jitter (ms)")
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args()
+
+    srv = FakePostgrest(args.db, args.host, args.port, args.latency, args.jitter, args.verbose)
+    print(f"Fake PostgREST jalan di {srv.url} (set VOCAFLOW_SUPABASE_URL={srv.url})", flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.stop()
+
+if __name__ == "__main__":
+    main()
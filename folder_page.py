@@ -3,13 +3,73 @@ from PySide6.QtWidgets import (
     QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
     QMessageBox, QTabWidget, QComboBox
 )
+from collections import OrderedDict
+
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QHeaderView, QAbstractItemView
 
+from config import FOLDER_CACHE_SIZE, FOLDER_CACHE_MAX_ROWS
 from supabase_client import (
-    get_folders, insert_folder, update_folder, delete_folder,
-    get_notes, get_vocabularies, get_translations, _folder_name_from_row
+    get_folders_with_counts, insert_folder, update_folder, delete_folder,
+    get_notes, get_vocabularies_with_translations, _folder_name_from_row,
+    add_change_listener, remove_change_listener
 )
+from workers import TaskRunner, RefreshScheduler, ChangeRelay
+
+# tabel yang kalau berubah membuat isi folder di cache basi
+CONTENT_TABLES = ("folders", "notes", "vocabulary", "vocabulary_translation")
+
+def _load_folder_contents(user_id: int, folder_id: int, status):
+    # dijalankan di worker thread => jangan sentuh widget di sini
+    # 1 request per tabel: translation ikut di-embed di vocabulary, notes tanpa kolom isi
+    notes = get_notes(user_id, folder_id=folder_id, hafal=status, columns="id,judul,hafal")
+    vocabs = get_vocabularies_with_translations(user_id, folder_id=folder_id, sudah_hafal=status)
+    return notes, vocabs
+
+def _progress(hafal: int, total: int) -> str:
+    return f"{hafal}/{total} hafal" if total else "-"
+
+class FolderContentCache:
+    """
+    LRU isi folder: (folder_id, status) -> (notes, vocabs)
+    - dibatasi jumlah entri dan total baris; entri yang paling lama tidak dibuka dibuang dulu
+    - clear() menaikkan generation => hasil fetch yang dimulai sebelum clear tidak disimpan
+    Dipakai hanya dari GUI thread.
+    """
+    def __init__(self, max_entries: int = FOLDER_CACHE_SIZE, max_rows: int = FOLDER_CACHE_MAX_ROWS):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.entries = OrderedDict()
+        self.rows = 0
+        self.generation = 0
+
+    def get(self, key):
+        found = self.entries.get(key)
+        if found is not None:
+            self.entries.move_to_end(key)
+        return found
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def put(self, key, value, generation=None):
+        if generation is not None and generation != self.generation:
+            return
+        self._drop(key)
+        self.entries[key] = value
+        self.rows += len(value[0]) + len(value[1])
+        while self.entries and (len(self.entries) > self.max_entries or self.rows > self.max_rows):
+            self._drop(next(iter(self.entries)))
+
+    def _drop(self, key):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.rows -= len(old[0]) + len(old[1])
+
+    def clear(self):
+        self.entries.clear()
+        self.rows = 0
+        self.generation += 1
 
 class FolderPage(QWidget):
     def __init__(self, user_id: int, dashboard=None):
@@ -20,6 +80,15 @@ class FolderPage(QWidget):
         self.selected_folder_id = None
         self.selected_folder_row_id = None
         self.loading = False
+        self.tasks = TaskRunner(self)
+        # klik folder + ganti status dalam satu putaran event loop => satu load isi folder
+        self.refresher = RefreshScheduler(self.load_contents, parent=self)
+        # isi folder yang pernah dibuka / di-prefetch; dibuang kalau ada write ke isi folder
+        self.cache = FolderContentCache()
+        self.prefetcher = TaskRunner(self)
+        self.relay = ChangeRelay(self)
+        self.relay.changed.connect(self._on_table_changed)
+        add_change_listener(self.relay.changed.emit)
 
         self.setWindowTitle("Kategori")
         self.setup_ui()
@@ -34,6 +103,9 @@ class FolderPage(QWidget):
         self.close()
 
     def closeEvent(self, event):
+        remove_change_listener(self.relay.changed.emit)
+        self.tasks.cancel_all()
+        self.prefetcher.cancel_all()
         if self.dashboard is not None:
             self.dashboard.show()
         event.accept()
@@ -102,8 +174,8 @@ class FolderPage(QWidget):
         layout.addWidget(folders_title)
 
         self.tbl_folders = QTableWidget()
-        self.tbl_folders.setColumnCount(2)
-        self.tbl_folders.setHorizontalHeaderLabels(["ID", "Nama"])
+        self.tbl_folders.setColumnCount(4)
+        self.tbl_folders.setHorizontalHeaderLabels(["ID", "Nama", "Hafalan Bebas", "Kosakata"])
         self.tbl_folders.cellClicked.connect(self.on_select_folder)
         self._setup_table_base(self.tbl_folders)
 
@@ -112,7 +184,7 @@ class FolderPage(QWidget):
         # filter status
         self.cmb_status = QComboBox()
         self.cmb_status.addItems(["Semua", "Belum Hafal", "Sudah Hafal"])
-        self.cmb_status.currentIndexChanged.connect(self.load_contents)
+        self.cmb_status.currentIndexChanged.connect(self.refresher.request)
 
         statusbar = QHBoxLayout()
         statusbar.addWidget(QLabel("Filter status isi:"))
@@ -139,18 +211,22 @@ class FolderPage(QWidget):
         self.setLayout(layout)
 
     def load_folders(self):
+        self.tasks.run("folders", get_folders_with_counts, self.user_id, on_done=self._fill_folders)
+
+    def _fill_folders(self, folders):
         self.tbl_folders.setRowCount(0)
-        folders = get_folders(self.user_id)
         for row, f in enumerate(folders):
             self.tbl_folders.insertRow(row)
             self.tbl_folders.setItem(row, 0, QTableWidgetItem(str(f.get("id"))))
             self.tbl_folders.setItem(row, 1, QTableWidgetItem(_folder_name_from_row(f)))
+            self.tbl_folders.setItem(row, 2, QTableWidgetItem(_progress(f.get("notes_hafal", 0), f.get("notes_total", 0))))
+            self.tbl_folders.setItem(row, 3, QTableWidgetItem(_progress(f.get("vocab_hafal", 0), f.get("vocab_total", 0))))
 
     def on_select_folder(self, row, col):
         self.selected_folder_id = int(self.tbl_folders.item(row, 0).text())
         self.selected_folder_row_id = self.selected_folder_id
         self.txt_name.setText(self.tbl_folders.item(row, 1).text())
-        self.load_contents()
+        self.refresher.request()
 
     def _status_bool(self):
         t = self.cmb_status.currentText()
@@ -162,13 +238,60 @@ class FolderPage(QWidget):
 
     def load_contents(self):
         if self.selected_folder_id is None:
+            self.tasks.cancel("contents")
             self.tbl_notes.setRowCount(0)
             self.tbl_vocab.setRowCount(0)
             return
 
-        st = self._status_bool()
+        key = (self.selected_folder_id, self._status_bool())
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.tasks.cancel("contents")
+            self._fill_contents(cached)
+        elif self.prefetcher.is_running(key):
+            # sedang di-prefetch => tunggu hasil itu saja (_on_prefetched yang menampilkan)
+            self.tasks.cancel("contents")
+        else:
+            self.tasks.run("contents", _load_folder_contents, self.user_id, *key,
+                           on_done=lambda result, gen=self.cache.generation: self._on_loaded(key, gen, result))
+        self._prefetch_adjacent(key)
+
+    def _on_loaded(self, key, generation, result):
+        self.cache.put(key, result, generation)
+        self._fill_contents(result)
+
+    def _prefetch_adjacent(self, key):
+        """Folder di atas & bawah folder terpilih (filter status sama) diambil di background."""
+        folder_id, status = key
+        ids = [int(self.tbl_folders.item(r, 0).text()) for r in range(self.tbl_folders.rowCount())]
+        if folder_id not in ids:
+            return
+        row = ids.index(folder_id)
+        for r in (row + 1, row - 1):
+            if not 0 <= r < len(ids):
+                continue
+            near = (ids[r], status)
+            if near in self.cache or self.prefetcher.is_running(near):
+                continue
+            self.prefetcher.run(near, _load_folder_contents, self.user_id, *near,
+                           on_done=lambda result, near=near, gen=self.cache.generation: self._on_prefetched(near, gen, result))
+
+    def _on_prefetched(self, key, generation, result):
+        self.cache.put(key, result, generation)
+        if generation == self.cache.generation and key == (self.selected_folder_id, self._status_bool()):
+            self._fill_contents(result)
+
+    def _on_table_changed(self, tbl: str):
+        if tbl not in CONTENT_TABLES:
+            return
+        self.cache.clear()
+        # prefetch yang sedang jalan sudah basi
+        self.prefetcher.cancel_all()
+        self.load_folders()
+        self.refresher.request()
 
-        notes = get_notes(self.user_id, folder_id=self.selected_folder_id, hafal=st)
+    def _fill_contents(self, result):
+        notes, vocabs = result
         self.tbl_notes.setRowCount(0)
         for r, n in enumerate(notes):
             self.tbl_notes.insertRow(r)
@@ -176,13 +299,12 @@ class FolderPage(QWidget):
             self.tbl_notes.setItem(r, 1, QTableWidgetItem(n.get("judul") or ""))
             self.tbl_notes.setItem(r, 2, QTableWidgetItem("✓" if n.get("hafal") else ""))
 
-        vocabs = get_vocabularies(self.user_id, folder_id=self.selected_folder_id, sudah_hafal=st)
         self.tbl_vocab.setRowCount(0)
         for r, v in enumerate(vocabs):
             self.tbl_vocab.insertRow(r)
             self.tbl_vocab.setItem(r, 0, QTableWidgetItem(str(v.get("id"))))
 
-            trans = get_translations(v.get("id"))
+            trans = v.get("vocabulary_translation") or []
             m = {t.get("bahasa"): t.get("kosakata") for t in trans}
             self.tbl_vocab.setItem(r, 1, QTableWidgetItem(m.get("Indonesia", "")))
             self.tbl_vocab.setItem(r, 2, QTableWidgetItem(m.get("Inggris", "")))
@@ -193,7 +315,9 @@ class FolderPage(QWidget):
         if not name:
             QMessageBox.warning(self, "Peringatan", "Nama folder wajib diisi")
             return
-        resp = insert_folder(self.user_id, name)
+        self.tasks.run(None, insert_folder, self.user_id, name, on_done=self._after_insert)
+
+    def _after_insert(self, resp: dict):
         if not resp.get("ok"):
             QMessageBox.critical(self, "Gagal", f"Gagal insert folder.\n{resp.get('error')}")
             return
@@ -207,7 +331,9 @@ class FolderPage(QWidget):
         if not name:
             QMessageBox.warning(self, "Peringatan", "Nama folder wajib diisi")
             return
-        resp = update_folder(self.selected_folder_row_id, name)
+        self.tasks.run(None, update_folder, self.selected_folder_row_id, name, on_done=self._after_update)
+
+    def _after_update(self, resp: dict):
         if not resp.get("ok"):
             QMessageBox.critical(self, "Gagal", f"Gagal update folder.\n{resp.get('error')}")
             return
@@ -216,9 +342,8 @@ class FolderPage(QWidget):
     def delete_folder(self):
         if self.selected_folder_row_id is None:
             return
-        delete_folder(self.selected_folder_row_id)
+        self.tasks.run(None, delete_folder, self.selected_folder_row_id, on_done=lambda _: self.load_folders())
         self.selected_folder_row_id = None
         self.selected_folder_id = None
         self.txt_name.clear()
-        self.load_folders()
-        self.load_contents()
+        self.refresher.request()
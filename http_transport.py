@@ -0,0 +1,169 @@
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+    HTTP_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX, HTTP_RETRY_AFTER_MAX,
+    BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT,
+)
+
+# error jaringan (tidak bisa connect, timeout, koneksi putus)
+TransportError = requests.RequestException
+
+class CircuitOpenError(requests.ConnectionError):
+    """Circuit breaker terbuka: backend dianggap mati, request tidak dikirim."""
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE", "PATCH")
+RETRY_STATUS = (429, 502, 503, 504)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """
+    - closed    : normal
+    - open      : setelah failure_threshold kegagalan beruntun (error jaringan / 5xx);
+                  request langsung ditolak (CircuitOpenError) tanpa menunggu timeout
+    - half_open : setelah reset_timeout detik, satu request percobaan boleh lewat;
+                  berhasil => closed, gagal => open lagi
+    """
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def state(self) -> str:
+        with self.lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def info(self) -> dict:
+        with self.lock:
+            retry_in = None
+            if self.opened_at is not None:
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            return {"state": self._state(), "failures": self.failures, "retry_in": retry_in}
+
+    def allow(self):
+        with self.lock:
+            state = self._state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return
+        raise CircuitOpenError("backend tidak tersedia (circuit breaker terbuka)")
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+def _retry_after(resp) -> float:
+    """Isi header Retry-After (detik atau tanggal HTTP) dalam detik, None kalau tidak ada."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class SupabaseTransport:
+    """
+    Transport HTTP bersama untuk semua helper di supabase_client:
+    - satu requests.Session => koneksi TCP/TLS dipakai ulang (keep-alive)
+    - connection pool dengan ukuran yang bisa diatur
+    - timeout default (connect, read) yang bisa di-override per request
+    - retry dengan exponential backoff + jitter untuk request idempoten
+      (gagal connect / koneksi putus, 429, 502/503/504), menghormati Retry-After;
+      read timeout tidak diulang (server lambat => menunggu lagi hanya memperpanjang hang)
+    - circuit breaker: saat backend mati request langsung gagal (lihat breaker.info())
+    """
+    def __init__(self, headers=None, pool_size: int = HTTP_POOL_SIZE,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT, read_timeout: float = HTTP_READ_TIMEOUT,
+                 retries: int = HTTP_RETRIES, breaker=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, timeout=None, idempotent=None, **kwargs):
+        """
+        idempotent: None => ditentukan dari method; True untuk POST yang aman diulang (upsert).
+        Error koneksi (belum terkirim) selalu boleh diulang.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            self.breaker.allow()
+            try:
+                resp = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except TransportError as ex:
+                self.breaker.record_failure()
+                # ReadTimeout bukan ConnectionError => langsung gagal, total tunggu tetap ~read timeout
+                retryable = isinstance(ex, requests.ConnectionError)
+                safe = idempotent or isinstance(ex, requests.ConnectTimeout)
+                if not retryable or not safe or attempt >= self.retries:
+                    raise
+                self._sleep(attempt)
+                attempt += 1
+                continue
+
+            if resp.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+            if resp.status_code in RETRY_STATUS and idempotent and attempt < self.retries:
+                wait = _retry_after(resp)
+                if wait is not None and wait > HTTP_RETRY_AFTER_MAX:
+                    return resp
+                self._sleep(attempt, wait)
+                attempt += 1
+                continue
+            return resp
+
+    def _sleep(self, attempt: int, wait=None):
+        if wait is None:
+            # full jitter: acak 0..min(max, base * 2^attempt)
+            wait = random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+        time.sleep(wait)
+
+    def close(self):
+        self.session.close()
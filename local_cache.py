@@ -0,0 +1,319 @@
+import os
+import json
+import sqlite3
+import threading
+
+from records import loads
+
+# ==================================================
+# Replika lokal (SQLite) data milik satu user
+# semua tabel disimpan di satu tabel "rows":
+# - tbl        : nama tabel Supabase
+# - id         : id baris
+# - folder_id  : untuk filter folder (notes, vocabulary)
+# - parent_id  : vocabulary_id (vocabulary_translation)
+# - flag       : hafal / sudah_hafal / selesai
+# - due        : srs_due (notes, vocabulary) untuk antrian review
+# - data       : baris lengkap (JSON)
+# ==================================================
+TABLES = ("folders", "notes", "vocabulary", "vocabulary_translation", "reminders")
+
+FLAG_COLUMN = {
+    "notes": "hafal",
+    "vocabulary": "sudah_hafal",
+    "reminders": "selesai",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    tbl TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    folder_id INTEGER,
+    parent_id INTEGER,
+    flag INTEGER,
+    due TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (tbl, id)
+);
+CREATE INDEX IF NOT EXISTS idx_rows_folder ON rows (tbl, folder_id);
+CREATE INDEX IF NOT EXISTS idx_rows_parent ON rows (tbl, parent_id);
+CREATE TABLE IF NOT EXISTS loaded (
+    tbl TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    tbl TEXT PRIMARY KEY,
+    updated_wm TEXT,
+    deleted_wm TEXT,
+    synced_at REAL NOT NULL DEFAULT 0
+);
+"""
+
+def app_data_dir() -> str:
+    # Windows: %APPDATA%\\VocaFlow, lainnya: ~/.local/share/VocaFlow
+    base = os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    path = os.path.join(base, "VocaFlow")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def cache_path(user_id: int) -> str:
+    return os.path.join(app_data_dir(), f"cache_user_{user_id}.sqlite3")
+
+class LocalReplica:
+    """
+    Cache read-through untuk folders, notes, vocabulary, vocabulary_translation, reminders.
+    - tabel diisi penuh sekali dari server (replace_all), setelah itu baca dari sini
+    - sync_state menyimpan high-water mark per tabel (updated_at & deleted_at terakhir)
+      supaya sync berikutnya cukup ambil baris yang berubah
+    - write tetap ke Supabase, hasilnya di-upsert / dihapus di sini
+    Aman dipakai dari beberapa thread (satu koneksi + lock).
+    """
+    def __init__(self, user_id: int, path=None):
+        self.user_id = user_id
+        self.path = path or cache_path(user_id)
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.commit()
+
+    def _migrate(self):
+        # cache lama (sebelum ada srs) belum punya kolom due
+        cols = [x[1] for x in self.conn.execute("PRAGMA table_info(rows)").fetchall()]
+        if "due" not in cols:
+            self.conn.execute("ALTER TABLE rows ADD COLUMN due TEXT")
+            self.conn.execute("UPDATE rows SET due = json_extract(data, '$.srs_due')")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_rows_due ON rows (tbl, due, id)")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # -------------------------
+    # status load
+    # -------------------------
+    def is_loaded(self, tbl: str) -> bool:
+        with self.lock:
+            cur = self.conn.execute("SELECT 1 FROM loaded WHERE tbl = ?", (tbl,))
+            return cur.fetchone() is not None
+
+    def invalidate(self, *tables):
+        """Tandai tabel perlu diambil ulang dari server (tanpa argumen = semua)."""
+        tables = tables or TABLES
+        with self.lock:
+            self.conn.executemany("DELETE FROM loaded WHERE tbl = ?", [(t,) for t in tables])
+            self.conn.executemany("DELETE FROM sync_state WHERE tbl = ?", [(t,) for t in tables])
+            self.conn.commit()
+
+    def get_sync_state(self, tbl: str):
+        """(updated_wm, deleted_wm, synced_at) — watermark None kalau belum pernah sync."""
+        with self.lock:
+            cur = self.conn.execute("SELECT updated_wm, deleted_wm, synced_at FROM sync_state WHERE tbl = ?", (tbl,))
+            found = cur.fetchone()
+            return found if found is not None else (None, None, 0.0)
+
+    def set_sync_state(self, tbl: str, updated_wm, deleted_wm, synced_at: float):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state (tbl, updated_wm, deleted_wm, synced_at) VALUES (?, ?, ?, ?)",
+                (tbl, updated_wm, deleted_wm, synced_at),
+            )
+            self.conn.commit()
+
+    def replace_all(self, tbl: str, rows):
+        """Ganti seluruh isi tabel dengan hasil fetch penuh dari server."""
+        with self.lock:
+            self.conn.execute("DELETE FROM rows WHERE tbl = ?", (tbl,))
+            self._upsert(tbl, rows)
+            self.conn.execute("INSERT OR IGNORE INTO loaded (tbl) VALUES (?)", (tbl,))
+            self.conn.commit()
+
+    # -------------------------
+    # write
+    # -------------------------
+    def _upsert(self, tbl: str, rows):
+        flag_col = FLAG_COLUMN.get(tbl)
+        values = []
+        for row in rows:
+            if row.get("id") is None:
+                continue
+            flag = row.get(flag_col) if flag_col else None
+            values.append((
+                tbl,
+                int(row["id"]),
+                row.get("folder_id"),
+                row.get("vocabulary_id"),
+                None if flag is None else int(bool(flag)),
+                row.get("srs_due"),
+                json.dumps(row),
+            ))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO rows (tbl, id, folder_id, parent_id, flag, due, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            values,
+        )
+
+    def upsert(self, tbl: str, rows):
+        if not rows:
+            return
+        with self.lock:
+            self._upsert(tbl, rows)
+            self.conn.commit()
+
+    def patch(self, tbl: str, row_id: int, data: dict):
+        """Gabungkan data ke baris yang sudah ada (kalau ada)."""
+        with self.lock:
+            cur = self.conn.execute("SELECT data FROM rows WHERE tbl = ? AND id = ?", (tbl, int(row_id)))
+            found = cur.fetchone()
+            if found is None:
+                return
+            row = loads(found[0])
+            row.update(data)
+            self._upsert(tbl, [row])
+            self.conn.commit()
+
+    def patch_many(self, tbl: str, row_ids, data: dict):
+        with self.lock:
+            for row_id in row_ids:
+                cur = self.conn.execute("SELECT data FROM rows WHERE tbl = ? AND id = ?", (tbl, int(row_id)))
+                found = cur.fetchone()
+                if found is None:
+                    continue
+                row = loads(found[0])
+                row.update(data)
+                self._upsert(tbl, [row])
+            self.conn.commit()
+
+    def delete(self, tbl: str, row_id: int):
+        with self.lock:
+            self.conn.execute("DELETE FROM rows WHERE tbl = ? AND id = ?", (tbl, int(row_id)))
+            if tbl == "vocabulary":
+                self.conn.execute("DELETE FROM rows WHERE tbl = 'vocabulary_translation' AND parent_id = ?", (int(row_id),))
+            self.conn.commit()
+
+    def delete_many(self, tbl: str, row_ids):
+        for row_id in row_ids:
+            self.delete(tbl, row_id)
+
+    def retain(self, tbl: str, keep_ids):
+        """Hapus baris yang id-nya tidak ada di keep_ids (rekonsiliasi tanpa tombstone)."""
+        gone = [x for x in self.ids(tbl) if x not in keep_ids]
+        self.delete_many(tbl, gone)
+
+    # -------------------------
+    # read
+    # -------------------------
+    def ids(self, tbl: str):
+        with self.lock:
+            cur = self.conn.execute("SELECT id FROM rows WHERE tbl = ?", (tbl,))
+            return [x[0] for x in cur.fetchall()]
+
+    def get(self, tbl: str, row_id: int):
+        with self.lock:
+            found = self.conn.execute("SELECT data FROM rows WHERE tbl = ? AND id = ?", (tbl, int(row_id))).fetchone()
+            return loads(found[0]) if found is not None else None
+
+    def _where(self, tbl: str, folder_id=None, flag=None, parent_id=None, before_id=None, langs=()):
+        sql = " WHERE tbl = ?"
+        args = [tbl]
+
+        if folder_id == "NO_FOLDER":
+            sql += " AND folder_id IS NULL"
+        elif isinstance(folder_id, int):
+            sql += " AND folder_id = ?"
+            args.append(folder_id)
+
+        if flag is True:
+            sql += " AND flag = 1"
+        elif flag is False:
+            sql += " AND (flag = 0 OR flag IS NULL)"
+
+        if parent_id is not None:
+            sql += " AND parent_id = ?"
+            args.append(int(parent_id))
+
+        if before_id is not None:
+            sql += " AND id < ?"
+            args.append(int(before_id))
+
+        # vocabulary yang punya translation untuk setiap bahasa di langs
+        for lang in langs:
+            sql += (" AND id IN (SELECT parent_id FROM rows WHERE tbl = 'vocabulary_translation'"
+                    " AND json_extract(data, '$.bahasa') = ?)")
+            args.append(lang)
+        return sql, args
+
+    def select(self, tbl: str, folder_id=None, flag=None, parent_id=None, descending: bool = True,
+               before_id=None, limit=None, offset=None, langs=()):
+        """
+        folder_id: None => semua, "NO_FOLDER" => IS NULL, int => sama dengan
+        flag: None => semua, True/False => filter kolom hafal/sudah_hafal/selesai
+        parent_id: filter vocabulary_id (khusus vocabulary_translation)
+        before_id/limit: halaman keyset (id < before_id), urut id.desc
+        offset: lewati n baris pertama (dipakai bersama limit)
+        langs: khusus vocabulary, hanya yang punya translation semua bahasa ini
+        """
+        where, args = self._where(tbl, folder_id, flag, parent_id, before_id, langs)
+        sql = "SELECT data FROM rows" + where
+        sql += " ORDER BY id DESC" if descending else " ORDER BY id ASC"
+
+        if limit is not None or offset is not None:
+            sql += " LIMIT ? OFFSET ?"
+            args += [-1 if limit is None else int(limit), int(offset or 0)]
+
+        with self.lock:
+            cur = self.conn.execute(sql, args)
+            return [loads(x[0]) for x in cur.fetchall()]
+
+    def count(self, tbl: str, folder_id=None, flag=None, parent_id=None, langs=()) -> int:
+        where, args = self._where(tbl, folder_id, flag, parent_id, langs=langs)
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM rows" + where, args).fetchone()[0]
+
+    def count_by_folder(self, tbl: str):
+        """{folder_id: (jumlah, jumlah flag=1)} untuk notes / vocabulary, satu GROUP BY."""
+        with self.lock:
+            cur = self.conn.execute(
+                "SELECT folder_id, COUNT(*), SUM(flag = 1) FROM rows WHERE tbl = ? AND folder_id IS NOT NULL GROUP BY folder_id",
+                (tbl,),
+            )
+            return {fid: (total, flagged or 0) for fid, total, flagged in cur.fetchall()}
+
+    def select_due(self, tbl: str, today: str, limit: int, after=None, langs=()):
+        """
+        Antrian review: baris dengan due <= today (NULL = belum pernah direview => jatuh tempo),
+        urut due.asc (NULL dulu) lalu id.asc.
+        after: (due, id) baris terakhir halaman sebelumnya => halaman berikutnya (keyset)
+        """
+        where, args = self._where(tbl, langs=langs)
+        sql = "SELECT data FROM rows" + where + " AND (due IS NULL OR due <= ?)"
+        args.append(today)
+        if after is not None:
+            due, last_id = after
+            if due is None:
+                sql += " AND ((due IS NULL AND id > ?) OR due IS NOT NULL)"
+                args.append(int(last_id))
+            else:
+                sql += " AND due IS NOT NULL AND (due > ? OR (due = ? AND id > ?))"
+                args += [due, due, int(last_id)]
+        sql += " ORDER BY due IS NOT NULL, due, id LIMIT ?"
+        args.append(int(limit))
+        with self.lock:
+            return [loads(x[0]) for x in self.conn.execute(sql, args).fetchall()]
+
+    def translations_by_vocab(self, vocab_ids=None):
+        """{vocabulary_id: [translation, ...]} urut id.asc (vocab_ids None => semua)."""
+        if vocab_ids is None:
+            rows = self.select("vocabulary_translation", descending=False)
+        else:
+            rows = []
+            ids = [int(x) for x in vocab_ids]
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                sql = ("SELECT data FROM rows WHERE tbl = 'vocabulary_translation' AND parent_id IN (%s) ORDER BY id ASC"
+                       % ",".join("?" * len(chunk)))
+                with self.lock:
+                    rows.extend(loads(x[0]) for x in self.conn.execute(sql, chunk).fetchall())
+
+        result = {}
+        for t in rows:
+            result.setdefault(t.get("vocabulary_id"), []).append(t)
+        return result
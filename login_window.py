@@ -1,6 +1,7 @@
 from PySide6.QtWidgets import QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QMessageBox, QHBoxLayout
 from PySide6.QtCore import Qt
 from supabase_client import select_user
+from workers import TaskRunner
 
 class LoginWindow(QWidget):
     def __init__(self, welcome=None):
@@ -8,6 +9,7 @@ class LoginWindow(QWidget):
         self.setWindowTitle("Login")
         self.welcome = welcome
         self.dashboard = None
+        self.tasks = TaskRunner(self)
         self.setup_ui()
         self.resize(520, 360)
         self.setMinimumSize(480, 320)
@@ -34,6 +36,7 @@ class LoginWindow(QWidget):
         layout.addWidget(self.txt_password)
 
         btn_login = QPushButton("Login")
+        self.btn_login = btn_login
         btn_back = QPushButton("← Kembali")
 
         btn_login.setProperty("class", "primary")
@@ -66,7 +69,17 @@ class LoginWindow(QWidget):
             QMessageBox.warning(self, "Peringatan", "Username dan password wajib diisi")
             return
 
-        rows = select_user(username, password)
+        # hashing PBKDF2 + request ke server => jalan di background
+        self.btn_login.setEnabled(False)
+        self.tasks.run("login", select_user, username, password,
+                       on_done=self._on_login_result, on_error=self._on_login_error)
+
+    def _on_login_error(self, tb: str):
+        self.btn_login.setEnabled(True)
+        QMessageBox.critical(self, "Gagal", "Login gagal. Tidak bisa terhubung ke server.")
+
+    def _on_login_result(self, rows):
+        self.btn_login.setEnabled(True)
         if not rows:
             QMessageBox.critical(self, "Gagal", "Login gagal. Cek username/password.")
             return
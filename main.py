@@ -85,7 +85,7 @@ QPushButton[class="ghost"] {
 }
 
 /* Tables */
-QTableWidget {
+QTableView {
     background: rgba(255,255,255,0.55);
     border: 1px solid rgba(137,152,109,0.65);
     border-radius: 12px;
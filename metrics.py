@@ -0,0 +1,146 @@
+import json
+import time
+import bisect
+import threading
+from collections import deque
+
+# ==================================================
+# Metrik request (in-process)
+# - setiap request supabase_client dicatat: tabel, method, status, bytes, durasi, halaman
+# - halaman pemanggil diambil dari konteks thread (diset TaskRunner per job)
+# - ringkasan p50/p95/p99 + export JSON / Prometheus text
+# ==================================================
+
+# batas bucket histogram durasi (detik), format Prometheus
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# jumlah durasi terakhir per seri yang disimpan untuk menghitung persentil
+SAMPLE_SIZE = 2000
+
+_context = threading.local()
+
+def set_page(name):
+    """Tandai halaman pemanggil untuk request di thread ini (None => hapus)."""
+    _context.page = name
+
+def current_page() -> str:
+    return getattr(_context, "page", None) or "-"
+
+def _percentile(sorted_values, q: float):
+    if not sorted_values:
+        return None
+    i = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[i]
+
+class _Series:
+    __slots__ = ("count", "errors", "bytes", "total", "buckets", "samples", "statuses")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.total = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+        self.statuses = {}
+
+class MetricsRegistry:
+    """Kumpulan seri per (halaman, tabel, method). Aman dipakai dari beberapa thread."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+        self.started_at = time.time()
+
+    def record(self, table: str, method: str, status, nbytes: int, duration: float, page=None):
+        key = (page or current_page(), table, method)
+        with self.lock:
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = _Series()
+            s.count += 1
+            s.bytes += nbytes or 0
+            s.total += duration
+            if not isinstance(status, int) or status >= 400:
+                s.errors += 1
+            s.statuses[str(status)] = s.statuses.get(str(status), 0) + 1
+            i = bisect.bisect_left(BUCKETS, duration)
+            if i < len(BUCKETS):
+                s.buckets[i] += 1
+            s.samples.append(duration)
+
+    def reset(self):
+        with self.lock:
+            self.series = {}
+            self.started_at = time.time()
+
+    def summary(self):
+        """List dict per seri (urut jumlah request terbanyak), durasi dalam ms."""
+        rows = []
+        with self.lock:
+            items = [(k, s.count, s.errors, s.bytes, s.total, sorted(s.samples), dict(s.statuses))
+                     for k, s in self.series.items()]
+        for (page, table, method), count, errors, nbytes, total, samples, statuses in items:
+            rows.append({
+                "page": page,
+                "table": table,
+                "method": method,
+                "count": count,
+                "errors": errors,
+                "bytes": nbytes,
+                "avg_ms": round(total / count * 1000, 1) if count else None,
+                "p50_ms": _ms(_percentile(samples, 0.50)),
+                "p95_ms": _ms(_percentile(samples, 0.95)),
+                "p99_ms": _ms(_percentile(samples, 0.99)),
+                "statuses": statuses,
+            })
+        rows.sort(key=lambda r: -r["count"])
+        return rows
+
+    def to_json(self, indent=2) -> str:
+        return json.dumps({"since": self.started_at, "series": self.summary()}, indent=indent)
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP vocaflow_http_requests_total Jumlah request ke Supabase.",
+            "# TYPE vocaflow_http_requests_total counter",
+        ]
+        with self.lock:
+            items = [(k, s.count, s.bytes, s.total, list(s.buckets), dict(s.statuses)) for k, s in self.series.items()]
+
+        for (page, table, method), _, _, _, _, statuses in items:
+            for status, n in sorted(statuses.items()):
+                lines.append(f"vocaflow_http_requests_total{{{_labels(page, table, method)},status=\"{status}\"}} {n}")
+
+        lines += [
+            "# HELP vocaflow_http_response_bytes_total Total byte response.",
+            "# TYPE vocaflow_http_response_bytes_total counter",
+        ]
+        for (page, table, method), _, nbytes, _, _, _ in items:
+            lines.append(f"vocaflow_http_response_bytes_total{{{_labels(page, table, method)}}} {nbytes}")
+
+        lines += [
+            "# HELP vocaflow_http_request_duration_seconds Durasi request.",
+            "# TYPE vocaflow_http_request_duration_seconds histogram",
+        ]
+        for (page, table, method), count, _, total, buckets, _ in items:
+            labels = _labels(page, table, method)
+            cumulative = 0
+            for le, n in zip(BUCKETS, buckets):
+                cumulative += n
+                lines.append(f"vocaflow_http_request_duration_seconds_bucket{{{labels},le=\"{le}\"}} {cumulative}")
+            lines.append(f"vocaflow_http_request_duration_seconds_bucket{{{labels},le=\"+Inf\"}} {count}")
+            lines.append(f"vocaflow_http_request_duration_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"vocaflow_http_request_duration_seconds_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(page, table, method) -> str:
+    return f"page=\"{_escape(page)}\",table=\"{_escape(table)}\",method=\"{_escape(method)}\""
+
+# registry global yang dipakai supabase_client
+registry = MetricsRegistry()
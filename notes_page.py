@@ -1,15 +1,18 @@
+from functools import partial
+
 from PySide6.QtWidgets import (
     QWidget, QLabel, QLineEdit, QTextEdit, QPushButton,
     QVBoxLayout, QHBoxLayout, QFormLayout, QMessageBox,
-    QComboBox, QTableWidget, QTableWidgetItem
+    QComboBox, QTableView
 )
-from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QHeaderView, QAbstractItemView
 
 from supabase_client import (
-    get_notes, insert_note, update_note, delete_note,
-    set_note_hafal, get_folders, _folder_name_from_row
+    get_notes, get_note_isi, insert_note, update_note, delete_note,
+    set_notes_hafal, get_folders, _folder_name_from_row, NOTE_LIST_COLUMNS
 )
+from workers import TaskRunner, WriteBuffer, RefreshScheduler
+from table_models import RecordTableModel, PagedTableLoader, CHECK
 
 class NotesPage(QWidget):
     def __init__(self, user_id: int, dashboard=None):
@@ -17,12 +20,19 @@ class NotesPage(QWidget):
         self.user_id = user_id
         self.dashboard = dashboard
         self.selected_id = None
-        self.loading_table = False
+        # tabel hanya memuat preview isi; isi lengkap diambil saat baris dibuka
+        self.body_loaded = False
+        self.tasks = TaskRunner(self)
+        # toggle checkbox dikumpulkan lalu dikirim sekaligus
+        self.hafal_writes = WriteBuffer(self.tasks, set_notes_hafal, parent=self)
 
         self.setWindowTitle("Hafalan Bebas")
+        # semua pemicu reload (combo filter, Refresh, setelah write) digabung jadi satu load
+        self.refresher = RefreshScheduler(self.load_data, parent=self)
+
         self.setup_ui()
         self.load_folders()
-        self.load_data()
+        self.refresher.request()
 
         self.resize(1100, 760)
         self.setMinimumSize(1000, 680)
@@ -33,11 +43,13 @@ class NotesPage(QWidget):
         self.close()
 
     def closeEvent(self, event):
+        self.hafal_writes.flush()
+        self.tasks.cancel_all()
         if self.dashboard is not None:
             self.dashboard.show()
         event.accept()
 
-    def _setup_table_base(self, tbl: QTableWidget):
+    def _setup_table_base(self, tbl: QTableView):
         tbl.setAlternatingRowColors(True)
         tbl.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         tbl.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
@@ -71,10 +83,10 @@ class NotesPage(QWidget):
 
         btn_refresh = QPushButton("Refresh")
         btn_refresh.setProperty("class", "secondary")
-        btn_refresh.clicked.connect(self.load_data)
+        btn_refresh.clicked.connect(self.refresher.request)
 
-        self.cmb_filter_folder.currentIndexChanged.connect(self.load_data)
-        self.cmb_filter_status.currentIndexChanged.connect(self.load_data)
+        self.cmb_filter_folder.currentIndexChanged.connect(self.refresher.request)
+        self.cmb_filter_status.currentIndexChanged.connect(self.refresher.request)
 
         filterbar = QHBoxLayout()
         filterbar.addWidget(QLabel("Folder:"))
@@ -132,11 +144,21 @@ class NotesPage(QWidget):
         table_title.setObjectName("SectionTitle")
         layout.addWidget(table_title)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["ID", "FolderID", "Judul", "Isi", "Hafal", "Created"])
-        self.table.cellDoubleClicked.connect(self.on_double_click)
-        self.table.itemChanged.connect(self.on_item_changed)
+        self.model = RecordTableModel([
+            ("ID", "id"),
+            ("FolderID", "folder_id"),
+            ("Judul", "judul"),
+            ("Isi", "isi_preview"),
+            ("Hafal", "hafal", CHECK),
+            ("Created", "created_at"),
+        ], self)
+        self.model.checkToggled.connect(self.on_hafal_toggled)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.doubleClicked.connect(self.on_double_click)
+        self.pager = PagedTableLoader(self.table, self.model, self.tasks, parent=self)
 
         self._setup_table_base(self.table)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
@@ -145,19 +167,28 @@ class NotesPage(QWidget):
         self.setLayout(layout)
 
     def load_folders(self):
-        self.cmb_folder.clear()
-        self.cmb_filter_folder.clear()
+        self.tasks.run("folders", get_folders, self.user_id, on_done=self._fill_folders)
+
+    def _fill_folders(self, folders):
+        # clear/addItem tidak memicu reload; pilihan lama dipertahankan kalau foldernya masih ada
+        with self.refresher.populating(self.cmb_filter_folder):
+            form_folder = self.cmb_folder.currentData()
+            filter_folder = self.cmb_filter_folder.currentData()
+            self.cmb_folder.clear()
+            self.cmb_filter_folder.clear()
+
+            self.cmb_folder.addItem("Tanpa Folder", None)
+            self.cmb_filter_folder.addItem("Semua", None)
+            self.cmb_filter_folder.addItem("Tanpa Folder", "NO_FOLDER")
 
-        self.cmb_folder.addItem("Tanpa Folder", None)
-        self.cmb_filter_folder.addItem("Semua", None)
-        self.cmb_filter_folder.addItem("Tanpa Folder", "NO_FOLDER")
+            for f in folders:
+                fid = f.get("id")
+                name = _folder_name_from_row(f)
+                self.cmb_folder.addItem(name, fid)
+                self.cmb_filter_folder.addItem(name, fid)
 
-        folders = get_folders(self.user_id)
-        for f in folders:
-            fid = f.get("id")
-            name = _folder_name_from_row(f)
-            self.cmb_folder.addItem(name, fid)
-            self.cmb_filter_folder.addItem(name, fid)
+            self.cmb_folder.setCurrentIndex(max(0, self.cmb_folder.findData(form_folder)))
+            self.cmb_filter_folder.setCurrentIndex(max(0, self.cmb_filter_folder.findData(filter_folder)))
 
     def _status_to_bool(self, text: str):
         if text == "Belum Hafal":
@@ -170,68 +201,48 @@ class NotesPage(QWidget):
         folder_filter = self.cmb_filter_folder.currentData()
         status_filter = self._status_to_bool(self.cmb_filter_status.currentText())
 
-        self.loading_table = True
-        self.table.setRowCount(0)
-
-        data = get_notes(self.user_id, folder_id=folder_filter, hafal=status_filter)
-
-        for row, n in enumerate(data):
-            self.table.insertRow(row)
-
-            it_id = QTableWidgetItem(str(n.get("id")))
-            it_id.setFlags(it_id.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row, 0, it_id)
-
-            folder_text = "" if n.get("folder_id") is None else str(n.get("folder_id"))
-            it_folder = QTableWidgetItem(folder_text)
-            it_folder.setFlags(it_folder.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row, 1, it_folder)
+        self.pager.reset(partial(get_notes, self.user_id, folder_filter, status_filter,
+                                 columns=NOTE_LIST_COLUMNS, preview=True))
 
-            it_j = QTableWidgetItem(n.get("judul") or "")
-            it_j.setFlags(it_j.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row, 2, it_j)
+    def on_double_click(self, index):
+        row = index.row()
+        self.selected_id = self.model.row_id(row)
+        self.txt_judul.setText(self.model.value(row, "judul") or "")
+        self._load_body(self.selected_id)
 
-            it_i = QTableWidgetItem(n.get("isi") or "")
-            it_i.setFlags(it_i.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row, 3, it_i)
-
-            it_h = QTableWidgetItem("")
-            it_h.setFlags((it_h.flags() | Qt.ItemIsUserCheckable) & ~Qt.ItemIsEditable)
-            it_h.setCheckState(Qt.Checked if n.get("hafal") else Qt.Unchecked)
-            self.table.setItem(row, 4, it_h)
-
-            it_c = QTableWidgetItem(n.get("created_at") or "")
-            it_c.setFlags(it_c.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row, 5, it_c)
-
-        self.loading_table = False
-
-    def on_double_click(self, row, col):
-        self.selected_id = int(self.table.item(row, 0).text())
-        self.txt_judul.setText(self.table.item(row, 2).text())
-        self.txt_isi.setPlainText(self.table.item(row, 3).text())
-
-        hafal_checked = (self.table.item(row, 4).checkState() == Qt.Checked)
+        hafal_checked = self.model.value(row, "hafal")
         self.chk_hafal_form.setCurrentText("Sudah Hafal" if hafal_checked else "Belum Hafal")
 
-        folder_id_text = self.table.item(row, 1).text().strip()
-        folder_id = int(folder_id_text) if folder_id_text else None
+        folder_id = self.model.value(row, "folder_id")
         idx = self.cmb_folder.findData(folder_id)
         if idx >= 0:
             self.cmb_folder.setCurrentIndex(idx)
         else:
             self.cmb_folder.setCurrentIndex(0)
 
-    def on_item_changed(self, item: QTableWidgetItem):
-        if self.loading_table:
+    def _load_body(self, note_id: int):
+        # form tidak bisa di-update sebelum isi lengkap termuat (agar isi tidak tertimpa preview/kosong)
+        self.body_loaded = False
+        self.txt_isi.clear()
+        self.txt_isi.setReadOnly(True)
+        self.txt_isi.setPlaceholderText("Memuat isi...")
+        self.tasks.run("body", get_note_isi, note_id,
+                       on_done=partial(self._on_body_loaded, note_id),
+                       on_error=lambda tb: self._on_body_loaded(note_id, None))
+
+    def _on_body_loaded(self, note_id: int, isi):
+        if note_id != self.selected_id:
             return
-        if item.column() != 4:
+        if isi is None:
+            self.txt_isi.setPlaceholderText("Gagal memuat isi, double click baris untuk coba lagi")
             return
+        self.txt_isi.setReadOnly(False)
+        self.txt_isi.setPlaceholderText("Isi hafalan...")
+        self.txt_isi.setPlainText(isi)
+        self.body_loaded = True
 
-        row = item.row()
-        note_id = int(self.table.item(row, 0).text())
-        new_value = (item.checkState() == Qt.Checked)
-        set_note_hafal(note_id, new_value)
+    def on_hafal_toggled(self, note_id: int, hafal: bool):
+        self.hafal_writes.put(note_id, hafal)
 
     def add(self):
         judul = self.txt_judul.text().strip()
@@ -247,13 +258,15 @@ class NotesPage(QWidget):
             "folder_id": self.cmb_folder.currentData(),
             "hafal": (self.chk_hafal_form.currentText() == "Sudah Hafal")
         }
-        insert_note(data)
-        self.load_data()
+        self.tasks.run(None, insert_note, data, on_done=lambda _: self.refresher.request())
 
     def update(self):
         if self.selected_id is None:
             QMessageBox.warning(self, "Peringatan", "Double click baris dulu untuk edit")
             return
+        if not self.body_loaded:
+            QMessageBox.warning(self, "Peringatan", "Isi hafalan belum selesai dimuat")
+            return
 
         data = {
             "judul": self.txt_judul.text().strip(),
@@ -261,12 +274,10 @@ class NotesPage(QWidget):
             "folder_id": self.cmb_folder.currentData(),
             "hafal": (self.chk_hafal_form.currentText() == "Sudah Hafal")
         }
-        update_note(self.selected_id, data)
-        self.load_data()
+        self.tasks.run(None, update_note, self.selected_id, data, on_done=lambda _: self.refresher.request())
 
     def delete(self):
         if self.selected_id is None:
             return
-        delete_note(self.selected_id)
+        self.tasks.run(None, delete_note, self.selected_id, on_done=lambda _: self.refresher.request())
         self.selected_id = None
-        self.load_data()
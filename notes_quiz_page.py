@@ -4,7 +4,8 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 
-from supabase_client import get_quiz_notes_questions, set_note_hafal
+from supabase_client import get_due_notes, get_note_isi, review_note
+from workers import TaskRunner
 
 class NotesQuizPage(QWidget):
     def __init__(self, user_id: int, dashboard=None):
@@ -16,6 +17,7 @@ class NotesQuizPage(QWidget):
         self.idx = 0
         self.current = None
         self.answer_visible = False
+        self.tasks = TaskRunner(self)
 
         self.setWindowTitle("Quiz Hafalan Bebas")
         self.setup_ui()
@@ -29,6 +31,7 @@ class NotesQuizPage(QWidget):
         self.close()
 
     def closeEvent(self, event):
+        self.tasks.cancel_all()
         if self.dashboard is not None:
             self.dashboard.show()
         event.accept()
@@ -95,13 +98,17 @@ class NotesQuizPage(QWidget):
         self.setLayout(layout)
 
     def start_quiz(self):
-        self.notes = get_quiz_notes_questions(self.user_id, limit=40, include_hafal=False)
+        self.lbl_title.setText("Memuat soal...")
+        self.tasks.run("questions", get_due_notes, self.user_id, limit=40, on_done=self._start_notes)
+
+    def _start_notes(self, notes):
+        self.notes = notes
         self.idx = 0
         self.current = None
         self.answer_visible = False
 
         if not self.notes:
-            self.lbl_title.setText("Tidak ada hafalan (atau semuanya sudah hafal).")
+            self.lbl_title.setText("Tidak ada hafalan yang jatuh tempo hari ini.")
             self.lbl_answer.setText("")
             return
 
@@ -123,20 +130,40 @@ class NotesQuizPage(QWidget):
         if not self.current:
             return
         if not self.answer_visible:
-            self.lbl_answer.setText(self.current.get("isi", ""))
             self.answer_visible = True
+            if "isi" in self.current:
+                self.lbl_answer.setText(self.current.get("isi") or "")
+                return
+            # soal hanya membawa judul; isi (jawaban) diambil saat ditampilkan
+            self.lbl_answer.setText("Memuat jawaban...")
+            note = self.current
+            self.tasks.run("answer", get_note_isi, int(note["id"]),
+                           on_done=lambda isi: self._on_answer_loaded(note, isi),
+                           on_error=lambda tb: self._on_answer_loaded(note, None))
         else:
             self.lbl_answer.setText("Jawaban disembunyikan. Klik 'Tampilkan Jawaban'.")
             self.answer_visible = False
 
+    def _on_answer_loaded(self, note, isi):
+        if isi is not None:
+            note["isi"] = isi
+        if note is not self.current or not self.answer_visible:
+            return
+        self.lbl_answer.setText(isi if isi is not None else "Gagal memuat jawaban. Klik 'Tampilkan Jawaban' lagi.")
+        if isi is None:
+            self.answer_visible = False
+
     def mark_correct(self):
         if not self.current:
             return
-        set_note_hafal(int(self.current["id"]), True)
-        QMessageBox.information(self, "OK", "Ditandai sudah hafal.")
+        self.tasks.run(None, review_note, int(self.current["id"]), self.current, True)
+        QMessageBox.information(self, "OK", "Jadwal review diperpanjang.")
         self.next_note()
 
     def mark_wrong(self):
+        if not self.current:
+            return
+        self.tasks.run(None, review_note, int(self.current["id"]), self.current, False)
         QMessageBox.information(self, "Info", "Tidak apa-apa. Lanjut soal berikutnya.")
         self.next_note()
 
@@ -0,0 +1,168 @@
+import os
+import re
+import json
+import time
+import uuid
+import sqlite3
+import threading
+
+from local_cache import app_data_dir
+
+# ==================================================
+# Outbox lokal (SQLite) untuk write yang belum sampai ke Supabase
+# - tiap write dicatat dengan idempotency key (uuid) + urutan (seq)
+# - dikirim ulang sesuai urutan saat koneksi kembali
+# - baris baru yang dibuat offline memakai id sementara (negatif);
+#   setelah insert-nya terkirim, id asli dicatat di id_map dan
+#   dipakai untuk mengganti id sementara di write berikutnya
+# - write yang ditolak server (4xx) dipindah ke tabel failed
+# ==================================================
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    method TEXT NOT NULL,
+    path TEXT NOT NULL,
+    body TEXT,
+    headers TEXT,
+    temp_ids TEXT,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE TABLE IF NOT EXISTS failed (
+    seq INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    method TEXT NOT NULL,
+    path TEXT NOT NULL,
+    body TEXT,
+    error TEXT,
+    failed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS id_map (
+    temp_id INTEGER PRIMARY KEY,
+    real_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    k TEXT PRIMARY KEY,
+    v INTEGER NOT NULL
+);
+"""
+
+# kolom body yang bisa berisi id sementara
+ID_KEYS = ("id", "folder_id", "vocabulary_id")
+
+_TEMP_IN_PATH = re.compile(r"(?<=[.,(])-\d+")
+
+def outbox_path(user_id: int) -> str:
+    return os.path.join(app_data_dir(), f"outbox_user_{user_id}.sqlite3")
+
+class Outbox:
+    """Antrian write durable milik satu user. Aman dipakai dari beberapa thread."""
+    def __init__(self, user_id: int, path=None):
+        self.user_id = user_id
+        self.path = path or outbox_path(user_id)
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    @staticmethod
+    def new_key() -> str:
+        return uuid.uuid4().hex
+
+    def next_temp_id(self) -> int:
+        """Id sementara (negatif, unik selama file outbox ada)."""
+        with self.lock:
+            found = self.conn.execute("SELECT v FROM meta WHERE k = 'temp_id'").fetchone()
+            temp = (found[0] if found else 0) - 1
+            self.conn.execute("INSERT OR REPLACE INTO meta (k, v) VALUES ('temp_id', ?)", (temp,))
+            self.conn.commit()
+            return temp
+
+    # -------------------------
+    # antrian
+    # -------------------------
+    def add(self, key: str, method: str, path: str, body=None, headers=None, temp_ids=()) -> int:
+        with self.lock:
+            cur = self.conn.execute(
+                "INSERT INTO outbox (key, method, path, body, headers, temp_ids, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, method, path, json.dumps(body), json.dumps(headers), json.dumps(list(temp_ids)), time.time()),
+            )
+            self.conn.commit()
+            return cur.lastrowid
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def pending(self):
+        """Entri yang belum terkirim, urut seq (urutan write)."""
+        with self.lock:
+            cur = self.conn.execute("SELECT seq, key, method, path, body, headers, temp_ids, attempts FROM outbox ORDER BY seq")
+            rows = cur.fetchall()
+        return [
+            {
+                "seq": seq, "key": key, "method": method, "path": path,
+                "body": json.loads(body) if body else None,
+                "headers": json.loads(headers) if headers else None,
+                "temp_ids": json.loads(temp_ids) if temp_ids else [],
+                "attempts": attempts,
+            }
+            for seq, key, method, path, body, headers, temp_ids, attempts in rows
+        ]
+
+    def done(self, seq: int):
+        with self.lock:
+            self.conn.execute("DELETE FROM outbox WHERE seq = ?", (seq,))
+            self.conn.commit()
+
+    def retry_later(self, seq: int, error: str):
+        with self.lock:
+            self.conn.execute("UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE seq = ?", (error, seq))
+            self.conn.commit()
+
+    def fail(self, seq: int, error: str):
+        """Pindahkan entri ke tabel failed (ditolak server, tidak akan dicoba lagi)."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO failed (seq, key, method, path, body, error, failed_at) "
+                "SELECT seq, key, method, path, body, ?, ? FROM outbox WHERE seq = ?",
+                (error, time.time(), seq),
+            )
+            self.conn.execute("DELETE FROM outbox WHERE seq = ?", (seq,))
+            self.conn.commit()
+
+    def failed(self):
+        with self.lock:
+            cur = self.conn.execute("SELECT seq, method, path, error FROM failed ORDER BY seq")
+            return [dict(zip(("seq", "method", "path", "error"), x)) for x in cur.fetchall()]
+
+    # -------------------------
+    # id sementara -> id asli
+    # -------------------------
+    def map_id(self, temp_id: int, real_id: int):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO id_map (temp_id, real_id) VALUES (?, ?)", (int(temp_id), int(real_id)))
+            self.conn.commit()
+
+    def real_id(self, value):
+        if not isinstance(value, int) or value >= 0:
+            return value
+        with self.lock:
+            found = self.conn.execute("SELECT real_id FROM id_map WHERE temp_id = ?", (value,)).fetchone()
+        return found[0] if found else value
+
+    def resolve_path(self, path: str) -> str:
+        return _TEMP_IN_PATH.sub(lambda m: str(self.real_id(int(m.group(0)))), path)
+
+    def resolve_body(self, body):
+        if isinstance(body, list):
+            return [self.resolve_body(x) for x in body]
+        if isinstance(body, dict):
+            return {k: (self.real_id(v) if k in ID_KEYS else v) for k, v in body.items()}
+        return body
@@ -1,3 +1,5 @@
+from itertools import islice
+
 from PySide6.QtWidgets import (
     QWidget, QLabel, QLineEdit, QPushButton,
     QVBoxLayout, QHBoxLayout, QMessageBox, QComboBox
@@ -5,8 +7,16 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt
 
 from supabase_client import (
-    get_quiz_vocab_questions, set_vocab_hafal
+    iter_due_vocab_questions, review_vocab
 )
+from workers import TaskRunner
+
+QUIZ_LIMIT = 40   # jumlah soal per sesi
+QUIZ_BATCH = 10   # soal diambil bertahap per batch
+
+def _take(stream, n: int):
+    # dijalankan di worker thread
+    return list(islice(stream, n))
 
 class QuizPage(QWidget):
     def __init__(self, user_id: int, dashboard=None):
@@ -15,10 +25,14 @@ class QuizPage(QWidget):
         self.dashboard = dashboard
 
         self.questions = []
+        self.stream = None
+        self.exhausted = False
+        self.waiting_more = False
         self.index = 0
         self.current = None
         self.score = 0
         self.total = 0
+        self.tasks = TaskRunner(self)
 
         self.setWindowTitle("Quiz Kosakata")
         self.setup_ui()
@@ -32,6 +46,7 @@ class QuizPage(QWidget):
         self.close()
 
     def closeEvent(self, event):
+        self.tasks.cancel_all()
         if self.dashboard is not None:
             self.dashboard.show()
         event.accept()
@@ -116,9 +131,18 @@ class QuizPage(QWidget):
             QMessageBox.warning(self, "Peringatan", "Bahasa Dari dan Ke tidak boleh sama.")
             return
 
-        self.questions = get_quiz_vocab_questions(self.user_id, from_lang=f, to_lang=t, limit=40, include_hafal=False)
+        self.lbl_q.setText("Memuat soal...")
+        self.tasks.cancel("more")
+        self.stream = iter_due_vocab_questions(self.user_id, from_lang=f, to_lang=t)
+        self.exhausted = False
+        self.waiting_more = False
+        self.tasks.run("questions", _take, self.stream, QUIZ_BATCH, on_done=self._start_questions)
+
+    def _start_questions(self, questions):
+        self.questions = questions
+        self.exhausted = len(questions) < QUIZ_BATCH
         if not self.questions:
-            QMessageBox.information(self, "Info", "Tidak ada soal.\nPastikan ada kosakata minimal 2 bahasa dan belum hafal.")
+            QMessageBox.information(self, "Info", "Tidak ada soal yang jatuh tempo.\nPastikan ada kosakata minimal 2 bahasa, atau coba lagi nanti.")
             return
 
         self.index = 0
@@ -127,13 +151,35 @@ class QuizPage(QWidget):
         self.lbl_score.setText("Skor: 0 / 0")
         self.next_question()
 
+    def _prefetch_more(self):
+        # ambil batch berikutnya di background saat sisa soal tinggal sedikit
+        if self.exhausted or self.tasks.is_running("more"):
+            return
+        want = min(QUIZ_BATCH, QUIZ_LIMIT - len(self.questions))
+        if want <= 0 or len(self.questions) - self.index > 3:
+            return
+        self.tasks.run("more", _take, self.stream, want, on_done=lambda batch: self._more_loaded(batch, want))
+
+    def _more_loaded(self, batch, want: int):
+        self.exhausted = len(batch) < want
+        self.questions.extend(batch)
+        if self.waiting_more:
+            self.waiting_more = False
+            self.next_question()
+
     def next_question(self):
+        if self.index >= len(self.questions) and self.tasks.is_running("more"):
+            self.waiting_more = True
+            self.lbl_q.setText("Memuat soal...")
+            return
+
         if self.index >= len(self.questions):
             QMessageBox.information(self, "Selesai", f"Quiz selesai!\nSkor akhir: {self.score} / {self.total}")
             return
 
         self.current = self.questions[self.index]
         self.index += 1
+        self._prefetch_more()
 
         self.lbl_info.setText(f"{self.current['from_lang']} → {self.current['to_lang']}")
         self.lbl_q.setText(f"Terjemahkan: {self.current['prompt']}")
@@ -151,10 +197,12 @@ class QuizPage(QWidget):
         correct = self.norm(self.current["answer"])
 
         self.total += 1
-        if user_ans == correct:
+        ok = user_ans == correct
+        # jadwal review berikutnya (SM-2) disimpan di background
+        self.tasks.run(None, review_vocab, int(self.current["vocab_id"]), self.current.get("srs"), ok)
+        if ok:
             self.score += 1
-            set_vocab_hafal(int(self.current["vocab_id"]), True)
-            QMessageBox.information(self, "Benar", "Jawaban benar! Ditandai sudah hafal.")
+            QMessageBox.information(self, "Benar", "Jawaban benar! Jadwal review diperpanjang.")
         else:
             QMessageBox.warning(self, "Salah", f"Salah.\nJawaban: {self.current['answer']}")
 
@@ -0,0 +1,151 @@
+from typing import Any, List, Union
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+# ==================================================
+# Record data: Folder, Note, Vocabulary, Translation, Reminder
+# - backend:
+#   * msgspec terpasang => satu msgspec.Struct (gc=False) per baris, bukan dict =>
+#     hemat memori untuk akun besar; JSON didecode langsung dari bytes response ke
+#     record (tanpa dict perantara)
+#   * tanpa msgspec     => dict biasa hasil orjson (atau json), tidak dibungkus
+#     (record Python murni justru lebih lambat daripada dict)
+# - API record sama seperti dict untuk kode halaman: row["id"], row.get("judul"),
+#   "isi" in row, row["x"] = ..., dict(row), {**row}; atribut (row.judul) juga bisa
+#   => kode halaman cukup memakai gaya dict supaya jalan di kedua backend
+# - kolom yang tidak di-select tetap kosong (UNSET), bukan None:
+#   "isi" in note => False, note.get("isi") => None
+# - kolom yang tidak dikenal dibuang saat decode (backend msgspec)
+# ==================================================
+UNSET = msgspec.UNSET if msgspec is not None else object()
+
+class Record:
+    __slots__ = ()
+
+    # diisi per class oleh _record_type
+    FIELDS = frozenset()
+    ORDER = ()
+    NESTED = {}
+
+    def get(self, key, default=None):
+        if key not in self.FIELDS:
+            return default
+        value = getattr(self, key, UNSET)
+        return default if value is UNSET else value
+
+    def __getitem__(self, key):
+        value = getattr(self, key, UNSET) if key in self.FIELDS else UNSET
+        if value is UNSET:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(f"{type(self).__name__} tidak punya kolom {key!r}")
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        setattr(self, key, UNSET)
+
+    def __contains__(self, key):
+        return key in self.FIELDS and getattr(self, key, UNSET) is not UNSET
+
+    def keys(self):
+        return [k for k in self.ORDER if getattr(self, k, UNSET) is not UNSET]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(k, getattr(self, k)) for k in self.keys()]
+
+    def to_dict(self) -> dict:
+        """dict biasa (mis. untuk json.dumps); embed ikut diubah."""
+        return {k: ([r.to_dict() for r in v] if k in self.NESTED and isinstance(v, list) else v)
+                for k, v in self.items()}
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_dict()
+        if not isinstance(other, dict):
+            return NotImplemented
+        return self.to_dict() == other
+
+    __hash__ = None
+
+def _record_type(name: str, fields, nested=None):
+    nested = nested or {}
+    if msgspec is not None:
+        spec = [(f, Union[List[nested[f]], None, msgspec.UnsetType] if f in nested else Any, UNSET) for f in fields]
+        cls = msgspec.defstruct(name, spec, bases=(Record, msgspec.Struct), module=__name__,
+                                 gc=False, repr_omit_defaults=True)
+    else:
+        # tidak pernah diisi oleh decode/from_rows (dict dipakai apa adanya), hanya penanda tipe
+        cls = type(name, (Record,), {"__slots__": tuple(fields), "__module__": __name__})
+    cls.FIELDS = frozenset(fields)
+    cls.ORDER = tuple(fields)
+    cls.NESTED = nested
+    return cls
+
+SRS_FIELDS = ("srs_ease", "srs_interval", "srs_reps", "srs_due")
+META_FIELDS = ("client_key", "created_at", "updated_at")
+
+Folder = _record_type("Folder", (
+    "id", "user_id", "nama_folder", "nama",
+    "notes_total", "notes_hafal", "vocab_total", "vocab_hafal",
+) + META_FIELDS)
+
+Note = _record_type("Note", (
+    "id", "user_id", "folder_id", "judul", "isi", "isi_preview", "hafal",
+) + SRS_FIELDS + META_FIELDS)
+
+Translation = _record_type("Translation", (
+    "id", "vocabulary_id", "bahasa", "kosakata", "pengucapan", "arti",
+) + META_FIELDS)
+
+Vocabulary = _record_type("Vocabulary", (
+    "id", "user_id", "folder_id", "catatan", "sudah_hafal", "vocabulary_translation",
+) + SRS_FIELDS + META_FIELDS, nested={"vocabulary_translation": Translation})
+
+Reminder = _record_type("Reminder", (
+    "id", "user_id", "judul", "tanggal", "selesai",
+) + META_FIELDS)
+
+# record per tabel
+RECORD_TYPES = {
+    "folders": Folder,
+    "notes": Note,
+    "vocabulary": Vocabulary,
+    "vocabulary_translation": Translation,
+    "reminders": Reminder,
+}
+
+_decoders = {}
+
+def from_rows(rows, cls) -> list:
+    """list dict (mis. dari replika lokal) -> list record; tanpa msgspec: list dict itu sendiri."""
+    if msgspec is not None:
+        return msgspec.convert(rows, List[cls])
+    return rows
+
+def decode(content, cls) -> list:
+    """Body response JSON berupa array (bytes) -> list record; tanpa msgspec: list dict."""
+    if msgspec is not None:
+        decoder = _decoders.get(cls)
+        if decoder is None:
+            decoder = _decoders[cls] = msgspec.json.Decoder(List[cls])
+        return decoder.decode(content)
+    return loads(content)
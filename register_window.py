@@ -1,12 +1,14 @@
 from PySide6.QtWidgets import QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QMessageBox, QHBoxLayout
 from PySide6.QtCore import Qt
 from supabase_client import insert_user
+from workers import TaskRunner
 
 class RegisterWindow(QWidget):
     def __init__(self, welcome=None):
         super().__init__()
         self.setWindowTitle("Buat Akun")
         self.welcome = welcome
+        self.tasks = TaskRunner(self)
         self.setup_ui()
         self.resize(520, 390)
         self.setMinimumSize(480, 340)
@@ -33,6 +35,7 @@ class RegisterWindow(QWidget):
         layout.addWidget(self.txt_password)
 
         btn_register = QPushButton("Daftar")
+        self.btn_register = btn_register
         btn_back = QPushButton("← Kembali")
 
         btn_register.setProperty("class", "primary")
@@ -65,7 +68,16 @@ class RegisterWindow(QWidget):
             QMessageBox.warning(self, "Peringatan", "Semua field wajib diisi")
             return
 
-        resp = insert_user(username, password)
+        self.btn_register.setEnabled(False)
+        self.tasks.run("register", insert_user, username, password,
+                       on_done=self._on_register_result, on_error=self._on_register_error)
+
+    def _on_register_error(self, tb: str):
+        self.btn_register.setEnabled(True)
+        QMessageBox.critical(self, "Gagal", "Gagal register. Tidak bisa terhubung ke server.")
+
+    def _on_register_result(self, resp: dict):
+        self.btn_register.setEnabled(True)
         if not resp.get("ok"):
             if resp.get("error") == "USERNAME_TAKEN":
                 QMessageBox.warning(self, "Gagal", "Username sudah dipakai.")
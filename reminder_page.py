@@ -1,15 +1,17 @@
 from PySide6.QtWidgets import (
     QWidget, QLabel, QLineEdit, QPushButton,
-    QVBoxLayout, QHBoxLayout, QTableWidget,
-    QTableWidgetItem, QMessageBox, QDateEdit
+    QVBoxLayout, QHBoxLayout, QTableView,
+    QMessageBox, QDateEdit
 )
-from PySide6.QtCore import Qt, QDate
+from PySide6.QtCore import QDate
 from PySide6.QtWidgets import QHeaderView, QAbstractItemView
 
 from supabase_client import (
     get_reminders, insert_reminder, update_reminder,
-    delete_reminder, set_reminder_done
+    delete_reminder, set_reminders_done
 )
+from workers import TaskRunner, WriteBuffer
+from table_models import RecordTableModel, TEXT, CHECK
 
 class ReminderPage(QWidget):
     def __init__(self, user_id: int, dashboard=None):
@@ -17,7 +19,9 @@ class ReminderPage(QWidget):
         self.user_id = user_id
         self.dashboard = dashboard
         self.selected_id = None
-        self.loading_table = False
+        self.tasks = TaskRunner(self)
+        # toggle checkbox dikumpulkan lalu dikirim sekaligus
+        self.done_writes = WriteBuffer(self.tasks, set_reminders_done, parent=self)
 
         self.setWindowTitle("Reminder")
         self.setup_ui()
@@ -32,11 +36,13 @@ class ReminderPage(QWidget):
         self.close()
 
     def closeEvent(self, event):
+        self.done_writes.flush()
+        self.tasks.cancel_all()
         if self.dashboard is not None:
             self.dashboard.show()
         event.accept()
 
-    def _setup_table_base(self, tbl: QTableWidget):
+    def _setup_table_base(self, tbl: QTableView):
         tbl.setAlternatingRowColors(True)
         tbl.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         tbl.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
@@ -101,63 +107,41 @@ class ReminderPage(QWidget):
         table_title.setObjectName("SectionTitle")
         layout.addWidget(table_title)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["ID", "Tanggal", "Judul", "Selesai"])
-        self.table.cellDoubleClicked.connect(self.on_double_click)
-        self.table.itemChanged.connect(self.on_item_changed)
+        self.model = RecordTableModel([
+            ("ID", "id"),
+            ("Tanggal", "tanggal", TEXT, lambda v: (v or "")[:10]),
+            ("Judul", "judul"),
+            ("Selesai", "selesai", CHECK),
+        ], self)
+        self.model.checkToggled.connect(self.on_done_toggled)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.doubleClicked.connect(self.on_double_click)
         self._setup_table_base(self.table)
 
         layout.addWidget(self.table)
         self.setLayout(layout)
 
     def load_data(self):
-        self.loading_table = True
-        self.table.setRowCount(0)
-        data = get_reminders(self.user_id)
+        self.tasks.run("load", get_reminders, self.user_id, on_done=self._fill_table)
 
-        for row, r in enumerate(data):
-            self.table.insertRow(row)
+    def _fill_table(self, data):
+        self.model.set_rows(data)
 
-            it_id = QTableWidgetItem(str(r.get("id")))
-            it_id.setFlags(it_id.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row, 0, it_id)
+    def on_double_click(self, index):
+        row = index.row()
+        self.selected_id = self.model.row_id(row)
+        self.txt_judul.setText(self.model.value(row, "judul") or "")
 
-            tgl = (r.get("tanggal") or "")[:10]
-            it_tgl = QTableWidgetItem(tgl)
-            it_tgl.setFlags(it_tgl.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row, 1, it_tgl)
-
-            it_judul = QTableWidgetItem(r.get("judul") or "")
-            it_judul.setFlags(it_judul.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row, 2, it_judul)
-
-            it_done = QTableWidgetItem("")
-            it_done.setFlags((it_done.flags() | Qt.ItemIsUserCheckable) & ~Qt.ItemIsEditable)
-            it_done.setCheckState(Qt.Checked if r.get("selesai") else Qt.Unchecked)
-            self.table.setItem(row, 3, it_done)
-
-        self.loading_table = False
-
-    def on_double_click(self, row, col):
-        self.selected_id = int(self.table.item(row, 0).text())
-        self.txt_judul.setText(self.table.item(row, 2).text())
-
-        tgl = self.table.item(row, 1).text().strip()
+        tgl = (self.model.value(row, "tanggal") or "")[:10]
         if tgl:
             y, m, d = [int(x) for x in tgl.split("-")]
             self.date.setDate(QDate(y, m, d))
 
-    def on_item_changed(self, item: QTableWidgetItem):
-        if self.loading_table:
-            return
-        if item.column() != 3:
-            return
-
-        row = item.row()
-        rid = int(self.table.item(row, 0).text())
-        done = (item.checkState() == Qt.Checked)
-        set_reminder_done(rid, done)
+    def on_done_toggled(self, rid: int, done: bool):
+        self.done_writes.put(rid, done)
 
     def add(self):
         judul = self.txt_judul.text().strip()
@@ -165,8 +149,7 @@ class ReminderPage(QWidget):
             QMessageBox.warning(self, "Peringatan", "Judul wajib diisi")
             return
         tgl = self.date.date().toString("yyyy-MM-dd")
-        insert_reminder(self.user_id, judul, tgl)
-        self.load_data()
+        self.tasks.run(None, insert_reminder, self.user_id, judul, tgl, on_done=lambda _: self.load_data())
 
     def update(self):
         if self.selected_id is None:
@@ -179,12 +162,10 @@ class ReminderPage(QWidget):
             return
         tgl = self.date.date().toString("yyyy-MM-dd")
 
-        update_reminder(self.selected_id, {"judul": judul, "tanggal": tgl})
-        self.load_data()
+        self.tasks.run(None, update_reminder, self.selected_id, {"judul": judul, "tanggal": tgl}, on_done=lambda _: self.load_data())
 
     def delete(self):
         if self.selected_id is None:
             return
-        delete_reminder(self.selected_id)
+        self.tasks.run(None, delete_reminder, self.selected_id, on_done=lambda _: self.load_data())
         self.selected_id = None
-        self.load_data()
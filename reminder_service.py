@@ -1,51 +1,126 @@
-from PySide6.QtCore import QTimer, QDate
+import heapq
+
+from PySide6.QtCore import QTimer, QDate, QDateTime, QTime
 from PySide6.QtWidgets import QMessageBox
-from supabase_client import get_reminders
+
+from config import REMINDER_RESYNC_INTERVAL
+from supabase_client import (
+    get_pending_reminders, get_due_reminders, add_change_listener, remove_change_listener
+)
+from workers import TaskRunner, ChangeRelay
+
+# QTimer menerima int 32-bit (ms) => tunggu maksimal 6 jam lalu hitung ulang
+MAX_WAIT_MS = 6 * 60 * 60 * 1000
 
 class ReminderService:
     """
-    Alarm ringan:
-    - cek reminders yang tanggalnya <= hari ini dan belum selesai
-    - munculkan popup (sekali per reminder per sesi aplikasi)
+    Alarm ringan berbasis event (tanpa polling tiap 30 detik):
+    - reminder yang belum selesai disimpan di min-heap (tanggal, id, judul)
+    - satu timer di-set tepat untuk reminder terdekat; saat berbunyi, server ditanya
+      reminder jatuh tempo saja (filter selesai/tanggal di server, kolom minimal)
+    - data diambil ulang hanya kalau tabel reminders berubah
+      (write dari aplikasi ini) atau tiap REMINDER_RESYNC_INTERVAL
+    - popup muncul sekali per reminder per sesi aplikasi
     """
     def __init__(self, user_id: int, parent_widget=None):
         self.user_id = user_id
         self.parent_widget = parent_widget
+        self.heap = []
+        self.shown_ids = set()
+        self.tasks = TaskRunner(name="ReminderService")
+
         self.timer = QTimer()
-        self.timer.setInterval(30_000)  # 30 detik
+        self.timer.setSingleShot(True)
         self.timer.timeout.connect(self.check_due)
-        self.shown_ids = set()
+
+        self.resync_timer = QTimer()
+        self.resync_timer.setInterval(REMINDER_RESYNC_INTERVAL * 1000)
+        self.resync_timer.timeout.connect(self.refresh)
+
+        self.relay = ChangeRelay()
+        self.relay.changed.connect(self._on_table_changed)
 
     def start(self):
-        self.check_due()
-        self.timer.start()
+        add_change_listener(self.relay.changed.emit)
+        self.refresh()
+        self.resync_timer.start()
 
     def stop(self):
+        remove_change_listener(self.relay.changed.emit)
         self.timer.stop()
+        self.resync_timer.stop()
+        self.tasks.cancel_all()
 
-    def check_due(self):
-        try:
-            data = get_reminders(self.user_id)
-        except Exception:
-            return
+    # -------------------------
+    # data
+    # -------------------------
+    def _on_table_changed(self, tbl: str):
+        if tbl == "reminders":
+            self.refresh()
 
-        today = QDate.currentDate().toString("yyyy-MM-dd")
-        due = []
+    def refresh(self):
+        # error jaringan diabaikan, heap lama tetap dipakai sampai resync berikutnya
+        self.tasks.run("refresh", get_pending_reminders, self.user_id, exclude_ids=set(self.shown_ids),
+                       on_done=self._rebuild, on_error=lambda tb: None)
+
+    def _rebuild(self, data):
+        # data: reminder belum selesai & belum dinotifikasi (sudah difilter server)
+        heap = []
         for r in data:
-            if r.get("selesai") is True:
-                continue
             rid = r.get("id")
             tgl = (r.get("tanggal") or "").split("T")[0]
-            if not rid or not tgl:
+            if not rid or not tgl or rid in self.shown_ids:
                 continue
-            if rid in self.shown_ids:
-                continue
-            if tgl <= today:
-                due.append(r)
+            heap.append((tgl, rid, r.get("judul")))
+        heapq.heapify(heap)
+        self.heap = heap
+        self._show_due(self._pop_due())
+
+    # -------------------------
+    # timer
+    # -------------------------
+    def _pop_due(self):
+        today = QDate.currentDate().toString("yyyy-MM-dd")
+        due = []
+        while self.heap and self.heap[0][0] <= today:
+            tgl, rid, judul = heapq.heappop(self.heap)
+            if rid not in self.shown_ids:
+                due.append((tgl, rid, judul))
+        return due
 
+    def check_due(self):
+        # timer jatuh tempo => tanya server daftar yang benar-benar jatuh tempo
+        # (bisa saja sudah diselesaikan dari perangkat lain)
+        today = QDate.currentDate().toString("yyyy-MM-dd")
+        if not self.heap or self.heap[0][0] > today:
+            self._arm()   # bangun karena batas MAX_WAIT_MS, belum ada yang jatuh tempo
+            return
+        self.tasks.run("check", get_due_reminders, self.user_id, exclude_ids=set(self.shown_ids), today=today,
+                       on_done=self._on_due_loaded, on_error=lambda tb: self._show_due(self._pop_due()))
+
+    def _on_due_loaded(self, data):
+        self._pop_due()
+        due = [((r.get("tanggal") or "")[:10], r["id"], r.get("judul")) for r in data if r.get("id") not in self.shown_ids]
+        self._show_due(due)
+
+    def _show_due(self, due):
         if due:
-            for r in due:
-                self.shown_ids.add(r["id"])
+            for _, rid, _ in due:
+                self.shown_ids.add(rid)
 
-            msg = "Reminder jatuh tempo:\n\n" + "\n".join([f"- {x.get('judul','(tanpa judul)')} ({(x.get('tanggal') or '')[:10]})" for x in due])
+            msg = "Reminder jatuh tempo:\n\n" + "\n".join([f"- {judul or '(tanpa judul)'} ({tgl})" for tgl, _, judul in due])
             QMessageBox.information(self.parent_widget, "Reminder", msg)
+
+        self._arm()
+
+    def _arm(self):
+        self.timer.stop()
+        while self.heap:
+            due_at = QDateTime(QDate.fromString(self.heap[0][0], "yyyy-MM-dd"), QTime(0, 0))
+            if due_at.isValid():
+                break
+            heapq.heappop(self.heap)   # tanggal rusak => abaikan
+        else:
+            return
+        wait = QDateTime.currentDateTime().msecsTo(due_at)
+        self.timer.start(max(0, min(wait, MAX_WAIT_MS)))
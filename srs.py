@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+# ==================================================
+# Spaced repetition (SM-2)
+# state per item disimpan di kolom vocabulary / notes:
+# - srs_ease     : faktor kemudahan (min 1.3, awal 2.5)
+# - srs_interval : jarak review berikutnya (hari)
+# - srs_reps     : jumlah benar berturut-turut
+# - srs_due      : tanggal review berikutnya (YYYY-MM-DD)
+# ==================================================
+SRS_COLUMNS = ("srs_ease", "srs_interval", "srs_reps", "srs_due")
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+# interval (hari) yang dianggap sudah hafal => flag hafal/sudah_hafal ikut True
+MASTERED_DAYS = 21
+
+GRADE_CORRECT = 4
+GRADE_WRONG = 1
+
+def state_of(row: dict) -> dict:
+    """Ambil kolom srs dari baris (nilai default untuk item yang belum pernah direview)."""
+    return {
+        "srs_ease": row.get("srs_ease") or DEFAULT_EASE,
+        "srs_interval": row.get("srs_interval") or 0,
+        "srs_reps": row.get("srs_reps") or 0,
+        "srs_due": row.get("srs_due"),
+    }
+
+def review(state: dict, grade: int, today=None) -> dict:
+    """
+    Hitung state baru setelah dijawab.
+    grade 0..5 (SM-2): < 3 => lupa (ulang dari awal), >= 3 => ingat.
+    """
+    today = today or date.today()
+    s = state_of(state)
+    ease = float(s["srs_ease"])
+    interval = int(s["srs_interval"])
+    reps = int(s["srs_reps"])
+
+    if grade < 3:
+        reps = 0
+        interval = 1
+    else:
+        reps += 1
+        if reps == 1:
+            interval = 1
+        elif reps == 2:
+            interval = 6
+        else:
+            interval = max(1, round(interval * ease))
+
+    ease = max(MIN_EASE, ease + (0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02)))
+
+    return {
+        "srs_ease": round(ease, 3),
+        "srs_interval": interval,
+        "srs_reps": reps,
+        "srs_due": (today + timedelta(days=interval)).isoformat(),
+    }
+
+def is_mastered(state: dict) -> bool:
+    return int(state.get("srs_interval") or 0) >= MASTERED_DAYS
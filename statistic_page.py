@@ -1,20 +1,15 @@
 from PySide6.QtWidgets import QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout
 from PySide6.QtCore import Qt
 
-from supabase_client import (
-    count_folders,
-    count_notes, count_notes_hafal,
-    count_vocab, count_vocab_hafal,
-    count_vocab_translations,
-    count_reminders, count_reminders_done,
-    count_vocab_by_language
-)
+from supabase_client import get_statistics
+from workers import TaskRunner
 
 class StatisticPage(QWidget):
     def __init__(self, user_id: int, dashboard=None):
         super().__init__()
         self.user_id = user_id
         self.dashboard = dashboard
+        self.tasks = TaskRunner(self)
 
         self.setWindowTitle("Statistik")
         self.setup_ui()
@@ -29,6 +24,7 @@ class StatisticPage(QWidget):
         self.close()
 
     def closeEvent(self, event):
+        self.tasks.cancel_all()
         if self.dashboard is not None:
             self.dashboard.show()
         event.accept()
@@ -67,18 +63,22 @@ class StatisticPage(QWidget):
         self.setLayout(layout)
 
     def refresh(self):
-        folders = count_folders(self.user_id)
+        self.lbl.setText("Memuat statistik...")
+        self.tasks.run("refresh", get_statistics, self.user_id, on_done=self.show_stats)
 
-        notes_total = count_notes(self.user_id)
-        notes_hafal = count_notes_hafal(self.user_id)
+    def show_stats(self, stats: dict):
+        folders = stats["folders"]
 
-        vocab_total = count_vocab(self.user_id)
-        vocab_hafal = count_vocab_hafal(self.user_id)
-        trans_total = count_vocab_translations(self.user_id)
-        by_lang = count_vocab_by_language(self.user_id)
+        notes_total = stats["notes_total"]
+        notes_hafal = stats["notes_hafal"]
 
-        rem_total = count_reminders(self.user_id)
-        rem_done = count_reminders_done(self.user_id)
+        vocab_total = stats["vocab_total"]
+        vocab_hafal = stats["vocab_hafal"]
+        trans_total = stats["translations_total"]
+        by_lang = stats["translations_by_lang"]
+
+        rem_total = stats["reminders_total"]
+        rem_done = stats["reminders_done"]
 
         text = []
         text.append(f"Folder: {folders}")
@@ -2,10 +2,19 @@ import random
 import hmac
 import hashlib
 import secrets
-import requests
-from datetime import date
-
-from config import SUPABASE_URL, SUPABASE_API_KEY
+import time
+import threading
+from datetime import date, timedelta
+from itertools import islice
+
+from config import SUPABASE_URL, SUPABASE_API_KEY, SYNC_MIN_INTERVAL, NOTE_PREVIEW_CHARS
+from http_transport import SupabaseTransport, TransportError
+from local_cache import LocalReplica, FLAG_COLUMN
+from outbox import Outbox
+import metrics
+import records
+import srs
+from records import Folder, Note, Vocabulary, Translation, Reminder
 
 HEADERS = {
     "apikey": SUPABASE_API_KEY,
@@ -17,20 +26,72 @@ HEADERS = {
 # ==================================================
 # HTTP helpers
 # ==================================================
+_transport = None
+
+def get_transport():
+    """Transport bersama (dibuat sekali, dipakai semua helper)."""
+    global _transport
+    if _transport is None:
+        _transport = SupabaseTransport(headers=HEADERS)
+    return _transport
+
+def set_transport(transport):
+    """
+    Ganti transport yang dipakai helper (mis. fake transport untuk test).
+    transport cukup punya method request(method, url, **kwargs).
+    Return transport sebelumnya.
+    """
+    global _transport
+    old = _transport
+    _transport = transport
+    return old
+
+def connection_state() -> dict:
+    """
+    State circuit breaker transport: {"state": "closed"/"open"/"half_open", "failures", "retry_in"}.
+    open => backend dianggap mati, halaman sebaiknya menampilkan data cache.
+    """
+    breaker = getattr(get_transport(), "breaker", None)
+    if breaker is None:
+        return {"state": "closed", "failures": 0, "retry_in": None}
+    return breaker.info()
+
 def _url(path: str) -> str:
     return f"{SUPABASE_URL}/rest/v1/{path}"
 
-def _get(path: str, params=None):
-    return requests.get(_url(path), headers=HEADERS, params=params, timeout=20)
+def _request(method: str, path: str, timeout=None, headers=None, **kwargs):
+    if method == "POST" and "on_conflict=" in path:
+        kwargs["idempotent"] = True   # upsert => aman diulang oleh transport
+    h = {**HEADERS, **headers} if headers else HEADERS
 
-def _post(path: str, data: dict):
-    return requests.post(_url(path), headers=HEADERS, json=data, timeout=20)
+    # setiap request dicatat ke metrics.registry (tabel, method, status, bytes, durasi, halaman)
+    started = time.perf_counter()
+    try:
+        r = get_transport().request(method, _url(path), headers=h, timeout=timeout, **kwargs)
+    except Exception as ex:
+        metrics.registry.record(path.split("?", 1)[0], method, type(ex).__name__, 0, time.perf_counter() - started)
+        raise
+    metrics.registry.record(path.split("?", 1)[0], method, r.status_code, _response_size(r), time.perf_counter() - started)
+    return r
+
+def _response_size(r) -> int:
+    content = getattr(r, "content", None)
+    if isinstance(content, (bytes, bytearray)):
+        return len(content)
+    length = (getattr(r, "headers", None) or {}).get("Content-Length")
+    return int(length) if length and str(length).isdigit() else 0
+
+def _get(path: str, params=None, timeout=None):
+    return _request("GET", path, params=params, timeout=timeout)
 
-def _patch(path: str, data: dict):
-    return requests.patch(_url(path), headers=HEADERS, json=data, timeout=20)
+def _post(path: str, data, timeout=None, headers=None):
+    return _write("POST", path, data, timeout=timeout, headers=headers)
 
-def _delete(path: str):
-    return requests.delete(_url(path), headers=HEADERS, timeout=20)
+def _patch(path: str, data: dict, timeout=None):
+    return _write("PATCH", path, data, timeout=timeout)
+
+def _delete(path: str, timeout=None):
+    return _write("DELETE", path, timeout=timeout)
 
 # ==================================================
 # Password hash (PBKDF2)
@@ -85,24 +146,506 @@ def select_user(username: str, password_plain: str):
         return [{"id": u["id"], "username": u["username"]}]
     return []
 
+# ==================================================
+# LOCAL CACHE (replika SQLite, lihat local_cache.py)
+# - dibuka saat login (open_local_cache), ditutup saat logout
+# - get_* dilayani dari replika
+# - tabel diisi penuh sekali, setelah itu delta sync:
+#   * baris berubah   : updated_at >= watermark
+#   * baris terhapus  : tabel deleted_rows (tombstone), deleted_at >= watermark
+#   (kolom/trigger yang dibutuhkan ada di supabase_schema.sql)
+# - write tetap ke Supabase, hasilnya ikut disimpan ke replika
+# ==================================================
+_replica = None
+_sync_lock = threading.Lock()   # fill/delta sync bisa dipanggil dari beberapa worker thread
+
+def open_local_cache(user_id: int, path=None):
+    global _replica
+    close_local_cache()
+    _replica = LocalReplica(user_id, path)
+    return _replica
+
+def close_local_cache():
+    global _replica
+    if _replica is not None:
+        _replica.close()
+    _replica = None
+
+def get_local_cache():
+    return _replica
+
+def _fetch_rows(path: str, params=None):
+    """Seperti _get(...).json() (list dict, decoder cepat), tapi None kalau gagal (beda dengan hasil kosong)."""
+    r = _get(path, params=params)
+    if not r.ok:
+        return None
+    content = getattr(r, "content", None)
+    return records.loads(content) if isinstance(content, (bytes, bytearray)) else r.json()
+
+def _records(r, cls):
+    """Response list -> list record (didecode langsung dari bytes response), [] kalau gagal."""
+    if not r.ok:
+        return []
+    content = getattr(r, "content", None)
+    if isinstance(content, (bytes, bytearray)):
+        return records.decode(content, cls)
+    return records.from_rows(r.json(), cls)
+
+def _project_rows(rows, columns: str, cls):
+    """Baris replika (semua kolom) -> record dengan kolom yang sama seperti select= ke server."""
+    if columns and columns != "*":
+        keys = columns.split(",")
+        rows = [{k: row.get(k) for k in keys} for row in rows]
+    return records.from_rows(rows, cls)
+
+def _preview(text) -> str:
+    # sama dengan computed column isi_preview di supabase_schema.sql
+    text = text or ""
+    if len(text) <= NOTE_PREVIEW_CHARS:
+        return text
+    return text[:NOTE_PREVIEW_CHARS].rstrip() + "…"
+
+def _owner_filter(tbl: str, user_id: int, columns: str = "*") -> dict:
+    if tbl == "vocabulary_translation":
+        # tidak punya user_id => filter lewat inner join ke vocabulary
+        return {"select": f"{columns},vocabulary!inner(user_id)", "vocabulary.user_id": f"eq.{user_id}"}
+    return {"select": columns, "user_id": f"eq.{user_id}"}
+
+def _max_value(rows, key: str, current=None):
+    values = [r.get(key) for r in rows if r.get(key)]
+    if current:
+        values.append(current)
+    return max(values) if values else None
+
+def _fill_cache(rep, tbl: str):
+    params = {"user_id": f"eq.{rep.user_id}", "order": "id.desc"}
+
+    if tbl in ("vocabulary", "vocabulary_translation"):
+        params["select"] = "*,vocabulary_translation(*)"
+        rows = _fetch_rows("vocabulary", params)
+        if rows is None:
+            return
+        trans = []
+        for v in rows:
+            for t in v.pop("vocabulary_translation", None) or []:
+                t["vocabulary_id"] = v["id"]
+                trans.append(t)
+        for name, data in (("vocabulary", rows), ("vocabulary_translation", trans)):
+            wm = _max_value(data, "updated_at")
+            rep.replace_all(name, data)
+            rep.set_sync_state(name, wm, wm, time.time())
+        return
+
+    rows = _fetch_rows(tbl, params)
+    if rows is not None:
+        wm = _max_value(rows, "updated_at")
+        rep.replace_all(tbl, rows)
+        rep.set_sync_state(tbl, wm, wm, time.time())
+
+def _sync_deletes(rep, tbl: str, deleted_wm):
+    params = {"user_id": f"eq.{rep.user_id}", "tbl": f"eq.{tbl}", "select": "row_id,deleted_at"}
+    if deleted_wm:
+        params["deleted_at"] = f"gte.{deleted_wm}"
+    rows = _fetch_rows("deleted_rows", params)
+    if rows is not None:
+        rep.delete_many(tbl, [x["row_id"] for x in rows])
+        return _max_value(rows, "deleted_at", deleted_wm)
+
+    # belum ada tabel tombstone => cocokkan daftar id saja
+    ids = _fetch_rows(tbl, _owner_filter(tbl, rep.user_id, "id"))
+    if ids is not None:
+        rep.retain(tbl, {x["id"] for x in ids})
+    return deleted_wm
+
+def _sync_delta(rep, tbl: str, force: bool = False):
+    updated_wm, deleted_wm, synced_at = rep.get_sync_state(tbl)
+    if not force and time.time() - synced_at < SYNC_MIN_INTERVAL:
+        return
+
+    params = _owner_filter(tbl, rep.user_id)
+    if updated_wm:
+        params["updated_at"] = f"gte.{updated_wm}"
+    rows = _fetch_rows(tbl, params)
+    if rows is None:
+        # mis. kolom updated_at belum ada di server => ambil ulang penuh
+        _fill_cache(rep, tbl)
+        return
+
+    for row in rows:
+        row.pop("vocabulary", None)
+    rep.upsert(tbl, rows)
+
+    deleted_wm = _sync_deletes(rep, tbl, deleted_wm)
+    rep.set_sync_state(tbl, _max_value(rows, "updated_at", updated_wm), deleted_wm, time.time())
+
+# tabel induk yang ikut disinkron: pembaca translation juga membaca baris vocabulary
+# dari replika, jadi vocabulary harus ikut delta sync supaya tidak basi
+SYNC_WITH = {"vocabulary_translation": ("vocabulary",)}
+
+def _cache_for(user_id, tbl: str, force: bool = False, fill: bool = True):
+    """
+    Replika yang sudah terisi & tersinkron untuk tabel ini (+ tabel induknya), atau None (=> baca langsung dari server).
+    fill=False: kalau tabel belum pernah diisi jangan download penuh (mis. untuk request per halaman).
+    """
+    rep = _replica
+    if rep is None or (user_id is not None and rep.user_id != user_id):
+        return None
+    tables = SYNC_WITH.get(tbl, ()) + (tbl,)
+    with _sync_lock:
+        try:
+            if not all(rep.is_loaded(t) for t in tables):
+                if not fill:
+                    return None
+                _fill_cache(rep, tbl)
+            else:
+                for t in tables:
+                    _sync_delta(rep, t, force=force)
+        except TransportError:
+            # offline => pakai isi replika apa adanya
+            pass
+    return rep if all(rep.is_loaded(t) for t in tables) else None
+
+def _cache_upsert(tbl: str, rows):
+    if _replica is not None and isinstance(rows, list):
+        _replica.upsert(tbl, rows)
+    if rows:
+        _notify_change(tbl)
+
+def _cache_patch(tbl: str, row_id: int, data: dict):
+    if _replica is not None:
+        _replica.patch(tbl, row_id, data)
+    _notify_change(tbl)
+
+def _cache_delete(tbl: str, row_id: int):
+    if _replica is not None:
+        _replica.delete(tbl, row_id)
+    _notify_change(tbl)
+
+def _cache_patch_many(tbl: str, row_ids, data: dict):
+    if _replica is not None:
+        _replica.patch_many(tbl, row_ids, data)
+    _notify_change(tbl)
+
+# ==================================================
+# CHANGE LISTENERS
+# dipanggil setelah write yang berhasil: fn(nama_tabel)
+# catatan: bisa dipanggil dari worker thread
+# ==================================================
+_listeners = []
+
+def add_change_listener(fn):
+    if fn not in _listeners:
+        _listeners.append(fn)
+
+def remove_change_listener(fn):
+    if fn in _listeners:
+        _listeners.remove(fn)
+
+def _notify_change(tbl: str):
+    for fn in list(_listeners):
+        fn(tbl)
+
+# ==================================================
+# OUTBOX (write offline-first, lihat outbox.py)
+# - write ke tabel data user dikirim langsung kalau online & antrian kosong
+# - kalau jaringan gagal / server 5xx / antrian belum kosong:
+#   write dicatat di outbox dan hasil optimis dikembalikan (status 202)
+#   => halaman & replika langsung berubah seperti write yang berhasil
+# - flush_outbox() mengirim ulang sesuai urutan; insert memakai client_key
+#   (on_conflict) sebagai idempotency key supaya tidak dobel kalau diulang
+# ==================================================
+OUTBOX_TABLES = ("folders", "notes", "vocabulary", "vocabulary_translation", "reminders")
+
+_outbox = None
+_write_lock = threading.RLock()   # write dikirim satu per satu => urutan terjaga
+# tabel yang punya kolom client_key (lihat supabase_schema.sql); translation sudah
+# idempoten lewat unique (vocabulary_id, bahasa)
+CLIENT_KEY_TABLES = ("folders", "notes", "vocabulary", "reminders")
+_client_key_unsupported = set()   # tabel yang ternyata belum punya kolom client_key di server
+
+class _Queued:
+    """Pengganti response untuk write yang masuk outbox."""
+    ok = True
+    status_code = 202
+    text = ""
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def json(self):
+        return self._rows
+
+def open_outbox(user_id: int, path=None):
+    global _outbox
+    close_outbox()
+    _outbox = Outbox(user_id, path)
+    return _outbox
+
+def close_outbox():
+    global _outbox
+    with _write_lock:   # tunggu flush/write yang sedang jalan
+        if _outbox is not None:
+            _outbox.close()
+        _outbox = None
+
+def outbox_pending() -> int:
+    return _outbox.count() if _outbox is not None else 0
+
+def _table_of(path: str) -> str:
+    return path.split("?", 1)[0]
+
+def _with_client_key(path: str, data, key: str):
+    """Insert idempoten: setiap baris membawa client_key, server merge kalau key sudah ada."""
+    tbl = _table_of(path)
+    if tbl not in CLIENT_KEY_TABLES or tbl in _client_key_unsupported or "on_conflict=" in path:
+        return path, data
+    rows = data if isinstance(data, list) else [data]
+    rows = [{**row, "client_key": f"{key}-{i}" if len(rows) > 1 else key} for i, row in enumerate(rows)]
+    sep = "&" if "?" in path else "?"
+    return f"{path}{sep}on_conflict=client_key", (rows if isinstance(data, list) else rows[0])
+
+def _send(method: str, path: str, data=None, timeout=None, headers=None):
+    if method == "POST" and "on_conflict=client_key" in path:
+        headers = {**UPSERT_HEADERS, **(headers or {})}
+    r = _request(method, path, json=data, timeout=timeout, headers=headers)
+    if method == "POST" and r.status_code == 400 and "client_key" in (r.text or ""):
+        # tabel ini belum punya kolom client_key di server => insert biasa (tabel lain tidak terpengaruh)
+        _client_key_unsupported.add(_table_of(path))
+        path = path.replace("?on_conflict=client_key", "").replace("&on_conflict=client_key", "")
+        rows = data if isinstance(data, list) else [data]
+        rows = [{k: v for k, v in row.items() if k != "client_key"} for row in rows]
+        data = rows if isinstance(data, list) else rows[0]
+        r = _request(method, path, json=data, timeout=timeout, headers=headers)
+    return r
+
+def _optimistic(method: str, path: str, data):
+    """Baris hasil optimis untuk write yang diantrikan + daftar id sementara (untuk POST)."""
+    tbl = _table_of(path)
+    if method == "POST":
+        rows, temp_ids = [], []
+        for row in (data if isinstance(data, list) else [data]):
+            row = dict(row)
+            existing = None
+            if tbl == "vocabulary_translation" and _replica is not None:
+                # upsert translation: pakai baris yang sudah ada untuk bahasa yang sama
+                same = [t for t in _replica.select(tbl, parent_id=row.get("vocabulary_id"))
+                        if t.get("bahasa") == row.get("bahasa")]
+                existing = same[0] if same else None
+            if existing is not None:
+                row = {**existing, **row, "id": existing["id"]}
+                temp_ids.append(None)
+            else:
+                row["id"] = _outbox.next_temp_id()
+                temp_ids.append(row["id"])
+            rows.append(row)
+        return rows, temp_ids
+
+    if method == "PATCH" and "id=eq." in path:
+        row_ids = [int(path.rsplit("id=eq.", 1)[1].split("&", 1)[0])]
+    elif method == "PATCH" and "id=in.(" in path:
+        # bulk update (set_*_hafal banyak id sekaligus)
+        row_ids = [int(x) for x in path.rsplit("id=in.(", 1)[1].split(")", 1)[0].split(",") if x]
+    else:
+        return [], []
+    rows = []
+    for row_id in row_ids:
+        current = _replica.get(tbl, row_id) if _replica is not None else None
+        rows.append({**(current or {"id": row_id}), **data})
+    return rows, []
+
+def _write(method: str, path: str, data=None, timeout=None, headers=None):
+    if _outbox is None or _table_of(path) not in OUTBOX_TABLES:
+        return _request(method, path, json=data, timeout=timeout, headers=headers)
+
+    with _write_lock:
+        # id sementara yang insert-nya sudah terkirim => pakai id asli
+        path = _outbox.resolve_path(path)
+        data = _outbox.resolve_body(data)
+
+        key = Outbox.new_key()
+        if method == "POST":
+            path, data = _with_client_key(path, data, key)
+
+        if _outbox.count():
+            _flush_locked()
+        if not _outbox.count():
+            try:
+                r = _send(method, path, data, timeout=timeout, headers=headers)
+            except TransportError:
+                pass
+            else:
+                if r.status_code < 500:
+                    return r
+
+        rows, temp_ids = _optimistic(method, path, data)
+        _outbox.add(key, method, path, data, headers, temp_ids)
+        return _Queued(rows)
+
+def flush_outbox() -> int:
+    """Kirim ulang write yang tertunda (urut). Return jumlah yang masih tertunda."""
+    if _outbox is None:
+        return 0
+    with _write_lock:
+        return _flush_locked()
+
+def _flush_locked() -> int:
+    for e in _outbox.pending():
+        tbl = _table_of(e["path"])
+        path = _outbox.resolve_path(e["path"])
+        body = _outbox.resolve_body(e["body"])
+        try:
+            r = _send(e["method"], path, body, headers=e["headers"])
+        except TransportError as ex:
+            _outbox.retry_later(e["seq"], str(ex))
+            break
+        if r.status_code >= 500:
+            _outbox.retry_later(e["seq"], f"{r.status_code} {r.text[:200]}")
+            break
+
+        if not r.ok:
+            # ditolak server => baris optimisnya tidak akan pernah ada
+            _outbox.fail(e["seq"], f"{r.status_code} {r.text[:200]}")
+            for temp in e["temp_ids"]:
+                if temp is not None:
+                    _cache_delete(tbl, temp)
+            continue
+
+        rows = r.json() if e["method"] != "DELETE" else []
+        for temp, row in zip(e["temp_ids"], rows):
+            if temp is not None:
+                _outbox.map_id(temp, row["id"])
+                if _replica is not None:
+                    _replica.delete(tbl, temp)
+        if rows:
+            _cache_upsert(tbl, rows)
+        _outbox.done(e["seq"])
+    return _outbox.count()
+
+# ==================================================
+# BULK WRITE
+# banyak id dalam satu PATCH (id=in.(...)), dipecah per BULK_CHUNK
+# supaya URL tidak terlalu panjang
+# ==================================================
+BULK_CHUNK = 200
+
+def _patch_many(tbl: str, row_ids, data: dict) -> int:
+    """PATCH data ke semua row_ids. Return status code (yang gagal pertama kalau ada)."""
+    ids = sorted({int(x) for x in row_ids})
+    status = 204
+    done = []
+    for i in range(0, len(ids), BULK_CHUNK):
+        chunk = ids[i:i + BULK_CHUNK]
+        r = _patch(f"{tbl}?id=in.({','.join(map(str, chunk))})", data)
+        if not r.ok:
+            status = r.status_code
+            break
+        status = r.status_code
+        done.extend(chunk)
+    if done:
+        _cache_patch_many(tbl, done, data)
+    return status
+
 # ==================================================
 # FOLDERS 
 # ==================================================
 def _folder_name_from_row(row: dict) -> str:
     return row.get("nama_folder") or row.get("nama") or ""
 
+# kolom yang dipakai daftar/combo folder
+FOLDER_COLUMNS = "id,nama_folder"
+# replika menyimpan baris apa adanya => ikutkan kolom lama nama (skema lama), di server
+# kolom ini tidak di-select (akan ditolak kalau tidak ada; lihat fallback select=*)
+FOLDER_REPLICA_COLUMNS = f"{FOLDER_COLUMNS},nama"
+_folder_columns_supported = True   # False => skema lama, langsung select=* tanpa request gagal dulu
+
+def _folder_select() -> str:
+    return FOLDER_COLUMNS if _folder_columns_supported else "*"
+
 def get_folders(user_id: int):
-    params = {"user_id": f"eq.{user_id}", "order": "id.desc"}
+    global _folder_columns_supported
+    rep = _cache_for(user_id, "folders")
+    if rep is not None:
+        return _project_rows(rep.select("folders"), FOLDER_REPLICA_COLUMNS, Folder)
+
+    params = {"user_id": f"eq.{user_id}", "order": "id.desc", "select": _folder_select()}
     r = _get("folders", params=params)
-    return r.json() if r.ok else []
+    if not r.ok and _folder_columns_supported:
+        # skema lama (kolom nama, bukan nama_folder) => semua kolom
+        if r.status_code == 400:
+            _folder_columns_supported = False
+        params["select"] = "*"
+        r = _get("folders", params=params)
+    return _records(r, Folder)
+
+# jumlah isi per folder dalam satu request: embed count, alias untuk yang sudah hafal
+# (filter notes_hafal.hafal / vocab_hafal.sudah_hafal hanya berlaku ke embed-nya)
+FOLDER_COUNT_EMBEDS = ("notes_total:notes(count),notes_hafal:notes(count),"
+                       "vocab_total:vocabulary(count),vocab_hafal:vocabulary(count)")
+FOLDER_COUNT_KEYS = ("notes_total", "notes_hafal", "vocab_total", "vocab_hafal")
+
+def _embedded_count(value) -> int:
+    # bentuk embed count PostgREST: [{"count": n}]
+    if isinstance(value, list) and value:
+        return int(value[0].get("count") or 0)
+    return 0
+
+def _count_by_folder(user_id: int, tbl: str, flag_col: str):
+    """{folder_id: (jumlah, jumlah hafal)} dari kolom folder_id + flag saja (tanpa embed)."""
+    params = {"user_id": f"eq.{user_id}", "folder_id": "not.is.null", "select": f"folder_id,{flag_col}"}
+    result = {}
+    for row in _fetch_rows(tbl, params) or []:
+        total, flagged = result.get(row["folder_id"], (0, 0))
+        result[row["folder_id"]] = (total + 1, flagged + (1 if row.get(flag_col) else 0))
+    return result
+
+def get_folders_with_counts(user_id: int):
+    """
+    Seperti get_folders, tapi tiap folder membawa jumlah isinya:
+    notes_total, notes_hafal, vocab_total, vocab_hafal (int).
+    - server: 1 request (embed count), bukan membuka folder satu per satu
+    - replika lokal: dihitung dengan GROUP BY
+    """
+    rep = _cache_for(user_id, "folders")
+    if rep is not None and _cache_for(user_id, "notes") is rep and _cache_for(user_id, "vocabulary") is rep:
+        folders = _project_rows(rep.select("folders"), FOLDER_REPLICA_COLUMNS, Folder)
+        counts = {"notes": rep.count_by_folder("notes"), "vocabulary": rep.count_by_folder("vocabulary")}
+    else:
+        params = {
+            "user_id": f"eq.{user_id}",
+            "order": "id.desc",
+            "select": f"{_folder_select()},{FOLDER_COUNT_EMBEDS}",
+            "notes_hafal.hafal": "eq.true",
+            "vocab_hafal.sudah_hafal": "eq.true",
+        }
+        r = _get("folders", params=params)
+        if r.ok:
+            folders = _records(r, Folder)
+            for f in folders:
+                for key in FOLDER_COUNT_KEYS:
+                    f[key] = _embedded_count(f.get(key))
+            return folders
+
+        # relasi folders -> notes/vocabulary belum ada di skema (embed ditolak) => hitung di klien
+        folders = get_folders(user_id)
+        counts = {
+            "notes": _count_by_folder(user_id, "notes", "hafal"),
+            "vocabulary": _count_by_folder(user_id, "vocabulary", "sudah_hafal"),
+        }
+
+    for f in folders:
+        f["notes_total"], f["notes_hafal"] = counts["notes"].get(f["id"], (0, 0))
+        f["vocab_total"], f["vocab_hafal"] = counts["vocabulary"].get(f["id"], (0, 0))
+    return folders
 
 def insert_folder(user_id: int, nama_folder: str):
     r = _post("folders", {"user_id": user_id, "nama_folder": nama_folder})
     if r.ok:
+        _cache_upsert("folders", r.json())
         return {"ok": True, "data": r.json()}
 
     r2 = _post("folders", {"user_id": user_id, "nama": nama_folder})
     if r2.ok:
+        _cache_upsert("folders", r2.json())
         return {"ok": True, "data": r2.json()}
 
     return {"ok": False, "error": r.text}
@@ -110,22 +653,43 @@ def insert_folder(user_id: int, nama_folder: str):
 def update_folder(folder_id: int, nama_folder: str):
     r = _patch(f"folders?id=eq.{folder_id}", {"nama_folder": nama_folder})
     if r.ok:
+        _cache_upsert("folders", r.json())
         return {"ok": True, "data": r.json()}
 
     r2 = _patch(f"folders?id=eq.{folder_id}", {"nama": nama_folder})
     if r2.ok:
+        _cache_upsert("folders", r2.json())
         return {"ok": True, "data": r2.json()}
 
     return {"ok": False, "error": r.text}
 
 def delete_folder(folder_id: int):
     r = _delete(f"folders?id=eq.{folder_id}")
+    if r.ok:
+        _cache_delete("folders", folder_id)
+        # efek FK (set null / cascade) ke isi folder ditentukan DB => ambil ulang
+        if _replica is not None:
+            _replica.invalidate("notes", "vocabulary", "vocabulary_translation")
     return r.status_code
 
 # ==================================================
 # NOTES
 # ==================================================
-def get_notes(user_id: int, folder_id=None, hafal=None):
+def _page_params(params: dict, before_id=None, limit=None, offset=None):
+    # keyset paging: urut id.desc, halaman berikutnya = id < id terakhir
+    if before_id is not None:
+        params["id"] = f"lt.{before_id}"
+    if limit is not None:
+        params["limit"] = int(limit)
+    if offset is not None:
+        params["offset"] = int(offset)
+
+# kolom daftar hafalan: tanpa isi (isi lengkap diambil per baris lewat get_note_isi)
+NOTE_LIST_COLUMNS = "id,folder_id,judul,hafal,created_at"
+_preview_supported = True
+
+def get_notes(user_id: int, folder_id=None, hafal=None, before_id=None, limit=None, offset=None,
+              columns: str = "*", preview: bool = False):
     """
     folder_id:
       - None => all
@@ -134,7 +698,24 @@ def get_notes(user_id: int, folder_id=None, hafal=None):
     hafal:
       - None => all
       - True/False => filter
+    before_id/limit:
+      - None => semua baris
+      - limit=n => satu halaman (n baris), before_id = id terakhir halaman sebelumnya
+      - offset => lewati n baris (untuk sampling acak)
+    columns: kolom yang diambil (select=), default semua
+    preview=True => tiap baris membawa isi_preview (isi dipotong NOTE_PREVIEW_CHARS karakter)
     """
+    global _preview_supported
+    rep = _cache_for(user_id, "notes", fill=limit is None)
+    if rep is not None:
+        rows = rep.select("notes", folder_id=folder_id, flag=hafal, before_id=before_id, limit=limit, offset=offset)
+        if preview:
+            for row in rows:
+                row["isi_preview"] = _preview(row.get("isi"))
+            if columns != "*":
+                columns += ",isi_preview"
+        return _project_rows(rows, columns, Note)
+
     params = {"user_id": f"eq.{user_id}", "order": "id.desc"}
     if folder_id == "NO_FOLDER":
         params["folder_id"] = "is.null"
@@ -145,59 +726,158 @@ def get_notes(user_id: int, folder_id=None, hafal=None):
         params["hafal"] = "eq.true"
     elif hafal is False:
         params["hafal"] = "eq.false"
-
-    r = _get("notes", params=params)
-    return r.json() if r.ok else []
+    _page_params(params, before_id, limit, offset)
+
+    if preview and _preview_supported:
+        params["select"] = f"{columns},isi_preview"
+        r = _get("notes", params=params)
+        if r.ok or r.status_code != 400:
+            return _records(r, Note)
+        # fungsi isi_preview belum ada di skema => ambil isi lalu potong di sini
+        _preview_supported = False
+
+    params["select"] = f"{columns},isi" if preview and columns != "*" else columns
+    rows = _records(_get("notes", params=params), Note)
+    if preview:
+        for row in rows:
+            row["isi_preview"] = _preview(row.get("isi"))
+            if columns != "*":
+                del row["isi"]
+    return rows
+
+def get_note_isi(note_id: int):
+    """Isi lengkap satu catatan (untuk daftar yang hanya memuat preview); None kalau gagal."""
+    if _replica is not None and _replica.is_loaded("notes"):
+        row = _replica.get("notes", note_id)
+        if row is not None:
+            return row.get("isi") or ""
+
+    rows = _fetch_rows("notes", {"id": f"eq.{note_id}", "select": "isi"})
+    if not rows:
+        return None
+    return rows[0].get("isi") or ""
 
 def insert_note(data: dict):
     r = _post("notes", data)
-    return r.json() if r.ok else []
+    rows = r.json() if r.ok else []
+    _cache_upsert("notes", rows)
+    return rows
 
 def update_note(note_id: int, data: dict):
     r = _patch(f"notes?id=eq.{note_id}", data)
-    return r.json() if r.ok else []
+    rows = r.json() if r.ok else []
+    _cache_upsert("notes", rows)
+    return rows
 
 def delete_note(note_id: int):
     r = _delete(f"notes?id=eq.{note_id}")
+    if r.ok:
+        _cache_delete("notes", note_id)
     return r.status_code
 
 def set_note_hafal(note_id: int, hafal: bool):
     r = _patch(f"notes?id=eq.{note_id}", {"hafal": bool(hafal)})
+    if r.ok:
+        _cache_patch("notes", note_id, {"hafal": bool(hafal)})
     return r.status_code
 
+def set_notes_hafal(ids, hafal: bool):
+    return _patch_many("notes", ids, {"hafal": bool(hafal)})
+
 # ==================================================
 # REMINDERS
 # ==================================================
+# kolom yang ditampilkan tabel reminder
+REMINDER_LIST_COLUMNS = "id,judul,tanggal,selesai"
+
 def get_reminders(user_id: int):
-    params = {"user_id": f"eq.{user_id}", "order": "id.desc"}
+    rep = _cache_for(user_id, "reminders")
+    if rep is not None:
+        return _project_rows(rep.select("reminders"), REMINDER_LIST_COLUMNS, Reminder)
+
+    params = {"user_id": f"eq.{user_id}", "order": "id.desc", "select": REMINDER_LIST_COLUMNS}
     r = _get("reminders", params=params)
-    return r.json() if r.ok else []
+    return _records(r, Reminder)
+
+REMINDER_COLUMNS = "id,judul,tanggal"
+
+def get_pending_reminders(user_id: int, until=None, exclude_ids=()):
+    """
+    Reminder belum selesai (kolom minimal: id, judul, tanggal), urut tanggal.asc.
+    until: "YYYY-MM-DD" => hanya tanggal <= until
+    exclude_ids: id yang sudah dinotifikasi (tidak ikut dikirim server)
+    """
+    exclude_ids = sorted(int(x) for x in exclude_ids)
+    rep = _cache_for(user_id, "reminders")
+    if rep is not None:
+        skip = set(exclude_ids)
+        rows = [
+            {k: r.get(k) for k in ("id", "judul", "tanggal")}
+            for r in rep.select("reminders", flag=False, descending=False)
+            if r["id"] not in skip and (until is None or (r.get("tanggal") or "")[:10] <= until)
+        ]
+        rows.sort(key=lambda r: r.get("tanggal") or "")
+        return records.from_rows(rows, Reminder)
+
+    params = {
+        "user_id": f"eq.{user_id}",
+        "selesai": "eq.false",
+        "select": REMINDER_COLUMNS,
+        "order": "tanggal.asc,id.asc",
+    }
+    if until is not None:
+        # bandingkan tanggal saja (seperti replika): "2024-05-01T09:00" tetap masuk until=2024-05-01
+        next_day = date.fromisoformat(until[:10]) + timedelta(days=1)
+        params["tanggal"] = f"lt.{next_day.isoformat()}"
+    if exclude_ids:
+        params["id"] = "not.in.(%s)" % ",".join(map(str, exclude_ids))
+    r = _get("reminders", params=params)
+    return _records(r, Reminder)
+
+def get_due_reminders(user_id: int, exclude_ids=(), today=None):
+    """Reminder jatuh tempo (tanggal <= hari ini, belum selesai) yang belum dinotifikasi."""
+    today = today or date.today().isoformat()
+    return get_pending_reminders(user_id, until=today, exclude_ids=exclude_ids)
 
 def insert_reminder(user_id: int, judul: str, tanggal_iso: str):
     # tanggal_iso: "YYYY-MM-DD"
     r = _post("reminders", {"user_id": user_id, "judul": judul, "tanggal": tanggal_iso, "selesai": False})
-    return r.json() if r.ok else []
+    rows = r.json() if r.ok else []
+    _cache_upsert("reminders", rows)
+    return rows
 
 def update_reminder(reminder_id: int, data: dict):
     r = _patch(f"reminders?id=eq.{reminder_id}", data)
-    return r.json() if r.ok else []
+    rows = r.json() if r.ok else []
+    _cache_upsert("reminders", rows)
+    return rows
 
 def delete_reminder(reminder_id: int):
     r = _delete(f"reminders?id=eq.{reminder_id}")
+    if r.ok:
+        _cache_delete("reminders", reminder_id)
     return r.status_code
 
 def set_reminder_done(reminder_id: int, selesai: bool):
     r = _patch(f"reminders?id=eq.{reminder_id}", {"selesai": bool(selesai)})
+    if r.ok:
+        _cache_patch("reminders", reminder_id, {"selesai": bool(selesai)})
     return r.status_code
 
+def set_reminders_done(ids, selesai: bool):
+    return _patch_many("reminders", ids, {"selesai": bool(selesai)})
+
 # ==================================================
 # VOCABULARY
 # ==================================================
-def get_vocabularies(user_id: int, folder_id=None, sudah_hafal=None):
+VOCAB_COLUMNS = "id,folder_id,catatan,sudah_hafal"
+TRANSLATION_EMBED = "vocabulary_translation(id,bahasa,kosakata,pengucapan,arti)"
+
+def _vocab_params(user_id: int, select: str, folder_id=None, sudah_hafal=None):
     params = {
         "user_id": f"eq.{user_id}",
         "order": "id.desc",
-        "select": "id,folder_id,catatan,sudah_hafal"
+        "select": select
     }
 
     if folder_id == "NO_FOLDER":
@@ -209,34 +889,98 @@ def get_vocabularies(user_id: int, folder_id=None, sudah_hafal=None):
         params["sudah_hafal"] = "eq.true"
     elif sudah_hafal is False:
         params["sudah_hafal"] = "eq.false"
+    return params
+
+def get_vocabularies(user_id: int, folder_id=None, sudah_hafal=None):
+    rep = _cache_for(user_id, "vocabulary")
+    if rep is not None:
+        return records.from_rows(rep.select("vocabulary", folder_id=folder_id, flag=sudah_hafal), Vocabulary)
 
+    params = _vocab_params(user_id, VOCAB_COLUMNS, folder_id, sudah_hafal)
     r = _get("vocabulary", params=params)
-    return r.json() if r.ok else []
+    return _records(r, Vocabulary)
+
+def get_vocabularies_with_translations(user_id: int, folder_id=None, sudah_hafal=None, before_id=None, limit=None, offset=None, langs=()):
+    """
+    Sama seperti get_vocabularies (filter folder & sudah_hafal), tapi translations
+    ikut di-embed di key "vocabulary_translation" => cukup 1 request untuk semua konsep.
+    before_id/limit/offset: halaman seperti get_notes.
+    langs: hanya konsep yang punya translation semua bahasa ini (dipakai kuis).
+    """
+    rep = _cache_for(user_id, "vocabulary_translation", fill=limit is None)
+    if rep is not None:
+        vocabs = rep.select("vocabulary", folder_id=folder_id, flag=sudah_hafal, before_id=before_id,
+                            limit=limit, offset=offset, langs=langs)
+        by_vocab = rep.translations_by_vocab([v["id"] for v in vocabs])
+        for v in vocabs:
+            v["vocabulary_translation"] = by_vocab.get(v["id"], [])
+        return records.from_rows(vocabs, Vocabulary)
+
+    params = _vocab_params(user_id, f"{VOCAB_COLUMNS},{TRANSLATION_EMBED}", folder_id, sudah_hafal)
+    params["vocabulary_translation.order"] = "id.asc"
+    _lang_filter(params, langs)
+    _page_params(params, before_id, limit, offset)
+    r = _get("vocabulary", params=params)
+    return _records(r, Vocabulary)
+
+def get_vocabulary_with_translations(vocab_id: int):
+    """Satu konsep + semua translation-nya (embed), atau None kalau tidak ada."""
+    rep = _cache_for(None, "vocabulary_translation")
+    if rep is not None:
+        v = rep.get("vocabulary", vocab_id)
+        if v is not None:
+            v["vocabulary_translation"] = rep.translations_by_vocab([vocab_id]).get(vocab_id, [])
+            v = records.from_rows([v], Vocabulary)[0]
+        return v
+
+    params = {"id": f"eq.{vocab_id}", "select": f"{VOCAB_COLUMNS},{TRANSLATION_EMBED}"}
+    rows = _records(_get("vocabulary", params=params), Vocabulary)
+    return rows[0] if rows else None
 
 def insert_vocabulary(user_id: int, catatan: str = "", folder_id=None):
     data = {"user_id": user_id, "catatan": catatan, "sudah_hafal": False, "folder_id": folder_id}
     r = _post("vocabulary", data)
-    return r.json() if r.ok else []
+    rows = r.json() if r.ok else []
+    _cache_upsert("vocabulary", rows)
+    return rows
 
 def update_vocabulary(vocab_id: int, data: dict):
     r = _patch(f"vocabulary?id=eq.{vocab_id}", data)
-    return r.json() if r.ok else []
+    rows = r.json() if r.ok else []
+    _cache_upsert("vocabulary", rows)
+    return rows
 
 def delete_vocabulary(vocab_id: int):
     r = _delete(f"vocabulary?id=eq.{vocab_id}")
+    if r.ok:
+        _cache_delete("vocabulary", vocab_id)
     return r.status_code
 
 def set_vocab_hafal(vocab_id: int, hafal: bool):
     r = _patch(f"vocabulary?id=eq.{vocab_id}", {"sudah_hafal": bool(hafal)})
+    if r.ok:
+        _cache_patch("vocabulary", vocab_id, {"sudah_hafal": bool(hafal)})
     return r.status_code
 
+def set_vocabs_hafal(ids, hafal: bool):
+    return _patch_many("vocabulary", ids, {"sudah_hafal": bool(hafal)})
+
 # translations
 def get_translations(vocabulary_id: int):
+    rep = _cache_for(None, "vocabulary_translation")
+    if rep is not None:
+        return records.from_rows(rep.select("vocabulary_translation", parent_id=vocabulary_id, descending=False), Translation)
+
     params = {"vocabulary_id": f"eq.{vocabulary_id}", "order": "id.asc"}
     r = _get("vocabulary_translation", params=params)
-    return r.json() if r.ok else []
+    return _records(r, Translation)
 
 def find_translation(vocabulary_id: int, bahasa: str):
+    rep = _cache_for(None, "vocabulary_translation")
+    if rep is not None:
+        rows = [t for t in rep.select("vocabulary_translation", parent_id=vocabulary_id, descending=False) if t.get("bahasa") == bahasa]
+        return rows[0]["id"] if rows else None
+
     params = {"vocabulary_id": f"eq.{vocabulary_id}", "bahasa": f"eq.{bahasa}", "select": "id"}
     r = _get("vocabulary_translation", params=params)
     rows = r.json() if r.ok else []
@@ -244,127 +988,369 @@ def find_translation(vocabulary_id: int, bahasa: str):
 
 def insert_translation(data: dict):
     r = _post("vocabulary_translation", data)
-    return r.json() if r.ok else []
+    rows = r.json() if r.ok else []
+    _cache_upsert("vocabulary_translation", rows)
+    return rows
 
 def update_translation(translation_id: int, data: dict):
     r = _patch(f"vocabulary_translation?id=eq.{translation_id}", data)
-    return r.json() if r.ok else []
+    rows = r.json() if r.ok else []
+    _cache_upsert("vocabulary_translation", rows)
+    return rows
+
+# upsert sungguhan: butuh unique (vocabulary_id, bahasa), lihat supabase_schema.sql
+TRANSLATION_CONFLICT = "vocabulary_translation?on_conflict=vocabulary_id,bahasa"
+UPSERT_HEADERS = {"Prefer": "return=representation,resolution=merge-duplicates"}
+
+def upsert_translations(vocabulary_id: int, entries):
+    """
+    Simpan beberapa bahasa sekaligus dalam satu request.
+    entries: list of dict berisi bahasa, kosakata, pengucapan, arti
+    """
+    payload = [
+        {
+            "vocabulary_id": vocabulary_id,
+            "bahasa": e["bahasa"],
+            "kosakata": e.get("kosakata") or "",
+            "pengucapan": e.get("pengucapan") or "",
+            "arti": e.get("arti") or "",
+        }
+        for e in entries
+    ]
+    if not payload:
+        return []
+    r = _post(TRANSLATION_CONFLICT, payload, headers=UPSERT_HEADERS)
+    rows = r.json() if r.ok else []
+    _cache_upsert("vocabulary_translation", rows)
+    return rows
 
 def upsert_translation(vocabulary_id: int, bahasa: str, kosakata: str, pengucapan: str, arti: str):
-    tid = find_translation(vocabulary_id, bahasa)
-    payload = {"vocabulary_id": vocabulary_id, "bahasa": bahasa, "kosakata": kosakata, "pengucapan": pengucapan, "arti": arti}
-    if tid is None:
-        return insert_translation(payload)
-    else:
-        payload2 = {"kosakata": kosakata, "pengucapan": pengucapan, "arti": arti}
-        return update_translation(tid, payload2)
+    return upsert_translations(vocabulary_id, [{"bahasa": bahasa, "kosakata": kosakata, "pengucapan": pengucapan, "arti": arti}])
 
 def delete_translation(translation_id: int):
     r = _delete(f"vocabulary_translation?id=eq.{translation_id}")
+    if r.ok:
+        _cache_delete("vocabulary_translation", translation_id)
     return r.status_code
 
 # ==================================================
 # QUIZ HELPERS
+# soal diambil dengan sampling: jumlah kandidat dihitung dulu (count saja),
+# lalu jendela kecil (QUIZ_WINDOW baris) diambil dari offset acak.
+# => untuk n soal cukup menyentuh sekitar n konsep, bukan seluruh koleksi.
 # ==================================================
 LANGS = ["Indonesia", "Inggris", "Mandarin", "Jepang"]
 
-def _all_vocab_with_translations(user_id: int, include_hafal: bool = False):
-    params = {
-        "user_id": f"eq.{user_id}",
-        "select": "id,folder_id,catatan,sudah_hafal,vocabulary_translation(id,bahasa,kosakata,pengucapan,arti)",
-        "order": "id.desc"
-    }
-    if not include_hafal:
-        params["sudah_hafal"] = "eq.false"
-    r = _get("vocabulary", params=params)
-    return r.json() if r.ok else []
+QUIZ_WINDOW = 10
+QUIZ_MAX_EMPTY_WINDOWS = 5   # sekian jendela berturut-turut tanpa soal => berhenti
+
+def _quiz_langs(from_lang: str, to_lang: str) -> tuple:
+    """Bahasa yang dipilih (bukan Acak) => konsep wajib punya translation bahasa tersebut."""
+    return tuple(dict.fromkeys(b for b in (from_lang, to_lang) if b != "Acak"))
+
+def _lang_filter(params: dict, langs):
+    # satu inner join per bahasa => server hanya mengembalikan/menghitung konsep
+    # yang punya translation semua bahasa itu (tidak perlu disaring di klien)
+    for i, lang in enumerate(langs):
+        params["select"] += f",lang{i}:vocabulary_translation!inner(bahasa)"
+        params[f"lang{i}.bahasa"] = f"eq.{lang}"
+
+def _random_order(n: int):
+    """Bilangan 0..n-1 dalam urutan acak, dibuat bertahap (tanpa list n elemen di awal)."""
+    seen = set()
+    while len(seen) < n:
+        if len(seen) * 2 >= n:
+            # sisa tinggal sedikit => acak sisanya sekaligus
+            rest = [i for i in range(n) if i not in seen]
+            random.shuffle(rest)
+            yield from rest
+            return
+        i = random.randrange(n)
+        if i not in seen:
+            seen.add(i)
+            yield i
+
+def _sample_rows(total: int, fetch_window, window: int = QUIZ_WINDOW):
+    """Baris acak tanpa pengulangan; fetch_window(offset, limit) dipanggil per jendela."""
+    blocks = (total + window - 1) // window
+    for b in _random_order(blocks):
+        rows = fetch_window(b * window, window)
+        random.shuffle(rows)
+        yield from rows
+
+def _count_candidates(user_id: int, tbl: str, flag, langs=()):
+    rep = _cache_for(user_id, "vocabulary_translation" if tbl == "vocabulary" else tbl, fill=False)
+    if rep is not None:
+        return rep.count(tbl, flag=flag, langs=langs)
+    filters = {"select": "id"}
+    if flag is False:
+        filters[FLAG_COLUMN[tbl]] = "eq.false"
+    _lang_filter(filters, langs)
+    return _count_user(tbl, user_id, **filters)
+
+def _vocab_question(v: dict, from_lang: str, to_lang: str):
+    trans = v.get("vocabulary_translation") or []
+    m = {t.get("bahasa"): t for t in trans if t.get("bahasa") and t.get("kosakata")}
+    available = [b for b in LANGS if b in m]
+
+    # butuh minimal 2 bahasa
+    if len(available) < 2:
+        return None
+
+    pairs = [
+        (a, b) for a in available for b in available
+        if a != b and from_lang in ("Acak", a) and to_lang in ("Acak", b)
+    ]
+    random.shuffle(pairs)
+    for a, b in pairs:
+        q = (m[a].get("kosakata") or "").strip()
+        ans = (m[b].get("kosakata") or "").strip()
+        if q and ans:
+            return {
+                "vocab_id": v["id"],
+                "from_lang": a,
+                "to_lang": b,
+                "prompt": q,
+                "answer": ans
+            }
+    return None
+
+def iter_quiz_vocab_questions(user_id: int, from_lang: str = "Acak", to_lang: str = "Acak", include_hafal: bool = False):
+    """
+    Generator soal kosakata (maksimal satu soal per konsep), ambil sebanyak yang perlu:
+        soal = list(itertools.islice(iter_quiz_vocab_questions(uid), 40))
+    - Kalau from/to = Acak: pasangan bahasa akan random per soal.
+    - Yang sudah hafal tidak ikut (default include_hafal=False)
+    - Bahasa yang dipilih disaring di server => hitungan & offset hanya mencakup konsep yang layak
+    """
+    flag = None if include_hafal else False
+    langs = _quiz_langs(from_lang, to_lang)
+    total = _count_candidates(user_id, "vocabulary", flag, langs)
+
+    def fetch_window(offset, limit):
+        return get_vocabularies_with_translations(user_id, sudah_hafal=flag, offset=offset, limit=limit, langs=langs)
+
+    misses = 0
+    for v in _sample_rows(total, fetch_window):
+        q = _vocab_question(v, from_lang, to_lang)
+        if q:
+            misses = 0
+            yield q
+        else:
+            # mis. mode Acak dengan banyak konsep yang baru punya 1 bahasa
+            misses += 1
+            if misses >= QUIZ_WINDOW * QUIZ_MAX_EMPTY_WINDOWS:
+                return
 
 def get_quiz_vocab_questions(user_id: int, from_lang: str = "Acak", to_lang: str = "Acak", limit: int = 30, include_hafal: bool = False):
     """
     - Kalau from/to = Acak: pasangan bahasa akan random per soal.
     - Yang sudah hafal tidak ikut (default include_hafal=False)
     """
-    items = _all_vocab_with_translations(user_id, include_hafal=include_hafal)
-    questions = []
+    return list(islice(iter_quiz_vocab_questions(user_id, from_lang, to_lang, include_hafal), limit))
 
-    for v in items:
-        trans = v.get("vocabulary_translation") or []
-        m = {t.get("bahasa"): t for t in trans if t.get("bahasa") and t.get("kosakata")}
-        available = [b for b in LANGS if b in m]
+def iter_quiz_notes_questions(user_id: int, include_hafal: bool = False):
+    flag = None if include_hafal else False
+    total = _count_candidates(user_id, "notes", flag)
 
-        # butuh minimal 2 bahasa
-        if len(available) < 2:
-            continue
+    def fetch_window(offset, limit):
+        return get_notes(user_id, hafal=flag, offset=offset, limit=limit, columns="id,judul")
 
-        # buat semua pasangan (a->b) untuk vocab itu
-        for a in available:
-            for b in available:
-                if a == b:
-                    continue
-                if from_lang != "Acak" and a != from_lang:
-                    continue
-                if to_lang != "Acak" and b != to_lang:
-                    continue
-
-                q = (m[a].get("kosakata") or "").strip()
-                ans = (m[b].get("kosakata") or "").strip()
-                if q and ans:
-                    questions.append({
-                        "vocab_id": v["id"],
-                        "from_lang": a,
-                        "to_lang": b,
-                        "prompt": q,
-                        "answer": ans
-                    })
-
-    random.shuffle(questions)
-    return questions[:limit]
+    yield from _sample_rows(total, fetch_window)
 
 def get_quiz_notes_questions(user_id: int, limit: int = 30, include_hafal: bool = False):
-    notes = get_notes(user_id, folder_id=None, hafal=None)
-    if not include_hafal:
-        notes = [n for n in notes if not (n.get("hafal") is True)]
-    random.shuffle(notes)
-    return notes[:limit]
+    return list(islice(iter_quiz_notes_questions(user_id, include_hafal), limit))
+
+# ==================================================
+# SPACED REPETITION (SM-2)
+# antrian review = baris dengan srs_due <= hari ini, urut srs_due.asc
+# (range query di index (user_id, srs_due, id), lihat supabase_schema.sql)
+# hasil jawaban menggeser srs_due; flag hafal/sudah_hafal ikut diset
+# begitu intervalnya >= srs.MASTERED_DAYS
+# ==================================================
+SRS_SELECT = ",".join(srs.SRS_COLUMNS)
+_srs_supported = True   # False => server belum punya kolom srs_* (skema lama)
+
+def _due_params(today: str, after) -> dict:
+    """Filter antrian: srs_due NULL dulu, lalu srs_due <= today; after = (srs_due, id) keyset."""
+    if after is None:
+        return {"or": f"(srs_due.is.null,srs_due.lte.{today})"}
+    due, last_id = after
+    if due is None:
+        return {"or": f"(and(srs_due.is.null,id.gt.{last_id}),srs_due.lte.{today})"}
+    return {
+        "srs_due": f"lte.{today}",
+        "or": f"(srs_due.gt.{due},and(srs_due.eq.{due},id.gt.{last_id}))",
+    }
+
+def _due_rows(user_id: int, tbl: str, limit: int, after=None, langs=()):
+    """
+    Baris jatuh tempo (max limit) sesudah after = (srs_due, id) baris terakhir halaman sebelumnya.
+    langs: khusus vocabulary, hanya konsep yang punya translation bahasa-bahasa ini.
+    None kalau server belum punya kolom srs (skema lama).
+    """
+    global _srs_supported
+    today = date.today().isoformat()
+    rep = _cache_for(user_id, "vocabulary_translation" if tbl == "vocabulary" else tbl, fill=False)
+    if rep is not None:
+        rows = rep.select_due(tbl, today, limit, after, langs)
+        if tbl == "vocabulary":
+            trans = rep.translations_by_vocab([v["id"] for v in rows])
+            for v in rows:
+                v["vocabulary_translation"] = trans.get(v["id"], [])
+        return records.from_rows(rows, records.RECORD_TYPES[tbl])
+    if not _srs_supported:
+        return None
+
+    params = {
+        "user_id": f"eq.{user_id}",
+        "order": "srs_due.asc.nullsfirst,id.asc",
+        "limit": limit,
+        **_due_params(today, after),
+    }
+    if tbl == "vocabulary":
+        params["select"] = f"{VOCAB_COLUMNS},{SRS_SELECT},{TRANSLATION_EMBED}"
+        _lang_filter(params, langs)
+    else:
+        # isi jawaban diambil saat dibuka (get_note_isi)
+        params["select"] = f"id,judul,{SRS_SELECT}"
+    r = _get(tbl, params=params)
+    if r.status_code == 400:
+        _srs_supported = False
+    return _records(r, records.RECORD_TYPES[tbl]) if r.ok else None
+
+def _iter_due(user_id: int, tbl: str, langs=()):
+    """Baris jatuh tempo per jendela QUIZ_WINDOW (tiap baris maksimal sekali, keyset (srs_due, id))."""
+    after = None
+    while True:
+        rows = _due_rows(user_id, tbl, QUIZ_WINDOW, after, langs)
+        if not rows:
+            if rows is None and after is None:
+                # skema tanpa kolom srs => sampling acak dari yang belum hafal
+                raise LookupError("srs columns missing")
+            return
+        last = rows[-1]
+        after = (last.get("srs_due"), last["id"])
+        yield from rows
+        if len(rows) < QUIZ_WINDOW:
+            return
+
+def iter_due_vocab_questions(user_id: int, from_lang: str = "Acak", to_lang: str = "Acak"):
+    """
+    Generator soal kosakata dari antrian review (paling lama jatuh tempo dulu).
+    Tiap soal membawa "srs" (state SM-2 konsepnya) untuk review_vocab.
+    """
+    try:
+        for v in _iter_due(user_id, "vocabulary", _quiz_langs(from_lang, to_lang)):
+            q = _vocab_question(v, from_lang, to_lang)
+            if q:
+                q["srs"] = srs.state_of(v)
+                yield q
+    except LookupError:
+        yield from iter_quiz_vocab_questions(user_id, from_lang, to_lang)
+
+def iter_due_notes(user_id: int):
+    """Catatan jatuh tempo (paling lama dulu); fallback sampling kalau skema belum ada srs."""
+    try:
+        yield from _iter_due(user_id, "notes")
+    except LookupError:
+        yield from iter_quiz_notes_questions(user_id)
+
+def get_due_notes(user_id: int, limit: int = 30):
+    return list(islice(iter_due_notes(user_id), limit))
+
+def _review_columns(state: dict, correct: bool, flag_col: str) -> dict:
+    grade = srs.GRADE_CORRECT if correct else srs.GRADE_WRONG
+    data = srs.review(state or {}, grade)
+    data[flag_col] = srs.is_mastered(data)
+    return data
+
+def _review(tbl: str, row_id: int, state: dict, correct: bool, set_flag):
+    global _srs_supported
+    if _srs_supported:
+        r = _patch(f"{tbl}?id=eq.{row_id}", _review_columns(state, correct, FLAG_COLUMN[tbl]))
+        if not (r.status_code == 400 and "srs_" in (r.text or "")):
+            rows = r.json() if r.ok else []
+            _cache_upsert(tbl, rows)
+            return rows
+        _srs_supported = False
+
+    # skema lama tanpa kolom srs => seperti sebelum SM-2: jawaban benar langsung ditandai hafal
+    if correct:
+        set_flag(row_id, True)
+    return []
+
+def review_vocab(vocab_id: int, state: dict, correct: bool):
+    """Catat jawaban quiz (SM-2) => jadwal review berikutnya. Return baris terbaru."""
+    return _review("vocabulary", vocab_id, state, correct, set_vocab_hafal)
+
+def review_note(note_id: int, state: dict, correct: bool):
+    return _review("notes", note_id, state, correct, set_note_hafal)
 
 # ==================================================
 # STATISTICS
+# pakai HEAD + "Prefer: count=exact" => server hanya kirim header
+# Content-Range ("0-24/123" atau "*/0"), tanpa isi baris.
 # ==================================================
+def _count(path: str, params=None) -> int:
+    params = dict(params or {})
+    params.setdefault("select", "id")
+    r = _request("HEAD", path, params=params, headers={"Prefer": "count=exact"})
+    total = (r.headers.get("Content-Range") or "").rsplit("/", 1)[-1]
+    return int(total) if total.isdigit() else 0
+
+def _count_user(table: str, user_id: int, **filters) -> int:
+    params = {"user_id": f"eq.{user_id}"}
+    params.update(filters)
+    return _count(table, params)
+
+def _count_translations(user_id: int, bahasa=None) -> int:
+    # vocabulary_translation tidak punya user_id => filter lewat inner join ke vocabulary
+    params = {"select": "id,vocabulary!inner(user_id)", "vocabulary.user_id": f"eq.{user_id}"}
+    if bahasa is not None:
+        params["bahasa"] = f"eq.{bahasa}"
+    return _count("vocabulary_translation", params)
+
 def count_notes(user_id: int) -> int:
-    return len(get_notes(user_id))
+    return _count_user("notes", user_id)
 
 def count_notes_hafal(user_id: int) -> int:
-    return len(get_notes(user_id, hafal=True))
+    return _count_user("notes", user_id, hafal="eq.true")
 
 def count_folders(user_id: int) -> int:
-    return len(get_folders(user_id))
+    return _count_user("folders", user_id)
 
 def count_vocab(user_id: int) -> int:
-    return len(get_vocabularies(user_id))
+    return _count_user("vocabulary", user_id)
 
 def count_vocab_hafal(user_id: int) -> int:
-    return len(get_vocabularies(user_id, sudah_hafal=True))
+    return _count_user("vocabulary", user_id, sudah_hafal="eq.true")
 
 def count_reminders(user_id: int) -> int:
-    return len(get_reminders(user_id))
+    return _count_user("reminders", user_id)
 
 def count_reminders_done(user_id: int) -> int:
-    data = get_reminders(user_id)
-    return len([x for x in data if x.get("selesai") is True])
+    return _count_user("reminders", user_id, selesai="eq.true")
 
 def count_vocab_translations(user_id: int) -> int:
-    vocabs = get_vocabularies(user_id)
-    total = 0
-    for v in vocabs:
-        total += len(get_translations(v["id"]))
-    return total
+    return _count_translations(user_id)
 
 def count_vocab_by_language(user_id: int):
-    result = {b: 0 for b in LANGS}
-    vocabs = get_vocabularies(user_id)
-    for v in vocabs:
-        for t in get_translations(v["id"]):
-            b = t.get("bahasa")
-            if b in result:
-                result[b] += 1
-    return result
+    return {b: _count_translations(user_id, b) for b in LANGS}
+
+def get_statistics(user_id: int) -> dict:
+    """
+    Ringkasan semua counter statistik dalam satu dict.
+    Jumlah request tetap (tidak tergantung banyaknya baris): 8 + len(LANGS).
+    """
+    return {
+        "folders": count_folders(user_id),
+        "notes_total": count_notes(user_id),
+        "notes_hafal": count_notes_hafal(user_id),
+        "vocab_total": count_vocab(user_id),
+        "vocab_hafal": count_vocab_hafal(user_id),
+        "translations_total": count_vocab_translations(user_id),
+        "translations_by_lang": count_vocab_by_language(user_id),
+        "reminders_total": count_reminders(user_id),
+        "reminders_done": count_reminders_done(user_id),
+    }
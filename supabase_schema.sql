@@ -0,0 +1,144 @@
+-- ==================================================
+-- Skema tambahan Supabase untuk VocaFlow
+-- jalankan di SQL editor Supabase (aman dijalankan ulang)
+-- ==================================================
+
+-- --------------------------------------------------
+-- Delta sync: kolom updated_at + trigger
+-- --------------------------------------------------
+create or replace function set_updated_at() returns trigger as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$ language plpgsql;
+
+alter table folders add column if not exists updated_at timestamptz not null default now();
+alter table notes add column if not exists updated_at timestamptz not null default now();
+alter table vocabulary add column if not exists updated_at timestamptz not null default now();
+alter table vocabulary_translation add column if not exists updated_at timestamptz not null default now();
+alter table reminders add column if not exists updated_at timestamptz not null default now();
+
+drop trigger if exists trg_folders_updated_at on folders;
+create trigger trg_folders_updated_at before update on folders
+    for each row execute function set_updated_at();
+drop trigger if exists trg_notes_updated_at on notes;
+create trigger trg_notes_updated_at before update on notes
+    for each row execute function set_updated_at();
+drop trigger if exists trg_vocabulary_updated_at on vocabulary;
+create trigger trg_vocabulary_updated_at before update on vocabulary
+    for each row execute function set_updated_at();
+drop trigger if exists trg_vocabulary_translation_updated_at on vocabulary_translation;
+create trigger trg_vocabulary_translation_updated_at before update on vocabulary_translation
+    for each row execute function set_updated_at();
+drop trigger if exists trg_reminders_updated_at on reminders;
+create trigger trg_reminders_updated_at before update on reminders
+    for each row execute function set_updated_at();
+
+create index if not exists idx_folders_user_updated on folders (user_id, updated_at);
+create index if not exists idx_notes_user_updated on notes (user_id, updated_at);
+create index if not exists idx_vocabulary_user_updated on vocabulary (user_id, updated_at);
+create index if not exists idx_vocabulary_translation_updated on vocabulary_translation (vocabulary_id, updated_at);
+create index if not exists idx_reminders_user_updated on reminders (user_id, updated_at);
+
+-- --------------------------------------------------
+-- Delta sync: tombstone untuk baris yang dihapus
+-- --------------------------------------------------
+create table if not exists deleted_rows (
+    id bigserial primary key,
+    user_id bigint,
+    tbl text not null,
+    row_id bigint not null,
+    deleted_at timestamptz not null default now()
+);
+create index if not exists idx_deleted_rows_user_tbl on deleted_rows (user_id, tbl, deleted_at);
+
+create or replace function log_deleted_row() returns trigger as $$
+begin
+    insert into deleted_rows (user_id, tbl, row_id) values (old.user_id, tg_table_name, old.id);
+    return old;
+end;
+$$ language plpgsql;
+
+create or replace function log_deleted_translation() returns trigger as $$
+begin
+    insert into deleted_rows (user_id, tbl, row_id)
+    values ((select user_id from vocabulary where id = old.vocabulary_id), tg_table_name, old.id);
+    return old;
+end;
+$$ language plpgsql;
+
+drop trigger if exists trg_folders_deleted on folders;
+create trigger trg_folders_deleted after delete on folders
+    for each row execute function log_deleted_row();
+drop trigger if exists trg_notes_deleted on notes;
+create trigger trg_notes_deleted after delete on notes
+    for each row execute function log_deleted_row();
+drop trigger if exists trg_vocabulary_deleted on vocabulary;
+create trigger trg_vocabulary_deleted after delete on vocabulary
+    for each row execute function log_deleted_row();
+drop trigger if exists trg_vocabulary_translation_deleted on vocabulary_translation;
+create trigger trg_vocabulary_translation_deleted after delete on vocabulary_translation
+    for each row execute function log_deleted_translation();
+drop trigger if exists trg_reminders_deleted on reminders;
+create trigger trg_reminders_deleted after delete on reminders
+    for each row execute function log_deleted_row();
+
+-- --------------------------------------------------
+-- Spaced repetition (SM-2): state per item + index antrian jatuh tempo
+-- --------------------------------------------------
+alter table vocabulary add column if not exists srs_ease real not null default 2.5;
+alter table vocabulary add column if not exists srs_interval integer not null default 0;
+alter table vocabulary add column if not exists srs_reps integer not null default 0;
+alter table vocabulary add column if not exists srs_due date not null default current_date;
+
+alter table notes add column if not exists srs_ease real not null default 2.5;
+alter table notes add column if not exists srs_interval integer not null default 0;
+alter table notes add column if not exists srs_reps integer not null default 0;
+alter table notes add column if not exists srs_due date not null default current_date;
+
+create index if not exists idx_vocabulary_srs_due on vocabulary (user_id, srs_due, id);
+create index if not exists idx_notes_srs_due on notes (user_id, srs_due, id);
+
+-- --------------------------------------------------
+-- Reminder jatuh tempo: partial index hanya untuk yang belum selesai
+-- --------------------------------------------------
+create index if not exists idx_reminders_pending_due on reminders (user_id, tanggal, id) where selesai = false;
+
+-- --------------------------------------------------
+-- Upsert translation (on_conflict=vocabulary_id,bahasa): satu baris per bahasa per konsep
+-- duplikat lama dibuang dulu (yang id-nya paling baru dipertahankan)
+-- --------------------------------------------------
+delete from vocabulary_translation a
+    using vocabulary_translation b
+    where a.vocabulary_id = b.vocabulary_id and a.bahasa = b.bahasa and a.id < b.id;
+
+alter table vocabulary_translation drop constraint if exists uq_vocabulary_translation_bahasa;
+alter table vocabulary_translation add constraint uq_vocabulary_translation_bahasa unique (vocabulary_id, bahasa);
+
+-- --------------------------------------------------
+-- Outbox offline: idempotency key untuk insert yang dikirim ulang
+-- (POST ...?on_conflict=client_key + Prefer: resolution=merge-duplicates)
+-- --------------------------------------------------
+alter table folders add column if not exists client_key text unique;
+alter table notes add column if not exists client_key text unique;
+alter table vocabulary add column if not exists client_key text unique;
+alter table reminders add column if not exists client_key text unique;
+
+-- --------------------------------------------------
+-- Jumlah isi per folder (folders?select=id,nama_folder,notes_total:notes(count),...)
+-- embed butuh FK notes.folder_id / vocabulary.folder_id -> folders(id);
+-- tanpa FK klien menghitung sendiri dari kolom folder_id + status hafal
+-- --------------------------------------------------
+create index if not exists idx_notes_folder_hafal on notes (folder_id, hafal);
+create index if not exists idx_vocabulary_folder_hafal on vocabulary (folder_id, sudah_hafal);
+
+-- --------------------------------------------------
+-- Preview isi hafalan untuk tabel (notes?select=id,judul,...,isi_preview):
+-- computed column, isi lengkap tidak ikut dikirim di daftar.
+-- panjang 120 harus sama dengan NOTE_PREVIEW_CHARS di config.py
+-- --------------------------------------------------
+create or replace function isi_preview(notes) returns text
+    language sql stable as $$
+    select case when char_length($1.isi) > 120 then rtrim(left($1.isi, 120)) || '…' else $1.isi end
+$$;
@@ -0,0 +1,241 @@
+from array import array
+
+from PySide6.QtCore import Qt, QObject, QAbstractTableModel, QModelIndex, Signal
+
+from config import PAGE_SIZE
+
+TEXT = "text"
+CHECK = "check"
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    Model tabel ringan untuk QTableView (pengganti QTableWidget + QTableWidgetItem per sel):
+    - data disimpan per kolom (column store), bukan objek Qt per sel
+    - teks sel dibentuk saat view memintanya => hanya sel yang terlihat
+    - kolom CHECK bisa di-toggle langsung; perubahan dikirim lewat checkToggled(id, checked)
+    - update_row mengubah satu baris saja tanpa membangun ulang tabel
+    - sort dilakukan lokal (urutan index), tanpa fetch ulang
+
+    columns: list of (judul, key) atau (judul, key, kind) atau (judul, key, kind, fmt)
+    """
+    checkToggled = Signal(int, bool)   # (id baris, checked)
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self._titles = [c[0] for c in columns]
+        self._keys = [c[1] for c in columns]
+        self._kinds = [c[2] if len(c) > 2 else TEXT for c in columns]
+        self._fmts = [c[3] if len(c) > 3 else None for c in columns]
+
+        self._ids = array("q")
+        self._data = {k: [] for k in self._keys}
+        self._order = []       # posisi di view -> index penyimpanan
+        self._pos = []         # index penyimpanan -> posisi di view
+        self._index_of_id = {}
+        self._sort = None      # (kolom, order) terakhir
+
+    # -------------------------
+    # isi data
+    # -------------------------
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._ids = array("q", [int(r["id"]) for r in rows])
+        for k, kind in zip(self._keys, self._kinds):
+            if kind == CHECK:
+                self._data[k] = bytearray(1 if r.get(k) else 0 for r in rows)
+            else:
+                self._data[k] = [r.get(k) for r in rows]
+        self._index_of_id = {rid: i for i, rid in enumerate(self._ids)}
+        self._order = list(range(len(self._ids)))
+        if self._sort is not None:
+            self._apply_sort(*self._sort)
+        self._rebuild_pos()
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        """Tambah baris di bawah (halaman berikutnya); id yang sudah ada dilewati."""
+        rows = [r for r in rows if int(r["id"]) not in self._index_of_id]
+        if not rows:
+            return
+        start = len(self._ids)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        for r in rows:
+            self._index_of_id[int(r["id"])] = len(self._ids)
+            self._ids.append(int(r["id"]))
+        for k, kind in zip(self._keys, self._kinds):
+            if kind == CHECK:
+                self._data[k].extend(1 if r.get(k) else 0 for r in rows)
+            else:
+                self._data[k].extend(r.get(k) for r in rows)
+        self._order.extend(range(start, len(self._ids)))
+        self._rebuild_pos()
+        self.endInsertRows()
+
+        if self._sort is not None:
+            self.sort(*self._sort)
+
+    def update_row(self, row_id: int, values: dict):
+        """Ubah sebagian kolom satu baris (mis. toggle hafal) tanpa reset model."""
+        i = self._index_of_id.get(int(row_id))
+        if i is None:
+            return
+        for k, v in values.items():
+            col = self._data.get(k)
+            if col is None:
+                continue
+            col[i] = (1 if v else 0) if isinstance(col, bytearray) else v
+        pos = self._pos[i]
+        self.dataChanged.emit(self.index(pos, 0), self.index(pos, len(self._keys) - 1))
+
+    def row_id(self, row: int) -> int:
+        return self._ids[self._order[row]]
+
+    def value(self, row: int, key: str):
+        v = self._data[key][self._order[row]]
+        if isinstance(self._data[key], bytearray):
+            return bool(v)
+        return v
+
+    def _rebuild_pos(self):
+        self._pos = [0] * len(self._order)
+        for pos, i in enumerate(self._order):
+            self._pos[i] = pos
+
+    # -------------------------
+    # QAbstractTableModel
+    # -------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._titles[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        f = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if self._kinds[index.column()] == CHECK:
+            f |= Qt.ItemIsUserCheckable
+        return f
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        c = index.column()
+        v = self._data[self._keys[c]][self._order[index.row()]]
+
+        if self._kinds[c] == CHECK:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if v else Qt.Unchecked
+            return None
+
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            fmt = self._fmts[c]
+            if fmt is not None:
+                return fmt(v)
+            return "" if v is None else str(v)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole or self._kinds[index.column()] != CHECK:
+            return False
+        checked = (value == Qt.Checked.value) if isinstance(value, int) else (value == Qt.Checked)
+        i = self._order[index.row()]
+        self._data[self._keys[index.column()]][i] = 1 if checked else 0
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.checkToggled.emit(self._ids[i], checked)
+        return True
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        # seleksi view ikut pindah ke posisi baru barisnya
+        persistent = self.persistentIndexList()
+        stored = [(self._order[ix.row()], ix.column()) for ix in persistent]
+
+        self._sort = (column, order)
+        self._apply_sort(column, order)
+        self._rebuild_pos()
+
+        self.changePersistentIndexList(persistent, [self.index(self._pos[i], c) for i, c in stored])
+        self.layoutChanged.emit()
+
+    def _apply_sort(self, column, order):
+        col = self._data[self._keys[column]]
+        # None di belakang, teks dibandingkan tanpa beda huruf besar/kecil
+        def key(i):
+            v = col[i]
+            if v is None:
+                return (1, "")
+            return (0, v if isinstance(v, (int, float)) else str(v).casefold())
+        self._order.sort(key=key, reverse=(order == Qt.DescendingOrder))
+
+class PagedTableLoader(QObject):
+    """
+    Infinite scroll untuk RecordTableModel + QTableView:
+    - reset(fetch): ambil halaman pertama (1 request kecil) lalu tampilkan
+    - halaman berikutnya di-prefetch di background (TaskRunner)
+    - saat scroll mendekati bawah, halaman hasil prefetch ditempel ke model
+
+    fetch(before_id, limit) -> list baris urut id.desc (dipanggil di worker thread)
+    """
+    def __init__(self, view, model: RecordTableModel, tasks, page_size: int = PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.model = model
+        self.tasks = tasks
+        self.page_size = page_size
+
+        self.fetch = None
+        self.on_first_page = None
+        self.last_id = None
+        self.has_more = False
+        self.prefetched = None
+
+        view.verticalScrollBar().valueChanged.connect(self._on_scroll)
+
+    def reset(self, fetch, on_first_page=None):
+        self.tasks.cancel("prefetch")
+        self.fetch = fetch
+        self.on_first_page = on_first_page
+        self.last_id = None
+        self.has_more = False
+        self.prefetched = None
+        self.tasks.run("page", fetch, None, self.page_size, on_done=self._first_page)
+
+    def _first_page(self, rows):
+        self.model.set_rows(rows)
+        self._after_page(rows)
+        if self.on_first_page is not None:
+            self.on_first_page()
+
+    def _after_page(self, rows):
+        self.has_more = len(rows) >= self.page_size
+        if rows:
+            self.last_id = min(int(r["id"]) for r in rows)
+        if self.has_more:
+            self.tasks.run("prefetch", self.fetch, self.last_id, self.page_size, on_done=self._on_prefetched)
+
+    def _on_prefetched(self, rows):
+        self.prefetched = rows
+        if self._near_bottom():
+            self._append_prefetched()
+
+    def _on_scroll(self, value):
+        if self._near_bottom():
+            self._append_prefetched()
+
+    def _append_prefetched(self):
+        if self.prefetched is None:
+            return
+        rows, self.prefetched = self.prefetched, None
+        self.model.append_rows(rows)
+        self._after_page(rows)
+
+    def _near_bottom(self) -> bool:
+        sb = self.view.verticalScrollBar()
+        return sb.value() >= sb.maximum() - sb.pageStep()
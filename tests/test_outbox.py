@@ -0,0 +1,115 @@
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import supabase_client as sc
+from fake_postgrest import FakePostgrest
+from http_transport import SupabaseTransport, TransportError
+
+# ==================================================
+# Outbox: write saat offline, lalu flush ke fake_postgrest setelah online lagi
+# Jalankan dari root repo: python -m unittest discover tests
+# ==================================================
+class SwitchTransport:
+    """Transport asli ke fake_postgrest yang bisa dibuat offline / kehilangan response."""
+    def __init__(self):
+        self.inner = SupabaseTransport(headers=sc.HEADERS, retries=0)
+        self.online = False
+        self.lose_response = False   # request sampai ke server, response-nya hilang
+
+    def request(self, method, url, **kwargs):
+        if not self.online:
+            raise TransportError("offline")
+        r = self.inner.request(method, url, **kwargs)
+        if self.lose_response:
+            raise TransportError("response lost")
+        return r
+
+class OutboxFlushTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.srv = FakePostgrest(os.path.join(self.tmp.name, "server.db")).start()
+        self._url, self._interval = sc.SUPABASE_URL, sc.SYNC_MIN_INTERVAL
+        sc.SUPABASE_URL = self.srv.url
+        sc.SYNC_MIN_INTERVAL = 0
+        self.net = SwitchTransport()
+        self._transport = sc.set_transport(self.net)
+
+        self.uid = self.srv.db.seed("users", [{"username": "u", "password": "x"}])[0]
+        sc.open_local_cache(self.uid, os.path.join(self.tmp.name, "replica.db"))
+        sc.open_outbox(self.uid, os.path.join(self.tmp.name, "outbox.db"))
+
+    def tearDown(self):
+        sc.close_outbox()
+        sc.close_local_cache()
+        sc.set_transport(self._transport)
+        sc.SUPABASE_URL, sc.SYNC_MIN_INTERVAL = self._url, self._interval
+        self.srv.stop()
+        self.tmp.cleanup()
+
+    def server_rows(self, tbl):
+        return self.srv.db.select(tbl, [])[0]
+
+    def test_child_of_temp_parent_gets_real_id(self):
+        v = sc.insert_vocabulary(self.uid, catatan="kucing")
+        temp_id = v[0]["id"]
+        self.assertLess(temp_id, 0)
+        sc.upsert_translations(temp_id, [{"bahasa": "Inggris", "kosakata": "cat"}])
+        self.assertEqual(sc.outbox_pending(), 2)
+        self.assertEqual(self.server_rows("vocabulary"), [])
+
+        self.net.online = True
+        self.assertEqual(sc.flush_outbox(), 0)
+
+        vocabs = self.server_rows("vocabulary")
+        self.assertEqual([x["catatan"] for x in vocabs], ["kucing"])
+        real_id = vocabs[0]["id"]
+        self.assertEqual([(t["vocabulary_id"], t["kosakata"]) for t in self.server_rows("vocabulary_translation")],
+                         [(real_id, "cat")])
+
+        # replika: id sementara sudah diganti id asli
+        rows = sc.get_vocabularies_with_translations(self.uid)
+        self.assertEqual([x["id"] for x in rows], [real_id])
+        self.assertEqual([t["kosakata"] for t in rows[0]["vocabulary_translation"]], ["cat"])
+
+        # write berikutnya yang masih memakai id sementara diarahkan ke id asli
+        sc.update_vocabulary(temp_id, {"catatan": "neko"})
+        self.assertEqual([x["catatan"] for x in self.server_rows("vocabulary")], ["neko"])
+
+    def test_replay_after_lost_response_is_idempotent(self):
+        # insert sampai ke server tapi response hilang => masuk outbox, dikirim ulang saat flush
+        self.net.online = True
+        self.net.lose_response = True
+        sc.insert_vocabulary(self.uid, catatan="sekali")
+        self.assertEqual(sc.outbox_pending(), 1)
+        self.assertEqual(len(self.server_rows("vocabulary")), 1)
+
+        self.net.lose_response = False
+        self.assertEqual(sc.flush_outbox(), 0)
+        vocabs = self.server_rows("vocabulary")
+        self.assertEqual([x["catatan"] for x in vocabs], ["sekali"])
+        self.assertEqual([x["id"] for x in sc.get_vocabularies(self.uid)], [vocabs[0]["id"]])
+
+    def test_rejected_write_moves_to_failed(self):
+        bad = sc.insert_note({"user_id": self.uid, "judul": "a", "isi": "b", "kolom_salah": 1})
+        sc.insert_note({"user_id": self.uid, "judul": "c", "isi": "d"})
+        self.assertEqual(sc.outbox_pending(), 2)
+
+        self.net.online = True
+        self.assertEqual(sc.flush_outbox(), 0)
+
+        failed = sc._outbox.failed()
+        self.assertEqual(len(failed), 1)
+        self.assertTrue(failed[0]["path"].startswith("notes"))
+        self.assertIn("400", failed[0]["error"])
+
+        # write sesudahnya tetap terkirim, baris optimis yang ditolak hilang dari replika
+        self.assertEqual([n["judul"] for n in self.server_rows("notes")], ["c"])
+        self.assertIsNone(sc._replica.get("notes", bad[0]["id"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import supabase_client as sc
+from fake_postgrest import FakePostgrest
+
+# ==================================================
+# Antrian review & soal kuis terhadap fake_postgrest (tanpa jaringan)
+# Jalankan dari root repo: python -m unittest discover tests
+# ==================================================
+N_VOCAB = 25        # > 2 jendela QUIZ_WINDOW
+JP_EN_EVERY = 8     # konsep ke-0, 8, 16, 24 punya Jepang + Inggris
+
+class QuizTestBase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.srv = FakePostgrest(os.path.join(self.tmp.name, "server.db")).start()
+        self._url, self._interval = sc.SUPABASE_URL, sc.SYNC_MIN_INTERVAL
+        sc.SUPABASE_URL = self.srv.url
+        sc.SYNC_MIN_INTERVAL = 0
+
+        db = self.srv.db
+        self.uid = db.seed("users", [{"username": "u", "password": "x"}])[0]
+        self.vids = db.seed("vocabulary", [{"user_id": self.uid, "catatan": ""} for _ in range(N_VOCAB)])
+        trans = []
+        for i, vid in enumerate(self.vids):
+            langs = ("Jepang", "Inggris") if i % JP_EN_EVERY == 0 else ("Indonesia", "Mandarin")
+            trans += [{"vocabulary_id": vid, "bahasa": b, "kosakata": f"{b}{i}"} for b in langs]
+        db.seed("vocabulary_translation", trans)
+
+        # sepertiga belum pernah direview (srs_due default = hari ini), sisanya jatuh tempo
+        # di tanggal berbeda, beberapa sama persis => urutan di tanggal yang sama ditentukan id
+        for i, vid in enumerate(self.vids):
+            if i % 3:
+                db.update("vocabulary", {"srs_due": "2020-01-0%d" % (i % 4 + 1)}, [("id", f"eq.{vid}")])
+        db.update("vocabulary", {"srs_due": "2999-01-01"}, [("id", f"eq.{self.vids[-2]}")])
+
+        self.paths = []
+        self._request = sc._request
+
+        def counting_request(method, path, **kw):
+            self.paths.append((method, path, kw.get("params") or {}))
+            return self._request(method, path, **kw)
+        sc._request = counting_request
+
+    def tearDown(self):
+        sc._request = self._request
+        sc.close_local_cache()
+        sc.SUPABASE_URL, sc.SYNC_MIN_INTERVAL = self._url, self._interval
+        self.srv.stop()
+        self.tmp.cleanup()
+
+    def expected_due(self, ids):
+        """Urutan antrian: srs_due.asc, id.asc (yang belum jatuh tempo tidak ikut)."""
+        rows = self.srv.db.select("vocabulary", [("id", "in.(%s)" % ",".join(map(str, ids)))])[0]
+        today = date.today().isoformat()
+        due = [r for r in rows if r["srs_due"] <= today]
+        return [r["id"] for r in sorted(due, key=lambda r: (r["srs_due"], r["id"]))]
+
+class DueQueueTest(QuizTestBase):
+    def test_server_pages_by_keyset(self):
+        rows = list(sc._iter_due(self.uid, "vocabulary"))
+        self.assertEqual([r["id"] for r in rows], self.expected_due(self.vids))
+
+        # jendela tetap QUIZ_WINDOW baris, URL tidak tumbuh (tanpa daftar id yang sudah keluar)
+        gets = [p for m, _, p in self.paths if m == "GET"]
+        self.assertEqual(len(gets), len(rows) // sc.QUIZ_WINDOW + 1)
+        self.assertFalse(any("not.in" in str(p) for p in gets))
+
+    def test_language_pair_filtered_on_server(self):
+        qs = list(sc.iter_due_vocab_questions(self.uid, "Jepang", "Inggris"))
+        eligible = self.vids[::JP_EN_EVERY]
+        self.assertEqual([q["vocab_id"] for q in qs], self.expected_due(eligible))
+        self.assertTrue(all((q["from_lang"], q["to_lang"]) == ("Jepang", "Inggris") for q in qs))
+        self.assertEqual(len([m for m, _, _ in self.paths if m == "GET"]), 1)
+
+    def test_replica_matches_server(self):
+        server = [r["id"] for r in sc._iter_due(self.uid, "vocabulary")]
+        server_jp = [q["vocab_id"] for q in sc.iter_due_vocab_questions(self.uid, "Jepang", "Inggris")]
+
+        sc.open_local_cache(self.uid, os.path.join(self.tmp.name, "replica.db"))
+        sc.get_vocabularies_with_translations(self.uid)
+        self.assertEqual([r["id"] for r in sc._iter_due(self.uid, "vocabulary")], server)
+        self.assertEqual([q["vocab_id"] for q in sc.iter_due_vocab_questions(self.uid, "Jepang", "Inggris")], server_jp)
+
+class SamplingTest(QuizTestBase):
+    def test_language_pair_counted_and_sampled_on_server(self):
+        eligible = self.vids[::JP_EN_EVERY]
+        self.assertEqual(sc._count_candidates(self.uid, "vocabulary", False, ("Jepang", "Inggris")), len(eligible))
+
+        self.paths.clear()
+        qs = list(sc.iter_quiz_vocab_questions(self.uid, "Jepang", "Inggris"))
+        self.assertEqual(sorted(q["vocab_id"] for q in qs), eligible)
+        # 1 count + 1 jendela (semua konsep yang layak muat di satu jendela)
+        self.assertEqual(len(self.paths), 2)
+
+    def test_replica_language_filter(self):
+        sc.open_local_cache(self.uid, os.path.join(self.tmp.name, "replica.db"))
+        sc.get_vocabularies_with_translations(self.uid)
+        qs = list(sc.iter_quiz_vocab_questions(self.uid, "Inggris", "Acak"))
+        self.assertEqual(sorted(q["vocab_id"] for q in qs), self.vids[::JP_EN_EVERY])
+        self.assertTrue(all(q["to_lang"] == "Jepang" for q in qs))
+
+    def test_stops_after_empty_windows(self):
+        # semua konsep cuma punya 1 bahasa => tidak ada soal, jangan sampai menyapu seluruh koleksi
+        self.srv.db.delete("vocabulary_translation", [("bahasa", "in.(Jepang,Mandarin)")])
+        cap = sc.QUIZ_MAX_EMPTY_WINDOWS
+        sc.QUIZ_MAX_EMPTY_WINDOWS = 1
+        try:
+            self.assertEqual(list(sc.iter_quiz_vocab_questions(self.uid)), [])
+        finally:
+            sc.QUIZ_MAX_EMPTY_WINDOWS = cap
+        windows = len([m for m, _, _ in self.paths if m == "GET"])
+        self.assertLess(windows, -(-N_VOCAB // sc.QUIZ_WINDOW))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import supabase_client as sc
+from fake_postgrest import FakePostgrest
+
+# ==================================================
+# Replika lokal vs perubahan dari device lain (via fake_postgrest, tanpa jaringan)
+# Jalankan dari root repo: python -m unittest discover tests
+# ==================================================
+class VocabularyReplicaSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.srv = FakePostgrest(os.path.join(self.tmp.name, "server.db")).start()
+        self._url, self._interval = sc.SUPABASE_URL, sc.SYNC_MIN_INTERVAL
+        sc.SUPABASE_URL = self.srv.url
+        sc.SYNC_MIN_INTERVAL = 0
+
+        db = self.srv.db
+        self.uid = db.seed("users", [{"username": "u", "password": "x"}])[0]
+        self.vid = db.seed("vocabulary", [{"user_id": self.uid, "catatan": "a"}])[0]
+        db.seed("vocabulary_translation", [{"vocabulary_id": self.vid, "bahasa": "Inggris", "kosakata": "one"}])
+        sc.open_local_cache(self.uid, os.path.join(self.tmp.name, "replica.db"))
+
+    def tearDown(self):
+        sc.close_local_cache()
+        sc.SUPABASE_URL, sc.SYNC_MIN_INTERVAL = self._url, self._interval
+        self.srv.stop()
+        self.tmp.cleanup()
+
+    def _remote_change(self):
+        """Device lain: tambah konsep baru + ubah catatan konsep lama."""
+        db = self.srv.db
+        new_id = db.seed("vocabulary", [{"user_id": self.uid, "catatan": "b"}])[0]
+        db.seed("vocabulary_translation", [{"vocabulary_id": new_id, "bahasa": "Inggris", "kosakata": "two"}])
+        db.update("vocabulary", {"catatan": "changed"}, [("id", f"eq.{self.vid}")])
+        return new_id
+
+    def test_list_with_translations_sees_remote_change(self):
+        first = sc.get_vocabularies_with_translations(self.uid)
+        self.assertEqual([(v["id"], v["catatan"]) for v in first], [(self.vid, "a")])
+
+        new_id = self._remote_change()
+        rows = sc.get_vocabularies_with_translations(self.uid)
+        self.assertEqual([(v["id"], v["catatan"]) for v in rows], [(new_id, "b"), (self.vid, "changed")])
+        self.assertEqual([t["kosakata"] for t in rows[0]["vocabulary_translation"]], ["two"])
+
+    def test_single_concept_sees_remote_change(self):
+        sc.get_vocabularies_with_translations(self.uid)
+        self._remote_change()
+        self.assertEqual(sc.get_vocabulary_with_translations(self.vid)["catatan"], "changed")
+
+    def test_remote_delete(self):
+        sc.get_vocabularies_with_translations(self.uid)
+        self.srv.db.delete("vocabulary", [("id", f"eq.{self.vid}")])
+        self.assertEqual(sc.get_vocabularies_with_translations(self.uid), [])
+        self.assertIsNone(sc.get_vocabulary_with_translations(self.vid))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import srs
+
+# ==================================================
+# Aritmetika SM-2 di srs.py
+# ==================================================
+TODAY = date(2026, 1, 1)
+
+def _answer(state: dict, correct: bool) -> dict:
+    return srs.review(state, srs.GRADE_CORRECT if correct else srs.GRADE_WRONG, today=TODAY)
+
+class ReviewTest(unittest.TestCase):
+    def test_new_item_defaults(self):
+        self.assertEqual(srs.state_of({}), {"srs_ease": srs.DEFAULT_EASE, "srs_interval": 0, "srs_reps": 0, "srs_due": None})
+
+    def test_interval_growth_on_correct_answers(self):
+        state, intervals = {}, []
+        for _ in range(4):
+            state = _answer(state, True)
+            intervals.append(state["srs_interval"])
+        # 1 hari, 6 hari, lalu interval * ease (grade 4 => ease tetap 2.5)
+        self.assertEqual(intervals, [1, 6, 15, 38])
+        self.assertEqual(state["srs_reps"], 4)
+        self.assertEqual(state["srs_ease"], 2.5)
+        self.assertEqual(state["srs_due"], "2026-02-08")
+
+    def test_wrong_answer_resets_reps_and_interval(self):
+        state = {"srs_ease": 2.5, "srs_interval": 15, "srs_reps": 3}
+        state = _answer(state, False)
+        self.assertEqual((state["srs_reps"], state["srs_interval"]), (0, 1))
+        self.assertEqual(state["srs_due"], "2026-01-02")
+        self.assertAlmostEqual(state["srs_ease"], 1.96)
+
+        # setelah lupa, urutan interval mulai dari awal lagi
+        state = _answer(state, True)
+        self.assertEqual((state["srs_reps"], state["srs_interval"]), (1, 1))
+
+    def test_ease_floor(self):
+        state = {}
+        for _ in range(5):
+            state = _answer(state, False)
+        self.assertEqual(state["srs_ease"], srs.MIN_EASE)
+
+        # ease minimum tetap dipakai untuk pertumbuhan interval
+        state = {"srs_ease": srs.MIN_EASE, "srs_interval": 10, "srs_reps": 2}
+        self.assertEqual(_answer(state, True)["srs_interval"], 13)
+
+    def test_mastered_threshold(self):
+        self.assertFalse(srs.is_mastered({"srs_interval": srs.MASTERED_DAYS - 1}))
+        self.assertTrue(srs.is_mastered({"srs_interval": srs.MASTERED_DAYS}))
+        self.assertFalse(srs.is_mastered({}))
+
+        state = {}
+        mastered = []
+        for _ in range(4):
+            state = _answer(state, True)
+            mastered.append(srs.is_mastered(state))
+        self.assertEqual(mastered, [False, False, False, True])
+
+if __name__ == "__main__":
+    unittest.main()
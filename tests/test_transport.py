@@ -0,0 +1,129 @@
+import os
+import sys
+import unittest
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from http_transport import SupabaseTransport, CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+# ==================================================
+# Retry, aturan idempoten, dan circuit breaker di http_transport
+# (session palsu: tanpa jaringan, tanpa sleep)
+# ==================================================
+class _Response:
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+class _StubSession:
+    """Setiap request memakai hasil berikutnya: exception (di-raise) atau status code."""
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, timeout=None, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return _Response(*outcome) if isinstance(outcome, tuple) else _Response(outcome)
+
+def _transport(outcomes, retries: int = 3, breaker=None):
+    t = SupabaseTransport(retries=retries, breaker=breaker or CircuitBreaker(failure_threshold=100))
+    t.session = _StubSession(outcomes)
+    t._sleep = lambda attempt, wait=None: None
+    return t
+
+class RetryTest(unittest.TestCase):
+    def test_get_retried_after_connection_error(self):
+        t = _transport([requests.ConnectionError(), requests.ConnectionError(), 200])
+        self.assertEqual(t.request("GET", "http://x/rest/v1/notes").status_code, 200)
+        self.assertEqual(t.session.calls, 3)
+
+    def test_read_timeout_not_retried(self):
+        t = _transport([requests.ReadTimeout(), 200])
+        with self.assertRaises(requests.ReadTimeout):
+            t.request("GET", "http://x/rest/v1/notes")
+        self.assertEqual(t.session.calls, 1)
+
+    def test_retries_exhausted_returns_last_response(self):
+        t = _transport([503, 503, 503, 503], retries=3)
+        self.assertEqual(t.request("GET", "http://x/rest/v1/notes").status_code, 503)
+        self.assertEqual(t.session.calls, 4)
+
+    def test_plain_post_not_retried(self):
+        t = _transport([503, 200])
+        self.assertEqual(t.request("POST", "http://x/rest/v1/notes").status_code, 503)
+        t = _transport([requests.ConnectionError(), 200])
+        with self.assertRaises(requests.ConnectionError):
+            t.request("POST", "http://x/rest/v1/notes")
+        self.assertEqual(t.session.calls, 1)
+
+    def test_post_retried_when_not_sent_or_idempotent(self):
+        # connect timeout => request belum terkirim, aman diulang
+        t = _transport([requests.ConnectTimeout(), 201])
+        self.assertEqual(t.request("POST", "http://x/rest/v1/notes").status_code, 201)
+        # upsert (on_conflict) ditandai idempoten
+        t = _transport([503, 201])
+        self.assertEqual(t.request("POST", "http://x/rest/v1/notes", idempotent=True).status_code, 201)
+
+    def test_long_retry_after_not_waited(self):
+        t = _transport([(429, {"Retry-After": "3600"}), 200])
+        self.assertEqual(t.request("GET", "http://x/rest/v1/notes").status_code, 429)
+        self.assertEqual(t.session.calls, 1)
+
+    def test_client_error_not_retried(self):
+        t = _transport([400, 200])
+        self.assertEqual(t.request("GET", "http://x/rest/v1/notes").status_code, 400)
+        self.assertEqual(t.session.calls, 1)
+
+class CircuitBreakerTest(unittest.TestCase):
+    def _expire(self, breaker):
+        breaker.opened_at -= breaker.reset_timeout
+
+    def test_open_half_open_closed(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        t = _transport([requests.ConnectionError()] * 3 + [200], retries=0, breaker=breaker)
+        for _ in range(3):
+            self.assertEqual(breaker.state(), CLOSED)
+            with self.assertRaises(requests.ConnectionError):
+                t.request("GET", "http://x/rest/v1/notes")
+        self.assertEqual(breaker.state(), OPEN)
+
+        # terbuka => ditolak tanpa menyentuh jaringan
+        with self.assertRaises(CircuitOpenError):
+            t.request("GET", "http://x/rest/v1/notes")
+        self.assertEqual(t.session.calls, 3)
+
+        self._expire(breaker)
+        self.assertEqual(breaker.state(), HALF_OPEN)
+        self.assertEqual(t.request("GET", "http://x/rest/v1/notes").status_code, 200)
+        self.assertEqual(breaker.state(), CLOSED)
+        self.assertEqual(breaker.info()["failures"], 0)
+
+    def test_half_open_allows_one_probe_and_reopens_on_failure(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        self._expire(breaker)
+
+        breaker.allow()                  # probe
+        with self.assertRaises(CircuitOpenError):
+            breaker.allow()              # probe kedua ditolak selama probe pertama jalan
+        breaker.record_failure()
+        self.assertEqual(breaker.state(), OPEN)
+
+    def test_server_errors_count_client_errors_do_not(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        t = _transport([500, 404, 500, 500], retries=0, breaker=breaker)
+        t.request("GET", "http://x/rest/v1/notes")
+        t.request("GET", "http://x/rest/v1/notes")   # 404 => backend hidup, hitungan direset
+        t.request("GET", "http://x/rest/v1/notes")
+        self.assertEqual(breaker.state(), CLOSED)
+        t.request("GET", "http://x/rest/v1/notes")
+        self.assertEqual(breaker.state(), OPEN)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
+from functools import partial
+
 from PySide6.QtWidgets import (
     QWidget, QLabel, QLineEdit, QTextEdit, QPushButton,
     QVBoxLayout, QHBoxLayout, QFormLayout, QMessageBox,
-    QComboBox, QTableWidget, QTableWidgetItem
+    QComboBox, QTableView
 )
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QHeaderView, QAbstractItemView
@@ -9,10 +11,62 @@ from PySide6.QtWidgets import QHeaderView, QAbstractItemView
 from supabase_client import (
     LANGS,
     get_folders, _folder_name_from_row,
-    get_vocabularies, insert_vocabulary, update_vocabulary, delete_vocabulary,
-    get_translations, upsert_translation, delete_translation,
-    set_vocab_hafal, find_translation
+    get_vocabularies_with_translations, get_vocabulary_with_translations, insert_vocabulary, update_vocabulary, delete_vocabulary,
+    upsert_translations, delete_translation,
+    set_vocab_hafal, set_vocabs_hafal
 )
+from workers import TaskRunner, WriteBuffer, RefreshScheduler
+from table_models import RecordTableModel, PagedTableLoader, CHECK
+
+# --------------------------------------------------
+# job untuk worker thread (jangan sentuh widget di sini)
+# --------------------------------------------------
+def _save_language_job(user_id: int, vocab_id, catatan: str, folder_id, entries):
+    if vocab_id is None:
+        created = insert_vocabulary(user_id, catatan=catatan, folder_id=folder_id)
+        if not created:
+            return None
+        vocab_id = created[0]["id"]
+    else:
+        update_vocabulary(vocab_id, {"catatan": catatan, "folder_id": folder_id})
+
+    # semua bahasa yang diisi => satu request upsert
+    upsert_translations(vocab_id, entries)
+    return vocab_id
+
+def _summary_row(v: dict) -> dict:
+    trans = v.get("vocabulary_translation") or []
+    m = {t.get("bahasa"): t.get("kosakata") for t in trans}
+
+    mj = []
+    if m.get("Mandarin"):
+        mj.append(f"Mandarin: {m.get('Mandarin')}")
+    if m.get("Jepang"):
+        mj.append(f"Jepang: {m.get('Jepang')}")
+
+    return {
+        "id": v["id"],
+        "folder_id": v.get("folder_id"),
+        "sudah_hafal": v.get("sudah_hafal"),
+        "Indonesia": m.get("Indonesia", ""),
+        "Inggris": m.get("Inggris", ""),
+        "Mandarin/Jepang": " | ".join(mj),
+    }
+
+def _load_summary_job(user_id: int, folder_id, sudah_hafal, before_id=None, limit=None):
+    vocabs = get_vocabularies_with_translations(user_id, folder_id=folder_id, sudah_hafal=sudah_hafal,
+                                                before_id=before_id, limit=limit)
+    return [_summary_row(v) for v in vocabs]
+
+def _load_concept_job(vocab_id: int):
+    v = get_vocabulary_with_translations(vocab_id)
+    if v is None:
+        return None
+    return {
+        "id": v["id"],
+        "catatan": v.get("catatan") or "",
+        "translations": {t.get("bahasa"): t for t in (v.get("vocabulary_translation") or [])},
+    }
 
 class VocabularyPage(QWidget):
     def __init__(self, user_id: int, dashboard=None):
@@ -22,12 +76,24 @@ class VocabularyPage(QWidget):
 
         self.selected_vocab_id = None
         self.selected_translation_id = None
-        self.loading_table = False
+        # cache konsep yang pernah dipilih: vocab_id -> {"catatan", "translations": {bahasa: row}}
+        # => ganti bahasa / pilih ulang baris tanpa request; dibuang saat save/delete
+        self.concepts = {}
+        # isian bahasa yang belum disimpan untuk konsep terpilih: bahasa -> entry
+        # => beberapa bahasa bisa diisi bergantian lalu disimpan sekaligus
+        self.drafts = {}
+        self.current_lang = LANGS[0]
+        self.tasks = TaskRunner(self)
+        # toggle checkbox dikumpulkan lalu dikirim sekaligus
+        self.hafal_writes = WriteBuffer(self.tasks, set_vocabs_hafal, parent=self)
 
         self.setWindowTitle("Kosakata Multibahasa")
+        # semua pemicu reload (combo filter, Refresh, setelah write) digabung jadi satu load
+        self.refresher = RefreshScheduler(self.load_data, parent=self)
+
         self.setup_ui()
         self.load_folders()
-        self.load_data()
+        self.refresher.request()
 
         self.resize(1100, 780)
         self.setMinimumSize(1000, 700)
@@ -38,11 +104,13 @@ class VocabularyPage(QWidget):
         self.close()
 
     def closeEvent(self, event):
+        self.hafal_writes.flush()
+        self.tasks.cancel_all()
         if self.dashboard is not None:
             self.dashboard.show()
         event.accept()
 
-    def _setup_table_base(self, tbl: QTableWidget):
+    def _setup_table_base(self, tbl: QTableView):
         tbl.setAlternatingRowColors(True)
         tbl.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         tbl.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
@@ -74,12 +142,12 @@ class VocabularyPage(QWidget):
         self.cmb_filter_folder = QComboBox()
         self.cmb_filter_status = QComboBox()
         self.cmb_filter_status.addItems(["Semua", "Belum Hafal", "Sudah Hafal"])
-        self.cmb_filter_folder.currentIndexChanged.connect(self.load_data)
-        self.cmb_filter_status.currentIndexChanged.connect(self.load_data)
+        self.cmb_filter_folder.currentIndexChanged.connect(self.refresher.request)
+        self.cmb_filter_status.currentIndexChanged.connect(self.refresher.request)
 
         btn_refresh = QPushButton("Refresh")
         btn_refresh.setProperty("class", "secondary")
-        btn_refresh.clicked.connect(self.load_data)
+        btn_refresh.clicked.connect(self.refresher.request)
 
         filterbar = QHBoxLayout()
         filterbar.addWidget(QLabel("Folder:"))
@@ -98,7 +166,7 @@ class VocabularyPage(QWidget):
         # form translation
         self.cmb_bahasa = QComboBox()
         self.cmb_bahasa.addItems(LANGS)
-        self.cmb_bahasa.currentTextChanged.connect(self.load_detail_for_selected_language)
+        self.cmb_bahasa.currentTextChanged.connect(self.on_language_changed)
 
         self.txt_kosakata = QLineEdit()
         self.txt_pengucapan = QLineEdit()
@@ -161,11 +229,21 @@ class VocabularyPage(QWidget):
         table_title.setObjectName("SectionTitle")
         layout.addWidget(table_title)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["ID", "FolderID", "Hafal", "Indonesia", "Inggris", "Mandarin/Jepang"])
-        self.table.cellDoubleClicked.connect(self.on_double_click)
-        self.table.itemChanged.connect(self.on_item_changed_hafal)
+        self.model = RecordTableModel([
+            ("ID", "id"),
+            ("FolderID", "folder_id"),
+            ("Hafal", "sudah_hafal", CHECK),
+            ("Indonesia", "Indonesia"),
+            ("Inggris", "Inggris"),
+            ("Mandarin/Jepang", "Mandarin/Jepang"),
+        ], self)
+        self.model.checkToggled.connect(self.on_hafal_toggled)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.doubleClicked.connect(self.on_double_click)
+        self.pager = PagedTableLoader(self.table, self.model, self.tasks, parent=self)
         self._setup_table_base(self.table)
 
         # tetap allow checkbox column
@@ -175,19 +253,28 @@ class VocabularyPage(QWidget):
         self.setLayout(layout)
 
     def load_folders(self):
-        self.cmb_folder.clear()
-        self.cmb_filter_folder.clear()
+        self.tasks.run("folders", get_folders, self.user_id, on_done=self._fill_folders)
+
+    def _fill_folders(self, folders):
+        # clear/addItem tidak memicu reload; pilihan lama dipertahankan kalau foldernya masih ada
+        with self.refresher.populating(self.cmb_filter_folder):
+            form_folder = self.cmb_folder.currentData()
+            filter_folder = self.cmb_filter_folder.currentData()
+            self.cmb_folder.clear()
+            self.cmb_filter_folder.clear()
 
-        self.cmb_folder.addItem("Tanpa Folder", None)
-        self.cmb_filter_folder.addItem("Semua", None)
-        self.cmb_filter_folder.addItem("Tanpa Folder", "NO_FOLDER")
+            self.cmb_folder.addItem("Tanpa Folder", None)
+            self.cmb_filter_folder.addItem("Semua", None)
+            self.cmb_filter_folder.addItem("Tanpa Folder", "NO_FOLDER")
 
-        folders = get_folders(self.user_id)
-        for f in folders:
-            fid = f.get("id")
-            name = _folder_name_from_row(f)
-            self.cmb_folder.addItem(name, fid)
-            self.cmb_filter_folder.addItem(name, fid)
+            for f in folders:
+                fid = f.get("id")
+                name = _folder_name_from_row(f)
+                self.cmb_folder.addItem(name, fid)
+                self.cmb_filter_folder.addItem(name, fid)
+
+            self.cmb_folder.setCurrentIndex(max(0, self.cmb_folder.findData(form_folder)))
+            self.cmb_filter_folder.setCurrentIndex(max(0, self.cmb_filter_folder.findData(filter_folder)))
 
     def _status_to_bool(self, text: str):
         if text == "Belum Hafal":
@@ -200,151 +287,152 @@ class VocabularyPage(QWidget):
         folder_filter = self.cmb_filter_folder.currentData()
         status_filter = self._status_to_bool(self.cmb_filter_status.currentText())
 
-        self.loading_table = True
-        self.table.setRowCount(0)
-
-        vocabs = get_vocabularies(self.user_id, folder_id=folder_filter, sudah_hafal=status_filter)
-
-        for row, v in enumerate(vocabs):
-            self.table.insertRow(row)
-
-            it_id = QTableWidgetItem(str(v["id"]))
-            it_id.setFlags(it_id.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row, 0, it_id)
-
-            folder_text = "" if v.get("folder_id") is None else str(v.get("folder_id"))
-            it_fid = QTableWidgetItem(folder_text)
-            it_fid.setFlags(it_fid.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row, 1, it_fid)
-
-            it_h = QTableWidgetItem("")
-            it_h.setFlags((it_h.flags() | Qt.ItemIsUserCheckable) & ~Qt.ItemIsEditable)
-            it_h.setCheckState(Qt.Checked if v.get("sudah_hafal") else Qt.Unchecked)
-            self.table.setItem(row, 2, it_h)
-
-            trans = get_translations(v["id"])
-            m = {t.get("bahasa"): t.get("kosakata") for t in trans}
-
-            self.table.setItem(row, 3, QTableWidgetItem(m.get("Indonesia", "")))
-            self.table.setItem(row, 4, QTableWidgetItem(m.get("Inggris", "")))
-
-            mj = []
-            if m.get("Mandarin"):
-                mj.append(f"Mandarin: {m.get('Mandarin')}")
-            if m.get("Jepang"):
-                mj.append(f"Jepang: {m.get('Jepang')}")
-            self.table.setItem(row, 5, QTableWidgetItem(" | ".join(mj)))
-
-        self.loading_table = False
+        self.pager.reset(partial(_load_summary_job, self.user_id, folder_filter, status_filter),
+                         on_first_page=self._after_first_page)
 
+    def _after_first_page(self):
         if self.selected_vocab_id is not None:
             self.load_detail_for_selected_language(self.cmb_bahasa.currentText())
 
-    def on_double_click(self, row, col):
-        self.selected_vocab_id = int(self.table.item(row, 0).text())
+    def on_double_click(self, index):
+        row = index.row()
+        vocab_id = self.model.row_id(row)
+        if vocab_id != self.selected_vocab_id:
+            self.drafts.clear()
+        self.selected_vocab_id = vocab_id
 
-        folder_id_text = self.table.item(row, 1).text().strip()
-        folder_id = int(folder_id_text) if folder_id_text else None
+        folder_id = self.model.value(row, "folder_id")
         idx = self.cmb_folder.findData(folder_id)
         if idx >= 0:
             self.cmb_folder.setCurrentIndex(idx)
         else:
             self.cmb_folder.setCurrentIndex(0)
 
-        vocabs = get_vocabularies(self.user_id)
-        found = [x for x in vocabs if int(x["id"]) == int(self.selected_vocab_id)]
-        self.txt_catatan.setPlainText(found[0].get("catatan") or "" if found else "")
-
+        concept = self.concepts.get(self.selected_vocab_id)
+        self.txt_catatan.setPlainText(concept["catatan"] if concept else "")
         self.load_detail_for_selected_language(self.cmb_bahasa.currentText())
 
-    def on_item_changed_hafal(self, item: QTableWidgetItem):
-        if self.loading_table:
-            return
-        if item.column() != 2:
-            return
-
-        row = item.row()
-        vocab_id = int(self.table.item(row, 0).text())
-        hafal = (item.checkState() == Qt.Checked)
-        set_vocab_hafal(vocab_id, hafal)
+    def on_hafal_toggled(self, vocab_id: int, hafal: bool):
+        self.hafal_writes.put(vocab_id, hafal)
 
     def create_new_vocab(self):
         self.selected_vocab_id = None
         self.selected_translation_id = None
+        self.drafts.clear()
         self.txt_catatan.clear()
         self.txt_kosakata.clear()
         self.txt_pengucapan.clear()
         self.txt_arti.clear()
-        QMessageBox.information(self, "Info", "Mode: buat kosakata baru.\nIsi catatan (opsional), pilih bahasa, lalu Simpan/Update Bahasa.")
+        QMessageBox.information(self, "Info", "Mode: buat kosakata baru.\nIsi catatan (opsional), isi satu atau beberapa bahasa (ganti pilihan Bahasa), lalu Simpan/Update Bahasa.")
+
+    def _form_entry(self) -> dict:
+        return {
+            "bahasa": self.current_lang,
+            "kosakata": self.txt_kosakata.text().strip(),
+            "pengucapan": self.txt_pengucapan.text().strip(),
+            "arti": self.txt_arti.text().strip(),
+        }
+
+    def _keep_draft(self):
+        """Simpan isian form bahasa aktif ke drafts (kalau beda dari yang tersimpan)."""
+        entry = self._form_entry()
+        concept = self.concepts.get(self.selected_vocab_id) if self.selected_vocab_id is not None else None
+        saved = (concept["translations"].get(entry["bahasa"]) if concept else None) or {}
+        unchanged = all((saved.get(k) or "") == entry[k] for k in ("kosakata", "pengucapan", "arti"))
+        if not entry["kosakata"] or unchanged:
+            self.drafts.pop(entry["bahasa"], None)
+        else:
+            self.drafts[entry["bahasa"]] = entry
+
+    def on_language_changed(self, bahasa: str):
+        self._keep_draft()
+        self.current_lang = bahasa
+        self.load_detail_for_selected_language(bahasa)
 
     def save_language(self):
-        kosakata = self.txt_kosakata.text().strip()
-        if not kosakata:
+        self._keep_draft()
+        if not self.drafts and not self.txt_kosakata.text().strip():
             QMessageBox.warning(self, "Peringatan", "Kosakata wajib diisi")
             return
 
-        bahasa = self.cmb_bahasa.currentText()
-        pengucapan = self.txt_pengucapan.text().strip()
-        arti = self.txt_arti.text().strip()
         folder_id = self.cmb_folder.currentData()
         catatan = self.txt_catatan.toPlainText().strip()
 
-        if self.selected_vocab_id is None:
-            created = insert_vocabulary(self.user_id, catatan=catatan, folder_id=folder_id)
-            if not created:
-                QMessageBox.critical(self, "Gagal", "Gagal membuat vocabulary. Cek RLS/DB.")
-                return
-            self.selected_vocab_id = created[0]["id"]
-        else:
-            update_vocabulary(self.selected_vocab_id, {"catatan": catatan, "folder_id": folder_id})
+        self.tasks.run(None, _save_language_job, self.user_id, self.selected_vocab_id, catatan, folder_id,
+                       list(self.drafts.values()), on_done=self._after_save_language)
 
-        upsert_translation(self.selected_vocab_id, bahasa, kosakata, pengucapan, arti)
-        self.load_data()
+    def _after_save_language(self, vocab_id):
+        if vocab_id is None:
+            QMessageBox.critical(self, "Gagal", "Gagal membuat vocabulary. Cek RLS/DB.")
+            return
+        self.drafts.clear()
+        self.concepts.pop(vocab_id, None)
+        self.selected_vocab_id = vocab_id
+        self.refresher.request()
 
     def load_detail_for_selected_language(self, bahasa: str):
         if self.selected_vocab_id is None:
-            self.selected_translation_id = None
-            self.txt_kosakata.clear()
-            self.txt_pengucapan.clear()
-            self.txt_arti.clear()
+            self.tasks.cancel("detail")
+            self._show_translation(None)
             return
 
-        tid = find_translation(self.selected_vocab_id, bahasa)
-        self.selected_translation_id = tid
-
-        if tid is None:
-            self.txt_kosakata.clear()
-            self.txt_pengucapan.clear()
-            self.txt_arti.clear()
+        concept = self.concepts.get(self.selected_vocab_id)
+        if concept is not None:
+            self.tasks.cancel("detail")
+            self._show_translation(concept["translations"].get(bahasa))
             return
 
-        trans = get_translations(self.selected_vocab_id)
-        for t in trans:
-            if t.get("bahasa") == bahasa:
-                self.txt_kosakata.setText(t.get("kosakata") or "")
-                self.txt_pengucapan.setText(t.get("pengucapan") or "")
-                self.txt_arti.setText(t.get("arti") or "")
-                return
+        self.tasks.run("detail", _load_concept_job, self.selected_vocab_id, on_done=self._concept_loaded)
+
+    def _concept_loaded(self, concept):
+        if concept is None:
+            self._show_translation(None)
+            return
+        self.concepts[concept["id"]] = concept
+        if concept["id"] == self.selected_vocab_id:
+            self.txt_catatan.setPlainText(concept["catatan"])
+            self._show_translation(concept["translations"].get(self.cmb_bahasa.currentText()))
+
+    def _show_translation(self, t):
+        self.selected_translation_id = t["id"] if t else None
+        # isian yang belum disimpan menang atas data server
+        t = self.drafts.get(self.cmb_bahasa.currentText()) or t or {}
+        self.txt_kosakata.setText(t.get("kosakata") or "")
+        self.txt_pengucapan.setText(t.get("pengucapan") or "")
+        self.txt_arti.setText(t.get("arti") or "")
 
     def delete_language(self):
         if self.selected_translation_id is None:
             QMessageBox.information(self, "Info", "Tidak ada bahasa ini pada kosakata terpilih.")
             return
-        delete_translation(self.selected_translation_id)
+        vid = self.selected_vocab_id
+        self.concepts.pop(vid, None)
+        self.drafts.pop(self.current_lang, None)
+        self.tasks.run(None, delete_translation, self.selected_translation_id, on_done=lambda _: self._after_delete(vid))
         self.selected_translation_id = None
-        self.load_data()
 
     def delete_vocab_all(self):
         if self.selected_vocab_id is None:
             return
-        delete_vocabulary(self.selected_vocab_id)
+        vid = self.selected_vocab_id
+        self.concepts.pop(vid, None)
+        self.tasks.run(None, delete_vocabulary, vid, on_done=lambda _: self._after_delete(vid))
+        self.drafts.clear()
         self.selected_vocab_id = None
         self.selected_translation_id = None
-        self.load_data()
+
+    def _after_delete(self, vocab_id):
+        # buang lagi: detail bisa saja sempat di-cache ulang sebelum delete selesai
+        self.concepts.pop(vocab_id, None)
+        self.refresher.request()
 
     def mark_hafal(self):
         if self.selected_vocab_id is None:
             QMessageBox.warning(self, "Peringatan", "Pilih kosakata dulu (double click baris)")
             return
-        set_vocab_hafal(self.selected_vocab_id, True)
-        self.load_data()
+        if self._status_to_bool(self.cmb_filter_status.currentText()) is None:
+            # baris tetap tampil => cukup ubah barisnya di model
+            self.model.update_row(self.selected_vocab_id, {"sudah_hafal": True})
+            self.tasks.run(None, set_vocab_hafal, self.selected_vocab_id, True)
+        else:
+            self.tasks.run(None, set_vocab_hafal, self.selected_vocab_id, True, on_done=lambda _: self.refresher.request())
@@ -0,0 +1,230 @@
+import sys
+import traceback
+from itertools import count
+from contextlib import contextmanager
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+from config import WRITE_DEBOUNCE_MS
+import metrics
+
+# ==================================================
+# Background worker
+# - fungsi supabase_client dijalankan di QThreadPool, bukan di GUI thread
+# - hasilnya dikirim balik lewat signal (otomatis queued ke GUI thread)
+# ==================================================
+_pool = None
+_active = set()   # referensi worker yang sedang jalan (supaya tidak di-GC di tengah jalan)
+
+def thread_pool() -> QThreadPool:
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(4)
+    return _pool
+
+class _WorkerSignals(QObject):
+    done = Signal(int, object)   # (ticket, hasil)
+    error = Signal(int, str)     # (ticket, traceback)
+
+class _Worker(QRunnable):
+    def __init__(self, ticket: int, fn, args, kwargs, page=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.ticket = ticket
+        self.page = page
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = _WorkerSignals()
+
+    def run(self):
+        # request yang dibuat job ini dicatat atas nama halaman pemiliknya
+        metrics.set_page(self.page)
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception:
+            self.signals.error.emit(self.ticket, traceback.format_exc())
+        else:
+            self.signals.done.emit(self.ticket, result)
+        finally:
+            metrics.set_page(None)
+            _active.discard(self)
+
+class ChangeRelay(QObject):
+    """
+    Listener perubahan supabase_client bisa dipanggil dari worker thread
+    => teruskan lewat signal supaya slot-nya jalan di GUI thread:
+        self.relay = ChangeRelay()
+        self.relay.changed.connect(self._on_table_changed)
+        add_change_listener(self.relay.changed.emit)
+    """
+    changed = Signal(str)
+
+class TaskRunner(QObject):
+    """
+    Menjalankan pekerjaan (biasanya panggilan supabase_client) di background:
+        self.tasks = TaskRunner(self)
+        self.tasks.run("load", get_notes, user_id, on_done=self.fill_table)
+
+    - key sama => request lama dianggap basi: dibatalkan kalau belum jalan,
+      dan hasilnya dibuang kalau sudah terlanjur jalan
+    - key None => tidak pernah dibatalkan (cocok untuk write)
+    - on_done / on_error dipanggil di GUI thread
+    - name: label halaman untuk metrik request (default: nama class parent)
+    """
+    def __init__(self, parent=None, name=None):
+        super().__init__(parent)
+        self.name = name or (type(parent).__name__ if parent is not None else None)
+        self._tickets = count(1)
+        self._latest = {}    # key -> ticket terbaru
+        self._jobs = {}      # ticket -> (key, worker, on_done, on_error)
+
+    def run(self, key, fn, *args, on_done=None, on_error=None, **kwargs) -> int:
+        if key is not None:
+            self.cancel(key)
+
+        ticket = next(self._tickets)
+        worker = _Worker(ticket, fn, args, kwargs, self.name)
+        worker.signals.done.connect(self._on_done)
+        worker.signals.error.connect(self._on_error)
+
+        self._jobs[ticket] = (key, worker, on_done, on_error)
+        if key is not None:
+            self._latest[key] = ticket
+        _active.add(worker)
+        thread_pool().start(worker)
+        return ticket
+
+    def is_running(self, key) -> bool:
+        return key in self._latest
+
+    def busy(self) -> bool:
+        """True selama masih ada job yang belum selesai (termasuk yang hasilnya akan dibuang)."""
+        return bool(self._jobs)
+
+    def cancel(self, key):
+        ticket = self._latest.pop(key, None)
+        job = self._jobs.get(ticket)
+        if job is None:
+            return
+        # belum jalan => keluarkan dari antrian; sudah jalan => hasilnya nanti dibuang
+        if thread_pool().tryTake(job[1]):
+            _active.discard(job[1])
+            del self._jobs[ticket]
+
+    def cancel_all(self):
+        for key in list(self._latest):
+            self.cancel(key)
+
+    def _finish(self, ticket: int):
+        """Job yang hasilnya masih relevan, atau None kalau sudah basi."""
+        job = self._jobs.pop(ticket, None)
+        if job is None:
+            return None
+        key = job[0]
+        if key is None:
+            return job
+        if self._latest.get(key) != ticket:
+            return None
+        del self._latest[key]
+        return job
+
+    def _on_done(self, ticket: int, result):
+        job = self._finish(ticket)
+        if job is None:
+            return
+        on_done = job[2]
+        if on_done is not None:
+            on_done(result)
+
+    def _on_error(self, ticket: int, tb: str):
+        job = self._finish(ticket)
+        if job is None:
+            return
+        on_error = job[3]
+        if on_error is not None:
+            on_error(tb)
+        else:
+            print(tb, file=sys.stderr)
+
+class WriteBuffer(QObject):
+    """
+    Menampung write kecil (mis. toggle checkbox) lalu mengirimnya sekaligus:
+        self.hafal_writes = WriteBuffer(self.tasks, set_notes_hafal, parent=self)
+        self.hafal_writes.put(note_id, True)
+
+    - per id hanya nilai terakhir yang dikirim (toggle bolak-balik => satu write)
+    - dikirim setelah delay_ms tanpa perubahan baru; id dikelompokkan per nilai
+      => flush_fn(ids, nilai) sekali per kelompok (lewat TaskRunner, key None)
+    - flush() mengirim sisa buffer saat itu juga (mis. di closeEvent)
+    """
+    def __init__(self, tasks: TaskRunner, flush_fn, delay_ms: int = WRITE_DEBOUNCE_MS, on_done=None, parent=None):
+        super().__init__(parent)
+        self.tasks = tasks
+        self.flush_fn = flush_fn
+        self.on_done = on_done
+        self._pending = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def put(self, key, value):
+        self._pending[key] = value
+        self._timer.start()   # restart => debounce
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self):
+        self._timer.stop()
+        if not self._pending:
+            return
+        groups = {}
+        for key, value in self._pending.items():
+            groups.setdefault(value, []).append(key)
+        self._pending = {}
+        for value, keys in groups.items():
+            self.tasks.run(None, self.flush_fn, keys, value, on_done=self.on_done)
+
+class RefreshScheduler(QObject):
+    """
+    Menggabungkan semua pemicu reload dalam satu putaran event loop menjadi satu load:
+        self.refresher = RefreshScheduler(self.load_data, parent=self)
+        self.cmb_filter_folder.currentIndexChanged.connect(self.refresher.request)
+
+    - request() boleh dipanggil berkali-kali (signal combo, tombol Refresh, setelah write);
+      load_fn dipanggil sekali setelah kontrol kembali ke event loop
+    - populating(combo, ...): signal combo diblok selama diisi ulang (clear/addItem);
+      reload hanya dijadwalkan kalau nilai terpilih (currentData) ikut berubah
+    - hasil load untuk filter yang sudah diganti dibuang oleh TaskRunner (key sama)
+    """
+    def __init__(self, load_fn, parent=None):
+        super().__init__(parent)
+        self.load_fn = load_fn
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._fire)
+
+    def request(self, *_):
+        self._timer.start()
+
+    def pending(self) -> bool:
+        return self._timer.isActive()
+
+    def _fire(self):
+        self.load_fn()
+
+    @contextmanager
+    def populating(self, *combos):
+        before = [c.currentData() for c in combos]
+        previous = [c.blockSignals(True) for c in combos]
+        try:
+            yield
+        finally:
+            for c, was_blocked in zip(combos, previous):
+                c.blockSignals(was_blocked)
+            if [c.currentData() for c in combos] != before:
+                self.request()